@@ -1,11 +1,17 @@
+import argparse
+
 import anyio
 from pathlib import Path
 
+from src.core.duckdb.snapshot_store import DuckDBSnapshotStore
+from src.core.util.logger import logger
+from src.core.util.numeric import NumericMode
 from src.enka.client import EnkaClient
 
 from src.evaluator.algorithm.stat_based import YSINAlgorithm
 from src.evaluator.algorithm.weight_based import XZSAlgorithm
 from src.evaluator.evaluator import Evaluator
+from src.evaluator.stage.archive_ingestor import ArchiveIngestor
 
 
 # from src.evaluator.artifact_evaluator import WeightBasedArtifactEvaluator as WAE
@@ -37,6 +43,85 @@ async def main() -> None:
     return None
 
 
+def ingest(args: argparse.Namespace) -> None:
+    """
+    导入目录树中归档的玩家响应：解析 → 评分 → 入库，需先执行 fetch_assets 同步静态资源
+    不经过事件循环执行，Ctrl+C 可立即中断，已提交的批次在下次执行时跳过
+    """
+    # 只读取本地文件，不发起网络请求
+    api = EnkaClient("zh-cn", numeric=NumericMode(args.numeric))
+    try:
+        algorithm = {"xzs": XZSAlgorithm, "ysin": YSINAlgorithm}[args.algorithm]()
+        ev = Evaluator(api, algorithm)
+        api.refresh_assets()
+        if args.reset:
+            ArchiveIngestor.reset(args.root, api.db)
+        stats = ev.ingest_archive(args.root, args.workers, args.shard_size, args.batch_size)
+    finally:
+        # 导入不经过事件循环，结束后单独运行一次以关闭 httpx 客户端与数据库会话
+        anyio.run(api.aclose)
+    print(f"files: {stats.files} (skipped {stats.skipped}, failed {stats.errors}), "
+          f"players: {stats.players}, scored characters: {stats.scored}, rows: {stats.rows}")
+    print(f"elapsed: {stats.seconds:.3f}s, {stats.files_per_second:,.1f} files/s, "
+          f"{stats.rows_per_second:,.1f} rows/s")
+
+
+async def writer(args: argparse.Namespace) -> None:
+    """
+    写入进程：独占 data/main.db，依次同步静态资源、角色权重与玩家快照，然后发布只读快照供服务进程使用
+    每轮中单项同步失败只记录日志，仍然发布快照，服务进程继续使用已有的数据
+    """
+    store = DuckDBSnapshotStore(args.snapshots, keep=args.keep)
+    uids = []
+    if args.uids:
+        uids = [line.strip() for line in Path(args.uids).read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    async with EnkaClient("zh-cn", proxy=args.proxy) as api:
+        evaluators = [Evaluator(api, XZSAlgorithm()), Evaluator(api, YSINAlgorithm())]
+        while True:
+            try:
+                await api.fetch_assets()
+            except Exception as e:
+                logger.error(f"静态资源同步失败 - 错误: {e}")
+            for ev in evaluators:
+                try:
+                    await ev.fetch_character_weights()
+                except Exception as e:
+                    logger.error(f"角色权重同步失败: {ev.algorithm.__class__.__name__} - 错误: {e}")
+            if uids:
+                failed = 0
+                async with api.fetch_players(uids, rate=args.rate) as results:
+                    async for result in results:
+                        failed += not result.ok
+                logger.info(f"玩家快照同步: {len(uids) - failed}/{len(uids)}")
+            await api.adb.write(store.publish)
+            if args.interval <= 0:
+                return
+            await anyio.sleep(args.interval)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command")
+    ingest_parser = subparsers.add_parser("ingest", help="导入目录树中归档的玩家响应（uid/<uid> 布局），中断后再次执行可续传")
+    ingest_parser.add_argument("root", help="归档根目录")
+    ingest_parser.add_argument("--algorithm", choices=["xzs", "ysin"], default="ysin", help="评分算法")
+    ingest_parser.add_argument("--numeric", choices=[mode.value for mode in NumericMode],
+                               default=NumericMode.DECIMAL.value, help="数值模式")
+    ingest_parser.add_argument("--workers", type=int, default=None, help="解析进程数，默认为 CPU 核数")
+    ingest_parser.add_argument("--shard-size", type=int, default=64, help="每个分片的文件数")
+    ingest_parser.add_argument("--batch-size", type=int, default=1024, help="每次写库的玩家数量")
+    ingest_parser.add_argument("--reset", action="store_true", help="清除检查点，重新导入全部文件")
+    writer_parser = subparsers.add_parser("writer", help="同步数据并发布只读快照，供多进程的服务读取")
+    writer_parser.add_argument("--snapshots", default=None, help="快照目录，默认为 data/snapshots")
+    writer_parser.add_argument("--keep", type=int, default=3, help="保留的快照数量")
+    writer_parser.add_argument("--interval", type=float, default=600, help="每轮同步的间隔（秒），不大于 0 时只执行一轮")
+    writer_parser.add_argument("--uids", default=None, help="需要同步快照的玩家 UID 列表文件，每行一个")
+    writer_parser.add_argument("--rate", type=float, default=1.0, help="玩家接口每秒请求数")
+    writer_parser.add_argument("--proxy", default=None, help="代理地址")
+    return parser.parse_args()
+
+
 # async def run_tasks():
 #     await sync_hakush.main()
 #     player = await sync_enka.main()
@@ -44,5 +129,11 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    anyio.run(main)
+    arguments = parse_args()
+    if arguments.command == "ingest":
+        ingest(arguments)
+    elif arguments.command == "writer":
+        anyio.run(writer, arguments)
+    else:
+        anyio.run(main)
     # # 从文件读取
\ No newline at end of file
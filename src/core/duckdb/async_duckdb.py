@@ -0,0 +1,103 @@
+# async_duckdb.py
+
+import threading
+import weakref
+from typing import Any, Callable, TypeVar
+
+import anyio
+import anyio.to_thread
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+
+T = TypeVar("T")
+
+
+class AsyncDuckDBSession:
+    """
+    DuckDBSession 的异步外观
+    数据库操作在 anyio 工作线程中执行，不阻塞事件循环；每个工作线程使用共享连接的独立游标（conn.cursor()），
+    读操作经容量限制器限制并发，写操作经单个写入者串行执行，并发的同步不会相互交错；
+    写入者按数据库实例共享，同一连接上的多个异步外观之间的写操作同样依次执行。
+    操作以 "函数 + 参数" 的形式传入，游标会话作为最后一个参数追加，与各同步器 (..., db) 的签名一致
+    """
+
+    # 写入者注册表 {数据库实例: 容量为 1 的限制器}，数据库实例见 DuckDBSession.instance，
+    # 使用该实例的异步外观全部释放后条目随之回收
+    _write_limiters: weakref.WeakValueDictionary[str, anyio.CapacityLimiter] = weakref.WeakValueDictionary()
+    _write_limiters_lock = threading.Lock()
+
+    def __init__(self, session: DuckDBSession, max_readers: int = 4):
+        """
+        :param session: 共享连接所在的会话，由调用方负责关闭
+        :param max_readers: 同时执行读操作的最大线程数
+        """
+        self._session = session
+        self._local = threading.local()
+        self._cursors: list[DuckDBSession] = []
+        self._cursors_lock = threading.Lock()
+        self._read_limiter = anyio.CapacityLimiter(max_readers)
+        self._write_limiter = self._shared_write_limiter(session)
+
+    @property
+    def session(self) -> DuckDBSession:
+        return self._session
+
+    async def read(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        在工作线程中执行只读操作
+
+        :param func: 同步函数，最后一个参数为当前线程的游标会话
+        :param args: 其余位置参数
+        :return: func 的返回值
+        """
+        return await anyio.to_thread.run_sync(self._call, func, args, limiter=self._read_limiter)
+
+    async def write(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        在工作线程中执行写操作，所有写操作依次执行
+
+        :param func: 同步函数，最后一个参数为当前线程的游标会话
+        :param args: 其余位置参数
+        :return: func 的返回值
+        """
+        return await anyio.to_thread.run_sync(self._call, func, args, limiter=self._write_limiter)
+
+    async def fetchall(self, sql: str, parameters=None) -> list[tuple]:
+        """
+        执行只读查询并取回全部结果
+
+        :param sql: SQL 查询语句
+        :param parameters: 查询参数
+        :return: 结果行列表
+        """
+        return await self.read(lambda db: db.execute_sql(sql, parameters).fetchall())
+
+    def close(self) -> None:
+        """关闭所有工作线程创建的游标，不关闭共享连接"""
+        with self._cursors_lock:
+            for cursor in self._cursors:
+                cursor.close()
+            self._cursors.clear()
+            self._local = threading.local()
+
+    @classmethod
+    def _shared_write_limiter(cls, session: DuckDBSession) -> anyio.CapacityLimiter:
+        """取得会话所在数据库实例的写入者，不存在时创建"""
+        with cls._write_limiters_lock:
+            limiter = cls._write_limiters.get(session.instance)
+            if limiter is None:
+                limiter = cls._write_limiters[session.instance] = anyio.CapacityLimiter(1)
+            return limiter
+
+    def _call(self, func: Callable[..., T], args: tuple) -> T:
+        return func(*args, self._cursor())
+
+    def _cursor(self) -> DuckDBSession:
+        """当前线程的游标会话，首次使用时创建"""
+        local = self._local
+        cursor = getattr(local, "cursor", None)
+        if cursor is None:
+            cursor = local.cursor = self._session.cursor()
+            with self._cursors_lock:
+                self._cursors.append(cursor)
+        return cursor
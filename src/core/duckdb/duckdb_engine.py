@@ -1,28 +1,100 @@
 # duckdb_engine.py
 
+import atexit
 import os
+import threading
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator
 
 import duckdb
+import pyarrow
 
 
 class DuckDBSession:
     """
     DuckDB 会话管理器，用于执行 SQL 查询与数据操作
     支持从 CSV 加载数据，执行 SQL 脚本，导出结果
+
+    同一进程内相同数据库路径与模式的会话共享一个连接，连接在最后一个会话关闭时关闭，
+    进程退出时关闭所有仍然打开的连接
     """
+    # 内存数据库路径
+    MEMORY = ":memory:"
+    # 默认数据库文件所在目录
+    DATA_DIR = Path(__file__).parent.parent.parent.parent / "data"
+
+    # 连接注册表 {(数据库路径, 是否只读): [连接, 引用计数, 实例标识]}
+    _connections: dict[tuple[str, bool], list] = {}
+    _connections_lock = threading.Lock()
 
-    def __init__(self, environment: str = "dev"):
+    def __init__(self, environment: str = "dev", path: str | Path = None, read_only: bool = False):
         """
-        初始化 DuckDB 会话
+        初始化 DuckDB 会话，复用注册表中相同路径与模式的连接
 
-        :param environment: 环境标识符，默认为 dev
+        :param environment: 环境标识符，默认为 dev，对应 data/main.db；
+                            memory 使用进程内共享的内存数据库，其余环境对应 data/<environment>.db
+        :param path: 数据库文件路径，指定时忽略 environment
+        :param read_only: 是否以只读模式打开
+        """
+        self.__path = self.resolve_path(environment, path)
+        self.__key = (self.__path, read_only)
+        self.__read_only = read_only
+        self.__closed = False
+        with DuckDBSession._connections_lock:
+            entry = DuckDBSession._connections.get(self.__key)
+            if entry is None:
+                if self.__path != self.MEMORY:
+                    os.makedirs(Path(self.__path).parent, exist_ok=True)
+                entry = DuckDBSession._connections[self.__key] = [
+                    duckdb.connect(self.__path, read_only=read_only), 0, uuid.uuid4().hex]
+            entry[1] += 1
+        self.__conn = entry[0]
+        self.__instance = entry[2]
+
+    @classmethod
+    def resolve_path(cls, environment: str = "dev", path: str | Path = None) -> str:
+        """
+        由环境标识符或路径得到数据库路径
+
+        :param environment: 环境标识符
+        :param path: 数据库文件路径，指定时优先使用
+        :return: 数据库文件的绝对路径，内存数据库为 :memory:
+        """
+        if path is not None:
+            return cls.MEMORY if str(path) == cls.MEMORY else str(Path(path).resolve())
+        if environment == "memory":
+            return cls.MEMORY
+        file_name = "main.db" if environment == "dev" else f"{environment}.db"
+        return str(cls.DATA_DIR / file_name)
+
+    @classmethod
+    def close_all(cls) -> None:
+        """关闭注册表中的所有连接，已有的会话随之失效，进程退出时自动调用"""
+        with cls._connections_lock:
+            for conn, _, _ in cls._connections.values():
+                conn.close()
+            cls._connections.clear()
+
+    @property
+    def path(self) -> str:
+        """数据库文件路径"""
+        return self.__path
+
+    @property
+    def instance(self) -> str:
+        """
+        数据库实例标识，每次新建注册表中的连接时生成
+        内存数据库在最后一个会话关闭后即被丢弃，之后同一路径打开的是新的数据库，
+        按数据库缓存的状态（如已建表、权重版本）应以此为键而非 path
         """
-        db_path = Path(__file__).parent.parent.parent.parent / "data" / "main.db"
-        os.makedirs(db_path.parent, exist_ok=True)
-        self.__conn = duckdb.connect(str(db_path))
+        return self.__instance
+
+    @property
+    def read_only(self) -> bool:
+        """是否以只读模式打开，只读会话不能建表或写入"""
+        return self.__read_only
 
     def load_csv(self,
                  file_path: str | Path,
@@ -110,6 +182,15 @@ class DuckDBSession:
         """
         return self.__conn.register(table_name, table_object)
 
+    def unregister_table(self, table_name: str) -> duckdb.DuckDBPyConnection:
+        """
+        取消 register_table 注册的表
+
+        :param table_name: 表名
+        :return: DuckDB 连接对象
+        """
+        return self.__conn.unregister(table_name)
+
     def persist_table(self, source_table_name: str, target_table_name: str,
                       pk_column: str = "id") -> duckdb.DuckDBPyConnection:
         """
@@ -163,16 +244,12 @@ class DuckDBSession:
         :return: DuckDB 连接对象
         """
         if table_object and isinstance(table_object, dict):
-            first_key = next(iter(table_object))
-            if isinstance(first_key, int):
-                key_type = "BIGINT"
-            else:
-                key_type = "VARCHAR"
+            dict_table = self._dict_to_arrow(table_object, pk_column)
+            key_type = "BIGINT" if pyarrow.types.is_integer(dict_table.schema.field(pk_column).type) else "VARCHAR"
 
             self.__conn.execute(
                 f"CREATE OR REPLACE TABLE {table_name} ({pk_column} {key_type} PRIMARY KEY, value VARCHAR)")
-            return self.__conn.executemany(f"INSERT OR REPLACE INTO {table_name} VALUES (?, ?)",
-                                           list(table_object.items()))
+            return self._insert_arrow(dict_table, table_name)
         else:
             self.register_table(table_object, "temp_df")
             return self.persist_table("temp_df", table_name, pk_column)
@@ -190,8 +267,8 @@ class DuckDBSession:
             if not self.get_primary_key_columns(table_name):
                 self.__conn.execute(f"ALTER TABLE {table_name} ADD PRIMARY KEY ({pk_column})")
             if table_object and isinstance(table_object, dict):
-                return self.__conn.executemany(f"INSERT OR REPLACE INTO {table_name} VALUES (?, ?)",
-                                               list(table_object.items()))
+                return self._insert_arrow(self._dict_to_arrow(table_object, pk_column), table_name,
+                                          changed_only_by=pk_column)
             else:
                 self.register_table(table_object, "temp_df")
                 return self.__conn.execute(
@@ -199,6 +276,108 @@ class DuckDBSession:
         else:
             return self.save_table(table_object, table_name, pk_column)
 
+    def append_table(self, table_object: Any, table_name: str) -> duckdb.DuckDBPyConnection:
+        """
+        把数据追加写入 DuckDB 表，表不存在时建表
+
+        :param table_object: pandas DataFrame 或 pyArrow Table
+        :param table_name: 表名
+        :return: DuckDB 连接对象
+        """
+        self.register_table(table_object, "temp_append")
+        try:
+            if not self.table_exists(table_name):
+                return self.__conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM temp_append")
+            return self.__conn.execute(f"INSERT INTO {table_name} SELECT * FROM temp_append")
+        finally:
+            self.__conn.unregister("temp_append")
+
+    def replace_rows(self, table_object: Any, table_name: str, key_column: str,
+                     keys: list) -> duckdb.DuckDBPyConnection:
+        """
+        按键替换 DuckDB 表中的数据：在同一事务内删除指定键的旧行并写入新行，表不存在时建表
+
+        :param table_object: pandas DataFrame 或 pyArrow Table
+        :param table_name: 表名
+        :param key_column: 分区键列名
+        :param keys: 需要替换的键列表
+        :return: DuckDB 连接对象
+        """
+        self.register_table(table_object, "temp_replace")
+        try:
+            if not self.table_exists(table_name):
+                return self.__conn.execute(f"CREATE TABLE {table_name} AS SELECT * FROM temp_replace")
+            # 键以 Arrow 表注册，避免 DuckDB 逐个元素转换 Python 列表参数
+            self.register_table(pyarrow.table({"key": pyarrow.array(list(keys))}), "temp_replace_key")
+            with self.transaction():
+                self.__conn.execute(f"DELETE FROM {table_name} WHERE {key_column} IN (SELECT key FROM temp_replace_key)")
+                self.__conn.execute(f"INSERT INTO {table_name} SELECT * FROM temp_replace")
+            return self.__conn
+        finally:
+            self.__conn.unregister("temp_replace")
+            self.__conn.unregister("temp_replace_key")
+
+    @contextmanager
+    def transaction(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        在显式事务中执行一组写入，正常退出时提交，出现异常时回滚，不支持嵌套
+
+        :return: DuckDB 连接对象
+        """
+        self.__conn.begin()
+        try:
+            yield self.__conn
+        except BaseException:
+            self.__conn.rollback()
+            raise
+        self.__conn.commit()
+
+    @staticmethod
+    def _dict_to_arrow(table_object: dict, pk_column: str) -> pyarrow.Table:
+        """
+        将键值字典转换为两列的 pyArrow Table，按首个键的类型决定主键列类型
+        值列为 VARCHAR，非字符串的值（如数字）按 str() 转换后写入，None 写入 NULL
+
+        :param table_object: 键值字典
+        :param pk_column: 主键
+        :return: pyArrow Table
+        """
+        first_key = next(iter(table_object))
+        key_type = pyarrow.int64() if isinstance(first_key, int) else pyarrow.string()
+        values = list(table_object.values())
+        try:
+            value_array = pyarrow.array(values, type=pyarrow.string())
+        except (pyarrow.ArrowTypeError, pyarrow.ArrowInvalid):
+            # 只有存在非字符串的值时才逐个转换，纯字符串字典不多遍历一次
+            value_array = pyarrow.array([value if value is None or isinstance(value, str) else str(value)
+                                         for value in values], type=pyarrow.string())
+        return pyarrow.table({
+            pk_column: pyarrow.array(list(table_object.keys()), type=key_type),
+            "value": value_array,
+        })
+
+    def _insert_arrow(self, arrow_table: pyarrow.Table, table_name: str,
+                      changed_only_by: str = None) -> duckdb.DuckDBPyConnection:
+        """
+        以单条集合语句将 pyArrow Table 写入已存在的表
+
+        :param arrow_table: pyArrow Table
+        :param table_name: 目标表名
+        :param changed_only_by: 指定主键时只写入新增或值有变化的行
+        :return: DuckDB 连接对象
+        """
+        self.register_table(arrow_table, "temp_arrow")
+        try:
+            if changed_only_by:
+                return self.__conn.execute(f"""
+                    INSERT OR REPLACE INTO {table_name}
+                    SELECT s.* FROM temp_arrow s LEFT JOIN {table_name} t ON s.{changed_only_by} = t.{changed_only_by}
+                    WHERE t.{changed_only_by} IS NULL OR s.value IS DISTINCT FROM t.value
+                """)
+            return self.__conn.execute(f"INSERT OR REPLACE INTO {table_name} SELECT * FROM temp_arrow")
+        finally:
+            self.__conn.unregister("temp_arrow")
+
     def execute_sql(self, sql: str, parameters=None) -> duckdb.DuckDBPyConnection:
         """
         执行 SQL 查询并返回结果
@@ -240,8 +419,42 @@ class DuckDBSession:
         """
         return self.__conn.sql(sql, *args, **kwargs)
 
+    def cursor(self) -> "DuckDBSession":
+        """
+        基于当前连接创建一个游标会话，与当前会话共享同一数据库实例
+        DuckDB 的连接不能被多个线程同时使用，每个线程应使用各自的游标会话
+
+        :return: DuckDBSession 实例，需由调用方关闭
+        """
+        session = object.__new__(DuckDBSession)
+        session.__path = self.__path
+        # 游标不在注册表中，关闭时只关闭游标本身
+        session.__key = None
+        session.__instance = self.__instance
+        session.__read_only = self.__read_only
+        session.__closed = False
+        session.__conn = self.__conn.cursor()
+        return session
+
     def close(self) -> None:
         """
-        关闭 DuckDB 连接
+        关闭会话：释放对共享连接的引用，最后一个会话关闭时关闭连接；重复关闭无影响
         """
-        self.__conn.close()
+        if self.__closed:
+            return
+        self.__closed = True
+        if self.__key is None:
+            self.__conn.close()
+            return
+        with DuckDBSession._connections_lock:
+            entry = DuckDBSession._connections.get(self.__key)
+            # 连接可能已被 close_all 关闭并由新的连接替换
+            if entry is not None and entry[0] is self.__conn:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    entry[0].close()
+                    del DuckDBSession._connections[self.__key]
+
+
+# 进程退出时确定性地关闭所有连接，写入检查点
+atexit.register(DuckDBSession.close_all)
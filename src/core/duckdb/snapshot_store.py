@@ -0,0 +1,131 @@
+# snapshot_store.py
+
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util.logger import logger
+
+
+class DuckDBSnapshotStore:
+    """
+    数据库快照的发布与读取
+    DuckDB 同一数据库文件只允许一个读写进程：写入进程独占 data/main.db 执行各类同步，
+    同步完成后把数据库复制为快照文件并发布；多个服务进程以只读模式打开最新的快照，读吞吐随进程数扩展
+
+    快照先完整写入临时文件，再以 os.replace 原子地改名，最后原子地替换 CURRENT 指针文件，
+    读取方看到的要么是旧快照，要么是完整的新快照；旧快照按保留数量删除，已打开它的进程仍可继续读取
+    """
+    # 默认快照目录
+    DEFAULT_DIR = DuckDBSession.DATA_DIR / "snapshots"
+    # 指针文件名，内容为当前快照的文件名
+    POINTER = "CURRENT"
+    # 快照文件名前缀
+    PREFIX = "snapshot-"
+
+    def __init__(self, directory: str | Path = None, keep: int = 3, temp_grace: float = 3600):
+        """
+        :param directory: 快照目录，默认为 data/snapshots
+        :param keep: 保留的快照数量（含当前快照），旧快照在发布后删除
+        :param temp_grace: 临时文件超过多少秒未修改才视为中断的发布而删除，需大于一次发布的耗时
+        """
+        self.directory = Path(directory or self.DEFAULT_DIR).resolve()
+        self.keep = max(keep, 1)
+        self.temp_grace = temp_grace
+
+    def publish(self, db: DuckDBSession) -> Path:
+        """
+        把数据库复制为新快照并发布，在写入进程中调用
+        复制在一个读事务中完成，得到的是调用时刻的一致视图，期间其他会话的写入不会进入快照
+
+        :param db: 写入进程的数据库会话
+        :return: 新快照的路径
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{self.PREFIX}{time.time_ns()}.db"
+        path = self.directory / name
+        temp_path = self.directory / f"{name}.tmp"
+        start = time.perf_counter()
+
+        catalog = db.execute_sql("SELECT current_database()").fetchone()[0]
+        db.execute_sql(f"ATTACH '{temp_path}' AS snapshot_publish")
+        try:
+            db.execute_sql(f'COPY FROM DATABASE "{catalog}" TO snapshot_publish')
+        except BaseException:
+            db.execute_sql("DETACH snapshot_publish")
+            temp_path.unlink(missing_ok=True)
+            raise
+        # 分离时写入检查点，快照文件不依赖 WAL
+        db.execute_sql("DETACH snapshot_publish")
+        os.replace(temp_path, path)
+        self._write_pointer(name)
+
+        logger.info(f"发布数据库快照: {path.name} ({path.stat().st_size / 2 ** 20:.1f} MiB), "
+                    f"耗时 {time.perf_counter() - start:.3f}s")
+        self.prune()
+        return path
+
+    def current(self) -> Optional[Path]:
+        """
+        读取当前快照的路径
+
+        :return: 快照路径，尚未发布时返回 None
+        """
+        try:
+            name = (self.directory / self.POINTER).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        return self.directory / name if name else None
+
+    def open(self, path: str | Path = None) -> DuckDBSession:
+        """
+        以只读模式打开快照，可在多个进程中同时打开
+
+        :param path: 快照路径，默认为当前快照
+        :return: 只读的 DuckDBSession 实例，需由调用方关闭
+        """
+        path = path or self.current()
+        if path is None:
+            raise FileNotFoundError(f"快照目录中没有已发布的快照: {self.directory}")
+        return DuckDBSession(path=path, read_only=True)
+
+    def prune(self) -> list[Path]:
+        """
+        删除超出保留数量的旧快照与中断的发布留下的临时文件，当前快照始终保留
+        临时文件在 temp_grace 秒内有修改时视为其他发布者正在写入，不删除；
+        文件仍被其他进程打开而无法删除时（如 Windows）跳过，下次发布时重试
+
+        :return: 已删除的文件路径列表
+        """
+        current = self.current()
+        snapshots = sorted(self.directory.glob(f"{self.PREFIX}*.db"), reverse=True)
+        stale = [path for path in snapshots[self.keep:] if path != current]
+        stale += [path for path in self.directory.glob(f"{self.PREFIX}*.db.tmp") if self._abandoned(path)]
+        removed = []
+        for path in stale:
+            try:
+                path.unlink()
+                Path(f"{path}.wal").unlink(missing_ok=True)
+                removed.append(path)
+            except OSError as e:
+                logger.warning(f"旧快照删除失败: {path.name} - 错误: {e}")
+        return removed
+
+    def _abandoned(self, temp_path: Path) -> bool:
+        """临时文件是否已超过 temp_grace 秒未修改，文件已被改名或删除时返回 False"""
+        try:
+            return time.time() - temp_path.stat().st_mtime > self.temp_grace
+        except FileNotFoundError:
+            return False
+
+    def _write_pointer(self, name: str) -> None:
+        """原子地替换指针文件"""
+        pointer = self.directory / self.POINTER
+        temp_pointer = self.directory / f"{self.POINTER}.tmp"
+        with open(temp_pointer, "w", encoding="utf-8") as f:
+            f.write(name)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_pointer, pointer)
@@ -1,8 +1,9 @@
 # duckdb_util
 
+import hashlib
 import json
 from dataclasses import dataclass, asdict
-from typing import Type, Dict, TypeVar, List, Any, get_type_hints
+from typing import Type, Dict, TypeVar, List, Any, Iterable, get_type_hints
 
 import pyarrow
 from duckdb.duckdb import DuckDBPyRelation
@@ -12,6 +13,9 @@ from src.core.duckdb.duckdb_engine import DuckDBSession
 # 泛型定义
 T = TypeVar('T')
 
+# 数据集指纹表，记录每张表最近一次写入数据的哈希
+TABLE_DATASET_FINGERPRINT = "ods_dataset_fingerprint"
+
 
 def rows_into_model_dict(db_relation: DuckDBPyRelation, model_class: Type[T]) -> Dict[Any, T]:
     """
@@ -65,40 +69,125 @@ def rows_into_model_list(db_relation: DuckDBPyRelation, model_class: Type[T]) ->
         return result_list
 
 
+def dataset_fingerprint(data: Any) -> str:
+    """
+    计算数据集的内容哈希
+
+    :param data: 可 json 序列化的数据集
+    :return: sha256 十六进制摘要
+    """
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def batches_fingerprint(batches: Iterable[dict]) -> str:
+    """
+    计算分批字典数据集的内容哈希，只取决于各批按顺序拼接后的词条，与分批方式无关
+
+    :param batches: 可 json 序列化的字典批次
+    :return: sha256 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    for batch in batches:
+        for item in batch.items():
+            digest.update(json.dumps(item, ensure_ascii=False, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def fingerprint_matches(table_name: str, fingerprint: str, duckdb_session: DuckDBSession) -> bool:
+    """
+    判断表中数据是否与给定指纹一致
+
+    :param table_name: DuckDB 中目标表名
+    :param fingerprint: 数据集指纹
+    :param duckdb_session: 已有的 DuckDB 会话实例
+    :return: 目标表存在且最近一次写入的指纹相同
+    """
+    if not duckdb_session.table_exists(table_name) or not duckdb_session.table_exists(TABLE_DATASET_FINGERPRINT):
+        return False
+    row = duckdb_session.execute_sql(f"SELECT value FROM {TABLE_DATASET_FINGERPRINT} WHERE id = ?",
+                                     [table_name]).fetchone()
+    return row is not None and row[0] == fingerprint
+
+
+def save_fingerprint(table_name: str, fingerprint: str, duckdb_session: DuckDBSession):
+    """
+    记录表最近一次写入的数据集指纹
+
+    :param table_name: DuckDB 中目标表名
+    :param fingerprint: 数据集指纹
+    :param duckdb_session: 已有的 DuckDB 会话实例
+    """
+    duckdb_session.upsert_table({table_name: fingerprint}, TABLE_DATASET_FINGERPRINT, "id")
+
+
 def sync_dict_to_duckdb(data_dict: dict[int | str, str], table_name: str, duckdb_session: DuckDBSession,
                         pk_column: str = "id",
-                        overwrite: bool = False):
+                        overwrite: bool = False) -> bool:
     """
-    将实体类列表同步到 DuckDB 表中
+    将实体类列表同步到 DuckDB 表中，数据指纹与上次写入一致时跳过
 
     :param pk_column: 主键
     :param overwrite: 是否覆盖
     :param data_dict: 实体类对象列表（支持 dataclass 或 pydantic 模型）
     :param table_name: DuckDB 中目标表名
     :param duckdb_session: 已有的 DuckDB 会话实例
+    :return: 是否发生写入
     """
     if not data_dict:
-        return
+        return False
+    fingerprint = dataset_fingerprint(data_dict)
+    if fingerprint_matches(table_name, fingerprint, duckdb_session):
+        return False
     if overwrite:
         duckdb_session.save_table(data_dict, table_name)
     else:
         duckdb_session.upsert_table(data_dict, table_name, pk_column)
+    save_fingerprint(table_name, fingerprint, duckdb_session)
+    return True
+
+
+def sync_dict_batches_to_duckdb(batches: List[dict[int | str, str]], table_name: str,
+                                duckdb_session: DuckDBSession, pk_column: str = "id") -> bool:
+    """
+    将分批的键值字典在同一事务中追加同步到 DuckDB 表中，整个数据集的指纹与上次写入一致时跳过
+
+    :param batches: 键值字典批次
+    :param table_name: DuckDB 中目标表名
+    :param duckdb_session: 已有的 DuckDB 会话实例
+    :param pk_column: 主键
+    :return: 是否发生写入
+    """
+    if not batches:
+        return False
+    batches = [batch for batch in batches if batch]
+    if not batches:
+        return False
+    fingerprint = batches_fingerprint(batches)
+    if fingerprint_matches(table_name, fingerprint, duckdb_session):
+        return False
+    with duckdb_session.transaction():
+        for batch in batches:
+            duckdb_session.upsert_table(batch, table_name, pk_column)
+        save_fingerprint(table_name, fingerprint, duckdb_session)
+    return True
 
 
 def sync_list_to_duckdb(items: List[dataclass], table_name: str, duckdb_session: DuckDBSession,
                         pk_column: str = "id",
-                        overwrite: bool = True):
+                        overwrite: bool = True) -> bool:
     """
-    将实体类列表同步到 DuckDB 表中
+    将实体类列表同步到 DuckDB 表中，数据指纹与上次写入一致时跳过
 
     :param pk_column: 主键
     :param overwrite: 是否覆盖
     :param items: 实体类对象列表（支持 dataclass 或 pydantic 模型）
     :param table_name: DuckDB 中目标表名
     :param duckdb_session: 已有的 DuckDB 会话实例
+    :return: 是否发生写入
     """
     if not items:
-        return
+        return False
 
     # 处理一阶字典，序列化为json存储
     pylist = []
@@ -109,9 +198,15 @@ def sync_list_to_duckdb(items: List[dataclass], table_name: str, duckdb_session:
                 pdict[k] = json.dumps(v, ensure_ascii=False)
         pylist.append(pdict)
 
+    fingerprint = dataset_fingerprint(pylist)
+    if fingerprint_matches(table_name, fingerprint, duckdb_session):
+        return False
+
     # 转换为字典列表
     pt = pyarrow.Table.from_pylist(pylist)
     if overwrite:
         duckdb_session.save_table(pt, table_name)
     else:
         duckdb_session.upsert_table(pt, table_name, pk_column)
+    save_fingerprint(table_name, fingerprint, duckdb_session)
+    return True
@@ -1,7 +1,7 @@
 # http_util.py
 
 import json
-from typing import Callable, TypeVar
+from typing import Callable, TypeVar, Awaitable, Any
 
 import httpx
 
@@ -9,6 +9,9 @@ from src.core.util.logger import logger
 
 T = TypeVar("T")
 
+# 条件请求命中（HTTP 304）时返回的标记，表示数据自上次获取后未变更
+NOT_MODIFIED = object()
+
 
 async def fetch_and_parse(
         client: httpx.AsyncClient,
@@ -18,10 +21,12 @@ async def fetch_and_parse(
         *,
         params=None,
         headers=None,
-        auth=None):
+        auth=None,
+        validators: dict[str, dict[str, str]] = None):
     """
     获取并解析数据
 
+    :param validators: 按URL保存的条件请求校验器（ETag / Last-Modified），传入时发起条件请求并回写新的校验器
     :param auth:
     :param params: URL参数
     :param headers: URL头
@@ -29,14 +34,18 @@ async def fetch_and_parse(
     :param url: 请求的URL或本地文件路径
     :param parser: 解析函数
     :param data_type: 数据类型 ("json" 或 "text")
-    :return: 解析后的数据或 None
+    :return: 解析后的数据，数据未变更时返回 NOT_MODIFIED，失败时返回 None
     """
     # 根据URL协议类型决定使用哪种方式获取数据
     if url.startswith("http"):
-        raw_data = await fetch_http_data(client, url, data_type=data_type, params=params, headers=headers, auth=auth)
+        raw_data = await fetch_http_data(client, url, data_type=data_type, params=params, headers=headers, auth=auth,
+                                         validators=validators)
     else:
         raw_data = fetch_local_data(url, data_type=data_type)
 
+    if raw_data is NOT_MODIFIED:
+        logger.info(f"数据未变更，跳过解析: {url}")
+        return NOT_MODIFIED
     if not raw_data:
         logger.error(f"无法获取数据:{url}")
         return None
@@ -49,7 +58,7 @@ async def fetch_and_parse(
 
 
 async def fetch_http_data(client: httpx.AsyncClient, url: str, data_type: str = "json", *, params=None, headers=None,
-                          auth=None):
+                          auth=None, validators: dict[str, dict[str, str]] = None):
     """
     获取HTTP数据
 
@@ -59,14 +68,23 @@ async def fetch_http_data(client: httpx.AsyncClient, url: str, data_type: str =
     :param params: URL参数
     :param auth: 认证信息
     :param data_type: 数据类型 ("json" 或 "text")
-    :return: 解析后的数据或原始文本
+    :param validators: 按URL保存的条件请求校验器，传入时发起条件请求并回写新的校验器
+    :return: 解析后的数据或原始文本，数据未变更时返回 NOT_MODIFIED
     """
     logger.info(f"使用远端网络地址: {url}")
+    if validators is not None:
+        headers = {**(headers or {}), **conditional_headers(validators.get(url))}
     try:
         response = await client.get(url, params=params, headers=headers, auth=auth, timeout=100)
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            logger.info(f"请求成功，数据未变更")
+            return NOT_MODIFIED
         response.raise_for_status()
         logger.info(f"请求成功")
 
+        if validators is not None:
+            update_validators(validators, url, response)
+
         if data_type == "json":
             return response.json()
         else:  # text/csv
@@ -76,6 +94,91 @@ async def fetch_http_data(client: httpx.AsyncClient, url: str, data_type: str =
         return {} if data_type == "json" else ""
 
 
+async def fetch_and_stream(
+        client: httpx.AsyncClient,
+        url: str,
+        consumer: Callable[[str], Awaitable[Any]],
+        chunk_size: int = 65536,
+        *,
+        params=None,
+        headers=None,
+        auth=None,
+        validators: dict[str, dict[str, str]] = None):
+    """
+    流式获取文本数据，逐块交给 consumer 处理，不在内存中保留完整响应
+
+    :param client: httpx.AsyncClient 实例
+    :param url: 请求的URL或本地文件路径
+    :param consumer: 处理文本块的异步回调
+    :param chunk_size: 每块的字符数
+    :param params: URL参数
+    :param headers: URL头
+    :param auth: 认证信息
+    :param validators: 按URL保存的条件请求校验器，传入时发起条件请求并回写新的校验器
+    :return: 成功时返回 True，数据未变更时返回 NOT_MODIFIED，失败时返回 False
+    """
+    if not url.startswith("http"):
+        logger.info(f"使用本地文件地址: {url}")
+        try:
+            with open(url, 'r', encoding='utf-8') as f:
+                while chunk := f.read(chunk_size):
+                    await consumer(chunk)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"文件未找到: {url}")
+        return True
+
+    logger.info(f"使用远端网络地址: {url}")
+    if validators is not None:
+        headers = {**(headers or {}), **conditional_headers(validators.get(url))}
+    try:
+        async with client.stream("GET", url, params=params, headers=headers, auth=auth, timeout=100) as response:
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                logger.info(f"请求成功，数据未变更")
+                return NOT_MODIFIED
+            response.raise_for_status()
+            async for chunk in response.aiter_text(chunk_size):
+                await consumer(chunk)
+            logger.info(f"请求成功")
+
+            if validators is not None:
+                update_validators(validators, url, response)
+        return True
+    except httpx.HTTPError as e:
+        logger.error(f"请求失败: {url} - 错误: {e}")
+        return False
+
+
+def conditional_headers(validator: dict[str, str] | None) -> dict[str, str]:
+    """
+    根据校验器构造条件请求头
+
+    :param validator: 包含 etag / last_modified 的校验器
+    :return: 条件请求头
+    """
+    if not validator:
+        return {}
+    headers = {}
+    if validator.get("etag"):
+        headers["If-None-Match"] = validator["etag"]
+    if validator.get("last_modified"):
+        headers["If-Modified-Since"] = validator["last_modified"]
+    return headers
+
+
+def update_validators(validators: dict[str, dict[str, str]], url: str, response: httpx.Response):
+    """
+    从响应头中提取新的校验器
+
+    :param validators: 按URL保存的校验器字典
+    :param url: 请求的URL
+    :param response: 响应对象
+    """
+    validator = {k: v for k, v in (("etag", response.headers.get("ETag")),
+                                   ("last_modified", response.headers.get("Last-Modified"))) if v}
+    if validator:
+        validators[url] = validator
+
+
 def fetch_local_data(file_path: str, data_type: str = "json"):
     """
     获取本地数据
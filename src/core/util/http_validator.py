@@ -0,0 +1,40 @@
+# http_validator.py
+
+import json
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util.duckdb_util import sync_dict_to_duckdb
+
+
+class HttpValidatorStore:
+    """
+    HTTP 条件请求校验器（ETag / Last-Modified）的持久化存储
+    以 URL 为键，校验器序列化为 json 存入 DuckDB
+    """
+    # 表名常量定义
+    TABLE_HTTP_VALIDATOR = "ods_http_validator"
+
+    @classmethod
+    def get(cls, url: str, db: DuckDBSession) -> dict[str, dict[str, str]]:
+        """
+        读取指定 URL 的校验器
+
+        :param url: 请求的URL
+        :param db: DuckDB 会话
+        :return: 可直接传给 fetch_and_parse 的校验器字典
+        """
+        if not db.table_exists(cls.TABLE_HTTP_VALIDATOR):
+            return {}
+        row = db.execute_sql(f"SELECT value FROM {cls.TABLE_HTTP_VALIDATOR} WHERE id = ?", [url]).fetchone()
+        return {url: json.loads(row[0])} if row else {}
+
+    @classmethod
+    def sync(cls, validators: dict[str, dict[str, str]], db: DuckDBSession):
+        """
+        保存校验器，应在对应数据成功入库后调用
+
+        :param validators: 按URL保存的校验器字典
+        :param db: DuckDB 会话
+        """
+        data = {url: json.dumps(validator) for url, validator in validators.items() if validator}
+        sync_dict_to_duckdb(data, cls.TABLE_HTTP_VALIDATOR, db, overwrite=False)
@@ -0,0 +1,54 @@
+# interning.py
+
+import dataclasses
+import functools
+import sys
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def intern_text(value: str | None) -> str | None:
+    """
+    驻留字符串，重复出现的名称与图标共享同一实例
+
+    :param value: 字符串，None 原样返回
+    :return: 驻留后的字符串
+    """
+    return sys.intern(value) if value is not None else None
+
+
+# 共享的整数 ID，相同取值返回同一实例；缓存不淘汰，只用于取值范围有限的 ID（如副词条 ID）
+shared_id = functools.cache(int)
+
+
+def compact_dataclass(cls: type[T], frozen: bool = False) -> type[T]:
+    """
+    生成数据类的紧凑表示：字段保存在 __slots__ 中的子类，类名为 Compact<类名>，需赋值给所在模块的同名属性以支持 pickle
+    isinstance 判断与字段访问与原类一致，与字段相同的原类实例比较相等；原类本身不受影响
+
+    :param cls: 数据类
+    :param frozen: 是否在构造后禁止修改字段，用于多处共享的实例
+    :return: 紧凑表示的数据类
+    """
+    names = tuple(field.name for field in dataclasses.fields(cls))
+
+    def __eq__(self, other):
+        if not isinstance(other, cls):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in names)
+
+    namespace = {"__doc__": f"{cls.__doc__}（紧凑表示）", "__module__": cls.__module__, "__eq__": __eq__}
+    if frozen:
+        # 子类不能声明为 frozen 数据类，改为只允许 __init__ 为尚未赋值的字段赋值
+        def __setattr__(self, name, value):
+            if hasattr(self, name):
+                raise dataclasses.FrozenInstanceError(f"cannot assign to field {name!r}")
+            object.__setattr__(self, name, value)
+
+        def __delattr__(self, name):
+            raise dataclasses.FrozenInstanceError(f"cannot delete field {name!r}")
+
+        namespace.update(__setattr__=__setattr__, __delattr__=__delattr__)
+    compact = type(f"Compact{cls.__name__}", (cls,), namespace)
+    return dataclasses.dataclass(slots=True, eq=False)(compact)
@@ -0,0 +1,112 @@
+# numeric.py
+
+import functools
+import math
+from decimal import Decimal
+from enum import StrEnum
+from typing import Any, Callable
+
+
+class NumericMode(StrEnum):
+    """数值计算模式"""
+    # 精确十进制，用于展示
+    DECIMAL = "decimal"
+    # 双精度浮点，用于批量评分
+    FLOAT = "float"
+
+
+class DecimalBackend:
+    """Decimal 数值后端，结果精确，与原有实现一致"""
+    mode = NumericMode.DECIMAL
+    zero = Decimal(0)
+    one = Decimal(1)
+
+    @staticmethod
+    def number(value: Any) -> Decimal:
+        """将接口数值转换为计算用的数值"""
+        return value if isinstance(value, Decimal) else Decimal(str(value))
+
+    @staticmethod
+    def constant(value: Decimal) -> Decimal:
+        """将算法常量转换为计算用的数值"""
+        return value
+
+    @staticmethod
+    def round(value: Decimal, digits: int, bias: int = 0) -> Decimal:
+        """按 ROUND_HALF_EVEN 保留指定位小数，Decimal 运算已精确体现偏差方向，忽略 bias"""
+        return round(value, digits)
+
+
+class FloatBackend:
+    """浮点数值后端，取整结果与 DecimalBackend 在保留位数上一致"""
+    mode = NumericMode.FLOAT
+    zero = 0.0
+    one = 1.0
+    # 与进位中点的距离小于该值时视为名义上的中点
+    TIE_TOLERANCE = 1e-9
+
+    @staticmethod
+    def number(value: Any) -> float:
+        """将接口数值转换为计算用的数值"""
+        return float(value)
+
+    @staticmethod
+    def constant(value: Decimal) -> float:
+        """将算法常量转换为计算用的数值"""
+        return float(value)
+
+    @classmethod
+    def round(cls, value: float, digits: int, bias: int = 0) -> float:
+        """
+        模拟 Decimal 的 ROUND_HALF_EVEN 保留指定位小数
+
+        :param value: 待取整的数值
+        :param digits: 保留的小数位数
+        :param bias: 名义中点的舍入方向，1 向上，-1 向下，0 取偶数；
+                     对应 Decimal 计算中由浮点构造的系数带来的偏差
+        :return: 取整后的数值
+        """
+        scale = 10 ** digits
+        scaled = value * scale
+        floor = math.floor(scaled)
+        if abs(scaled - floor - 0.5) < cls.TIE_TOLERANCE:
+            if bias > 0:
+                floor += 1
+            elif bias == 0:
+                floor += floor % 2
+            return floor / scale
+        return round(scaled) / scale
+
+
+# 数值模式到后端的查找表，StrEnum 与等值字符串哈希相同，可直接用字符串查找
+_BACKENDS = {
+    NumericMode.DECIMAL: DecimalBackend,
+    NumericMode.FLOAT: FloatBackend,
+}
+
+
+def numeric_backend(mode: NumericMode | str) -> type[DecimalBackend] | type[FloatBackend]:
+    """
+    获取数值模式对应的后端
+
+    :param mode: 数值模式
+    :return: 数值后端
+    """
+    # 解析时逐个对象调用，先按原值查表，非法取值再交给 NumericMode 报错
+    backend = _BACKENDS.get(mode)
+    return backend if backend is not None else _BACKENDS[NumericMode(mode)]
+
+
+# 共享数值缓存的容量，超出后按最近最少使用淘汰
+SHARED_NUMBER_CACHE_SIZE = 1 << 16
+
+
+@functools.cache
+def shared_number(mode: NumericMode | str) -> Callable[[Any], Decimal | float]:
+    """
+    获取带缓存的数值转换函数，相同类型与取值的接口数值返回同一实例，用于紧凑表示
+
+    :param mode: 数值模式
+    :return: 与后端 number 等价的转换函数
+    """
+    return functools.lru_cache(maxsize=SHARED_NUMBER_CACHE_SIZE, typed=True)(numeric_backend(mode).number)
@@ -0,0 +1,49 @@
+# rate_limiter.py
+
+import time
+
+import anyio
+
+
+class TokenBucket:
+    """
+    令牌桶限流器，用于控制单位时间内的请求数
+    令牌按固定速率补充，桶容量决定允许的突发请求数
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        初始化令牌桶
+
+        :param rate: 每秒补充的令牌数
+        :param capacity: 桶容量（最大突发请求数）
+        """
+        if rate <= 0:
+            raise ValueError(f"令牌补充速率必须大于0: {rate}")
+        self._rate = rate
+        self._capacity = max(capacity, 1)
+        self._tokens = float(self._capacity)
+        self._updated_at = time.monotonic()
+        self._lock = anyio.Lock()
+
+    def _refill(self):
+        """按流逝时间补充令牌"""
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """获取一个令牌，令牌不足时等待补充"""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await anyio.sleep((1 - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return None
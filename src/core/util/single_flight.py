@@ -0,0 +1,69 @@
+# single_flight.py
+
+from typing import Any, Awaitable, Callable, Hashable
+
+import anyio
+from anyio.abc import TaskGroup
+
+
+class CallCancelledError(Exception):
+    """调用在完成前被取消（如应用关闭时任务组被取消），等待中的调用方收到此异常"""
+
+
+class _Call:
+    """一次进行中的调用"""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = anyio.Event()
+        self.result = None
+        self.error: Exception | None = None
+
+
+class SingleFlight:
+    """
+    合并同一键的并发调用：同一时刻每个键只执行一次，期间到达的调用方等待并共享同一结果或异常
+
+    调用在传入的任务组中执行，与发起请求的调用方解耦：
+    某个调用方被取消（如客户端断开）不会中断调用，也不会把取消传给其他调用方
+    """
+
+    def __init__(self, task_group: TaskGroup):
+        """
+        :param task_group: 执行调用的任务组，通常由应用的 lifespan 持有
+        """
+        self._task_group = task_group
+        self._calls: dict[Hashable, _Call] = {}
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args) -> Any:
+        """
+        执行或加入一次调用
+
+        :param key: 合并的键，相同键的并发调用只执行一次
+        :param func: 异步函数
+        :param args: 位置参数，只有发起调用时使用
+        :return: 调用结果，调用失败时每个调用方都抛出同一异常，调用被取消时抛出 CallCancelledError
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call()
+            self._task_group.start_soon(self._run, key, call, func, *args)
+        await call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def _run(self, key: Hashable, call: _Call, func: Callable[..., Awaitable[Any]], *args) -> None:
+        try:
+            call.result = await func(*args)
+        except Exception as e:
+            call.error = e
+        except BaseException as e:
+            # 取消不能在其他任务中原样抛出，等待方改为收到 CallCancelledError，取消本身继续向上传递
+            call.error = CallCancelledError(f"调用被取消: {key!r}")
+            call.error.__cause__ = e
+            raise
+        finally:
+            # 先移除再通知，之后到达的调用方发起新的调用，不会拿到过期结果
+            del self._calls[key]
+            call.done.set()
@@ -0,0 +1,76 @@
+# asset_write_bench.py
+
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable
+
+import duckdb
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.enka.loc_bench import DEFAULT_LOC_FILE
+
+TABLE_NAME = "bench_loc"
+
+
+def load_entries(loc_file: str | Path = DEFAULT_LOC_FILE) -> dict[str, str]:
+    """读取 loc.json 中所有语言的词条，键加上语言前缀避免重复"""
+    data = json.loads(Path(loc_file).read_text(encoding="utf-8"))
+    return {f"{lang}:{key}": value for lang, entries in data.items() for key, value in entries.items()}
+
+
+def save_executemany(entries: dict[str, str]) -> None:
+    """改为 Arrow 批量写入之前的方式：建表后逐行 executemany，DuckDBSession 不再提供该接口，直接使用内存连接"""
+    with duckdb.connect() as conn:
+        conn.execute(f"CREATE OR REPLACE TABLE {TABLE_NAME} (id VARCHAR PRIMARY KEY, value VARCHAR)")
+        conn.executemany(f"INSERT OR REPLACE INTO {TABLE_NAME} VALUES (?, ?)", list(entries.items()))
+
+
+def measure(func: Callable[[], object], number: int = 1, repeat: int = 5) -> float:
+    """
+    测量耗时
+
+    :param func: 被测函数
+    :param number: 每轮调用次数
+    :param repeat: 轮数，取最快的一轮
+    :return: 每次调用的毫秒数
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e3
+
+
+def main(loc_file: str | Path = DEFAULT_LOC_FILE) -> None:
+    """
+    对比键值字典逐行写入与经 _dict_to_arrow / _insert_arrow 批量写入 DuckDB 的耗时，使用内存数据库
+
+    :param loc_file: loc.json 路径
+    """
+    entries = load_entries(loc_file)
+    changed = {key: f"{value}*" for key, value in entries.items()}
+    numbers = {key: index for index, key in enumerate(entries)}
+    db = DuckDBSession("memory")
+    try:
+        table = DuckDBSession._dict_to_arrow(entries, "id")
+        results = {
+            "_dict_to_arrow": measure(lambda: DuckDBSession._dict_to_arrow(entries, "id"), number=20),
+            # 值不全是字符串时回退为逐个 str() 转换
+            "_dict_to_arrow int": measure(lambda: DuckDBSession._dict_to_arrow(numbers, "id"), number=20),
+            "save_table": measure(lambda: db.save_table(entries, TABLE_NAME)),
+            "_insert_arrow": measure(lambda: db._insert_arrow(table, TABLE_NAME)),
+            "upsert unchanged": measure(lambda: db.upsert_table(entries, TABLE_NAME, "id")),
+            "save + upsert all": measure(lambda: (db.save_table(entries, TABLE_NAME),
+                                               db.upsert_table(changed, TABLE_NAME, "id"))),
+            "executemany": measure(lambda: save_executemany(entries), repeat=1),
+        }
+        assert db.execute_sql(f"SELECT count(*) FROM {TABLE_NAME}").fetchone()[0] == len(entries)
+    finally:
+        db.close()
+
+    print(f"{Path(loc_file).name}: {len(entries):,} entries")
+    print(f"{'operation':<20} {'ms':>9}")
+    for name, ms in results.items():
+        print(f"{name:<20} {ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
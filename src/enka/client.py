@@ -1,27 +1,74 @@
-from typing import Optional
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Iterable, AsyncIterator
 
+import anyio
 import httpx
 
+from src.core.duckdb.async_duckdb import AsyncDuckDBSession
 from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util.numeric import NumericMode
 from src.enka.config.constants import Language
 from src.enka.model.player import Player
 from src.enka.stage.api_parser import EnkaParser
 from src.enka.stage.asset_parser import EnkaAssetParser
+from src.enka.stage.bulk_parser import EnkaBulkParser, BulkParseStats
+from src.enka.stage.loc_stream_parser import EnkaLocStreamParser
+from src.enka.stage.player_cache import EnkaPlayerCache
+from src.enka.stage.player_synchronizer import EnkaPlayerSynchronizer
 from src.enka.stage.synchronizer import EnkaAssetSynchronizer
 from src.enka.stage.text_displayer import EnkaTextDisplayer
 from src.enka.api import EnkaApi
-from src.core.util.duckdb_util import rows_into_model_dict
-from src.core.util.http_util import fetch_and_parse
+from src.core.util.http_util import fetch_and_parse, fetch_and_stream, NOT_MODIFIED
+from src.core.util.http_validator import HttpValidatorStore
+from src.core.util.logger import logger
+from src.core.util.rate_limiter import TokenBucket
+
+
+@dataclass
+class PlayerFetchResult:
+    """批量获取玩家信息的单条结果"""
+    # 玩家 UID
+    uid: str
+    # 解析后的玩家信息，失败时为 None
+    player: Optional[Player] = None
+    # 失败原因
+    error: Optional[Exception] = None
+    # 是否从 Enka 获取且与上次的响应不同，只有这样的结果写入快照表
+    changed: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class EnkaClient:
 
-    def __init__(self, lang: Language | str, proxy: str = None):
-        self._db = None
+    def __init__(self, lang: Language | str, proxy: str = None, player_cache: EnkaPlayerCache = None,
+                 numeric: NumericMode = NumericMode.DECIMAL, compact: bool = False, db: DuckDBSession = None):
+        """
+        :param lang: 语言
+        :param proxy: 代理地址
+        :param player_cache: 玩家接口响应缓存
+        :param numeric: 玩家属性值的数值模式，批量评分时可使用 FLOAT
+        :param compact: 是否以紧凑表示保存玩家信息，大量玩家常驻内存时使用，见 memory_bench
+        :param db: 数据库会话，由调用方负责关闭；默认在首次使用时打开 dev 环境的共享连接，退出时关闭
+        """
+        self._db = db
+        self._owns_db = db is None
+        self._adb = None
+        # replace_db 替换下来、等待进行中的查询完成后关闭的 (会话, 异步外观)
+        self._retired: list[tuple[Optional[DuckDBSession], Optional[AsyncDuckDBSession]]] = []
+        self._numeric = numeric
+        self._compact = compact
         self._client = httpx.AsyncClient(proxy=proxy)
         self._lang = self._convert_lang(lang)
         self._asset_map = {}
+        self._asset_generation = None
         self._player = None
+        self._player_cache = player_cache or EnkaPlayerCache()
 
     def _convert_lang(self, lang: Language | str) -> Language:
         """针对不支持的语言报错"""
@@ -33,23 +80,152 @@ class EnkaClient:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """关闭 httpx 客户端与客户端持有的数据库会话，不在 async with 中使用客户端时由调用方执行"""
         await self._client.aclose()
+        if self._adb is not None:
+            self._adb.close()
+            self._adb = None
+        if self._owns_db and self._db is not None:
+            self._db.close()
+            self._db = None
+        self._close_retired(0)
+
+    async def replace_db(self, db: DuckDBSession) -> None:
+        """
+        切换到新的数据库会话，如服务进程切换到新发布的只读快照，新会话由客户端持有并负责关闭
+        静态资源先在工作线程中从新会话载入再切换，不阻塞事件循环；旧会话保留到下一次切换时再关闭，进行中的查询可以继续完成
+
+        :param db: 新的数据库会话
+        """
+        assets = await anyio.to_thread.run_sync(self._read_assets, db)
+        self._close_retired(1)
+        if self._db is not None:
+            self._retired.append((self._db if self._owns_db else None, self._adb))
+        self._db = db
+        self._owns_db = True
+        self._adb = None
+        # 替换为新的字典，进行中的解析继续使用旧的静态资源
+        self._asset_map = {**self._asset_map, **assets}
+        self._asset_generation = EnkaAssetSynchronizer.generation(db)
 
-    async def fetch_assets(self):
-        """从enka获取最新的静态资源"""
-        self._db = DuckDBSession()
-        for name in ("character", "name_card", "pfp", "loc"):
-            data = await fetch_and_parse(
-                client=self._client,
-                url=EnkaApi.get_url(name),
-                parser=lambda data: EnkaAssetParser.parse(name, data, self._lang)
-            )
-            # 同步入库并从数据库重新载入缓存
-            EnkaAssetSynchronizer.sync(name, data, self._db)
-            self._asset_map[name] = EnkaAssetSynchronizer.get(name, self._db)
+    def _close_retired(self, keep: int) -> None:
+        """关闭被替换下来的会话，只保留最近的 keep 个"""
+        while len(self._retired) > keep:
+            db, adb = self._retired.pop(0)
+            if adb is not None:
+                adb.close()
+            if db is not None:
+                db.close()
 
+    async def fetch_assets(self, max_concurrency: int = 4, stream_loc: bool = True):
+        """
+        从enka并发获取最新的静态资源
+
+        下载与解析按到达顺序并发进行，写库操作经 AsyncDuckDBSession 的单个写入者在工作线程中串行执行
+
+        :param max_concurrency: 同时下载的最大资源数，为 1 时退化为顺序获取
+        :param stream_loc: 是否流式解析 loc.json，只保留当前语言并在同一事务中分批入库
+        :return: 静态资源字典
+        """
+        if self._db is None:
+            self._db = DuckDBSession()
+        if self.read_only:
+            raise ValueError("只读会话不能同步静态资源，请在写入进程中执行 fetch_assets()")
+        limiter = anyio.CapacityLimiter(max_concurrency)
+        timings = {}
+
+        start = time.perf_counter()
+        async with anyio.create_task_group() as tg:
+            for name in ("character", "name_card", "pfp", "loc"):
+                tg.start_soon(self._fetch_asset, name, limiter, timings, stream_loc)
+
+        for name, (fetch_time, sync_time) in timings.items():
+            logger.info(f"静态资源 {name}: 下载解析 {fetch_time:.3f}s, 入库 {sync_time:.3f}s")
+        logger.info(f"静态资源获取总耗时: {time.perf_counter() - start:.3f}s")
+        self._asset_generation = EnkaAssetSynchronizer.generation(self._db)
         return self._asset_map
 
+    async def _fetch_asset(self, name: str, limiter: anyio.CapacityLimiter,
+                           timings: dict[str, tuple[float, float]], stream_loc: bool = False):
+        """
+        获取单个静态资源，并串行化同步入库
+
+        :param name: 资源名称
+        :param limiter: 并发下载限制器
+        :param timings: 各资源耗时统计（下载解析, 入库）
+        :param stream_loc: 是否流式解析 loc.json
+        """
+        url = EnkaApi.get_url(name)
+        # 本地已有数据时才发起条件请求，避免 304 后无数据可载入
+        validators = await self.adb.read(
+            lambda db: HttpValidatorStore.get(url, db) if EnkaAssetSynchronizer.exists(name, db) else {})
+
+        streamed = name == "loc" and stream_loc
+        async with limiter:
+            start = time.perf_counter()
+            if streamed:
+                data = await self._stream_loc(url, validators)
+            else:
+                data = await fetch_and_parse(
+                    client=self._client,
+                    url=url,
+                    parser=lambda data: EnkaAssetParser.parse(name, data, self._lang),
+                    validators=validators
+                )
+            fetched = time.perf_counter()
+
+        def sync(db: DuckDBSession) -> dict:
+            if streamed:
+                EnkaAssetSynchronizer.sync_loc_batches(data, db)
+            else:
+                EnkaAssetSynchronizer.sync(name, data, db)
+            if data:
+                HttpValidatorStore.sync(validators, db)
+            return EnkaAssetSynchronizer.get(name, db)
+
+        # 同步入库并从数据库重新载入缓存
+        sync_start = time.perf_counter()
+        if data is NOT_MODIFIED:
+            # 数据未变更，跳过入库
+            if name not in self._asset_map:
+                asset = await self.adb.read(EnkaAssetSynchronizer.get, name)
+                if asset:
+                    self._asset_map[name] = asset
+        else:
+            self._asset_map[name] = await self.adb.write(sync)
+        timings[name] = (fetched - start, time.perf_counter() - sync_start)
+
+    async def _stream_loc(self, url: str, validators: dict[str, dict[str, str]], batch_size: int = 5000):
+        """
+        流式下载 loc.json，只反序列化当前语言的词条并按批收集
+        词条在下载完成后由 EnkaAssetSynchronizer.sync_loc_batches 在同一事务中入库，下载中途失败时不写入任何批次
+
+        :param url: loc.json 地址
+        :param validators: 条件请求校验器
+        :param batch_size: 每批入库的词条数
+        :return: 成功时返回词条批次列表，数据未变更时返回 NOT_MODIFIED，失败时返回 False
+        """
+        parser = EnkaLocStreamParser([self._lang])
+        batches = [{}]
+
+        def add(entries):
+            for _, key, value in entries:
+                if len(batches[-1]) >= batch_size:
+                    batches.append({})
+                batches[-1][key] = value
+
+        async def consume(chunk: str):
+            add(parser.feed(chunk))
+
+        result = await fetch_and_stream(self._client, url, consume, validators=validators)
+        if result is not True:
+            return result
+        add(parser.close())
+        return batches
+
     def refresh_asset(self, name):
         """从本地数据库获取静态资源"""
         data = EnkaAssetSynchronizer.get(name, self._db)
@@ -58,39 +234,221 @@ class EnkaClient:
         return
 
     def refresh_assets(self):
-        """从本地数据库获取静态资源"""
-        self._db = DuckDBSession()
-        self.refresh_asset("loc")
-        self.refresh_asset("name_card")
-        self.refresh_asset("pfp")
-        self.refresh_asset("character")
+        """从本地数据库获取静态资源，资源代数未变化时直接复用内存中的缓存"""
+        if self._db is None:
+            self._db = DuckDBSession()
+        generation = EnkaAssetSynchronizer.generation(self._db)
+        if self._asset_map and self._asset_generation == generation:
+            return
+        self._asset_map.update(self._read_assets(self._db))
+        self._asset_generation = generation
         return
 
-    async def fetch_player(self, uid: str) -> Optional[Player]:
+    async def refresh_assets_async(self):
+        """refresh_assets 的异步版本，在工作线程中读取数据库，不阻塞事件循环"""
+        if self._db is None:
+            self._db = DuckDBSession()
+        db = self._db
+        generation = EnkaAssetSynchronizer.generation(db)
+        if self._asset_map and self._asset_generation == generation:
+            return
+        assets = await self.adb.read(self._read_assets)
+        # 读取期间切换了数据库时以切换时载入的静态资源为准
+        if self._db is db:
+            self._asset_map = {**self._asset_map, **assets}
+            self._asset_generation = generation
+        return
+
+    @staticmethod
+    def _read_assets(db: DuckDBSession) -> dict:
+        """读取数据库中的全部静态资源，不包含为空的资源"""
+        assets = {}
+        for name in ("loc", "name_card", "pfp", "character"):
+            data = EnkaAssetSynchronizer.get(name, db)
+            if data:
+                assets[name] = data
+        return assets
+
+    async def fetch_player(self, uid: str, use_cache: bool = True) -> Optional[Player]:
         """
         从enka获取最新的玩家信息
 
         :param uid: 玩家 UID
+        :param use_cache: 是否优先使用 TTL 内的本地缓存
         :return: Player 实例 或 None
         """
-        self.refresh_assets()
-        self._player = await fetch_and_parse(
+        await self.refresh_assets_async()
+        self._player, changed = await self._fetch_player(uid, use_cache)
+        # 命中缓存或响应未变化时不追加重复的快照，避免挤掉较早的快照；只读会话的快照表由写入进程维护
+        if changed and not self.read_only:
+            await self.adb.write(EnkaPlayerSynchronizer.sync, [self._player])
+        return self._player
+
+    async def _fetch_player(self, uid: str, use_cache: bool = True) -> tuple[Optional[Player], bool]:
+        """
+        使用已载入的静态资源获取并解析玩家信息
+
+        :param uid: 玩家 UID
+        :param use_cache: 是否优先使用 TTL 内的本地缓存
+        :return: (Player 实例 或 None, 是否从 Enka 获取且与上次的响应不同)
+        """
+        if use_cache:
+            player = await self._load_cached_player(uid)
+            if player:
+                return player, False
+
+        data = await fetch_and_parse(
             client=self._client,
             url=EnkaApi.get_player_url(uid),
-            parser=lambda data: EnkaParser.parse_player(data, self._asset_map)
+            parser=lambda data: data
         )
-        return self._player
+        if not data:
+            return None, False
+        # 写入响应缓存后解析玩家信息，只读会话时写入进程内缓存
+        changed = await self.adb.write(self._player_cache.put, uid, data)
+        return EnkaParser.parse_player(data, self._asset_map, self._numeric, self._compact), changed
+
+    async def _load_cached_player(self, uid: str) -> Optional[Player]:
+        """从 TTL 内的本地缓存解析玩家信息，未命中时返回 None"""
+        data = await self.adb.read(self._player_cache.get, uid)
+        return EnkaParser.parse_player(data, self._asset_map, self._numeric, self._compact) if data else None
 
-    def refresh_player(self):
+    @asynccontextmanager
+    async def fetch_players(self, uids: Iterable[str], max_concurrency: int = 4,
+                            rate: float = 1.0, burst: int = 1,
+                            use_cache: bool = True,
+                            snapshot_batch_size: int = 100) -> AsyncIterator[AsyncIterator[PlayerFetchResult]]:
         """
-        从本地数据库获取玩家信息
+        批量并发获取玩家信息，以异步上下文管理器的形式返回按完成顺序产出结果的迭代器：
 
-        :return: Player 实例 或 None
+            async with client.fetch_players(uids) as results:
+                async for result in results:
+                    ...
+
+        静态资源只载入一次，所有请求共用同一个 httpx 连接池，并通过令牌桶限流；
+        单个 UID 失败不会中断整批请求；从 Enka 获取且响应有变化的玩家按批写入快照表，只读会话时不写入。
+        工作任务组由上下文管理器持有，调用方提前结束迭代时退出上下文即取消剩余请求，并写入已获取的玩家
+
+        :param uids: 玩家 UID 列表
+        :param max_concurrency: 最大并发请求数
+        :param rate: 每秒允许的请求数
+        :param burst: 允许的突发请求数
+        :param use_cache: 是否优先使用 TTL 内的本地缓存
+        :param snapshot_batch_size: 每批写入快照表的玩家数量
+        :return: PlayerFetchResult 异步迭代器
         """
-        if not self._player:
-            self._player = rows_into_model_dict(self._db.extract_table("player"), Player)
+        await self.refresh_assets_async()
+        bucket = TokenBucket(rate, burst)
+        uid_iter = iter(uids)
+        send_stream, receive_stream = anyio.create_memory_object_stream(max_concurrency)
+        pending: list[Player] = []
+        # 调用方在上下文中抛出的异常，任务组退出后原样抛出，不包装为异常组
+        error: BaseException | None = None
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(max_concurrency):
+                tg.start_soon(self._fetch_player_worker, uid_iter, bucket, send_stream.clone(), use_cache)
+            send_stream.close()
+
+            results = self._iter_results(receive_stream, pending, snapshot_batch_size)
+            try:
+                async with receive_stream:
+                    yield results
+            except BaseException as e:
+                error = e
+            finally:
+                # 迭代器与工作任务在上下文内结束，不把 GeneratorExit 或取消留给任务组
+                await results.aclose()
+                tg.cancel_scope.cancel()
+                # 调用方提前结束迭代时也写入已获取的玩家
+                with anyio.CancelScope(shield=True):
+                    await self.adb.write(EnkaPlayerSynchronizer.sync, pending)
+        if error is not None:
+            raise error
+
+    async def _iter_results(self, receive_stream, pending: list[Player],
+                            snapshot_batch_size: int) -> AsyncIterator[PlayerFetchResult]:
+        """
+        逐个产出工作任务发送的结果，响应有变化的玩家按批写入快照表
+
+        :param receive_stream: 结果接收流
+        :param pending: 尚未写入快照表的玩家，由 fetch_players 在退出时写入
+        :param snapshot_batch_size: 每批写入快照表的玩家数量
+        :return: PlayerFetchResult 异步迭代器
+        """
+        async for result in receive_stream:
+            if result.changed and not self.read_only:
+                pending.append(result.player)
+                if len(pending) >= snapshot_batch_size:
+                    await self.adb.write(EnkaPlayerSynchronizer.sync, list(pending))
+                    pending.clear()
+            yield result
+
+    async def _fetch_player_worker(self, uid_iter: Iterable[str], bucket: TokenBucket, send_stream,
+                                   use_cache: bool = True):
+        """
+        从共享的 UID 迭代器中依次取出 UID 并获取玩家信息
+        命中本地缓存的 UID 不消耗令牌
+
+        :param uid_iter: 共享的 UID 迭代器
+        :param bucket: 令牌桶限流器
+        :param send_stream: 结果发送流
+        :param use_cache: 是否优先使用 TTL 内的本地缓存
+        """
+        async with send_stream:
+            for uid in uid_iter:
+                try:
+                    player = await self._load_cached_player(uid) if use_cache else None
+                    changed = False
+                    if player is None:
+                        async with bucket:
+                            player, changed = await self._fetch_player(uid, use_cache=False)
+                    if player:
+                        result = PlayerFetchResult(uid, player, changed=changed)
+                    else:
+                        result = PlayerFetchResult(uid, error=ValueError(f"无法获取玩家信息: {uid}"))
+                except Exception as e:
+                    logger.error(f"玩家信息获取失败: {uid} - 错误: {e}")
+                    result = PlayerFetchResult(uid, error=e)
+                await send_stream.send(result)
+
+    def refresh_player(self, uid: str = None):
+        """
+        从本地数据库获取玩家的最新快照，无需静态资源与网络请求
+
+        :param uid: 玩家 UID，为空时仅在当前没有玩家信息时不做任何操作
+        """
+        if uid is None or (self._player and self._player.uid == int(uid)):
+            return
+        self._player = self.load_players([uid]).get(int(uid))
         return
 
+    def load_players(self, uids: Iterable[str]) -> dict[int, Player]:
+        """
+        从本地数据库批量读取玩家的最新快照
+
+        :param uids: 玩家 UID 列表
+        :return: 以 UID 为键的 Player 字典，没有快照的 UID 不在结果中
+        """
+        if self._db is None:
+            self._db = DuckDBSession()
+        return EnkaPlayerSynchronizer.get(uids, self._db, self._compact, self._numeric)
+
+    def sync_player_files(self, paths: Iterable[str | Path], max_workers: int = None,
+                          shard_size: int = 64, write_batch_size: int = 1024) -> BulkParseStats:
+        """
+        多进程解析归档的玩家响应文件并写入快照表，见 EnkaBulkParser
+
+        :param paths: 玩家 /uid 接口响应文件路径
+        :param max_workers: 进程数，默认为 CPU 核数
+        :param shard_size: 每个分片的文件数
+        :param write_batch_size: 每次写库的玩家数量
+        :return: BulkParseStats 实例
+        """
+        self.refresh_assets()
+        return EnkaBulkParser.sync_files(paths, self._asset_map, self._db, self._numeric, max_workers,
+                                         shard_size, write_batch_size)
+
     def info_player(self) -> str:
         """
         返回一个支持国际化的玩家信息字符串表示
@@ -113,6 +471,34 @@ class EnkaClient:
     def client(self):
         return self._client
 
+    @property
+    def player_cache(self):
+        return self._player_cache
+
     @property
     def db(self):
         return self._db
+
+    @property
+    def read_only(self) -> bool:
+        """当前数据库会话是否只读，只读时不写入快照表与静态资源"""
+        return self._db is not None and self._db.read_only
+
+    @property
+    def adb(self) -> AsyncDuckDBSession:
+        """当前数据库会话的异步外观，在异步方法中访问数据库时使用，不阻塞事件循环"""
+        if self._adb is None:
+            self._adb = AsyncDuckDBSession(self._db)
+        return self._adb
+
+    @property
+    def asset_map(self):
+        return self._asset_map
+
+    @property
+    def numeric(self):
+        return self._numeric
+
+    @property
+    def asset_generation(self):
+        return self._asset_generation
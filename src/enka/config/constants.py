@@ -36,6 +36,14 @@ class EquipmentType(MVEnum):
     CIRCLET = "EQUIP_DRESS", "👑"
 
 
+# 装备位置按定义顺序排列：花、羽、沙、杯、冠，下标即圣遗物在角色圣遗物列表中的槽位
+EQUIPMENT_TYPES = tuple(EquipmentType)
+# 装备位置到槽位下标
+EQUIPMENT_SLOTS = {equipment_type: index for index, equipment_type in enumerate(EQUIPMENT_TYPES)}
+# 接口取值到装备位置的查找表，解析时不再逐个调用枚举构造
+EQUIPMENT_TYPES_BY_VALUE = {equipment_type.value: equipment_type for equipment_type in EquipmentType}
+
+
 class ItemType(StrEnum):
     """装备类型"""
 
@@ -175,3 +175,7 @@ class FightPropType(FromNameMixin, IntEnum):
     FIGHT_PROP_ELEM_REACT_OVERGROW_FIRE_CRITICAL_HURT = 3042
     FIGHT_PROP_ELEM_REACT_OVERGROW_ELECTRIC_CRITICAL = 3043
     FIGHT_PROP_ELEM_REACT_OVERGROW_ELECTRIC_CRITICAL_HURT = 3044
+
+
+# 接口 fightPropMap 的键（属性ID的字符串）到战斗属性类型的查找表，解析与还原时不再逐个调用枚举构造
+FIGHT_PROP_TYPES_BY_KEY = {str(prop_type.value): prop_type for prop_type in FightPropType}
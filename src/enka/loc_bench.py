@@ -0,0 +1,135 @@
+# loc_bench.py
+
+import gc
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import anyio
+
+from src.core.util.http_util import fetch_and_parse, fetch_and_stream
+from src.enka.stage.asset_parser import EnkaAssetParser
+from src.enka.stage.loc_stream_parser import EnkaLocStreamParser
+
+DEFAULT_LOC_FILE = Path(__file__).parent.parent.parent / "test" / "enka" / "asset" / "loc.json"
+
+# 对比的两种载入方式：整体反序列化后取当前语言 / 流式解析只保留当前语言
+MODES = ("parse", "stream")
+
+
+async def load_parse(path: str, lang: str) -> dict[str, str]:
+    """fetch_and_stream 之前的方式：整体读取并反序列化，再取出当前语言"""
+    return await fetch_and_parse(None, path, lambda data: EnkaAssetParser.parse_loc(data, lang))
+
+
+async def load_stream(path: str, lang: str) -> dict[str, str]:
+    """fetch_assets(stream_loc=True) 的方式：逐块输入 EnkaLocStreamParser，只反序列化当前语言"""
+    parser = EnkaLocStreamParser([lang])
+    loc = {}
+
+    async def consume(chunk: str):
+        for _, key, value in parser.feed(chunk):
+            loc[key] = value
+
+    await fetch_and_stream(None, path, consume)
+    for _, key, value in parser.close():
+        loc[key] = value
+    return loc
+
+
+_LOADERS = {"parse": load_parse, "stream": load_stream}
+
+
+def measure_wall_time(path: str, lang: str, mode: str, repeat: int = 20) -> float:
+    """
+    测量载入当前语言词汇表的耗时
+
+    :param path: loc.json 路径
+    :param lang: 语言代码
+    :param mode: 载入方式，见 MODES
+    :param repeat: 次数，取最快的一次
+    :return: 秒
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        anyio.run(_LOADERS[mode], path, lang)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_traced_peak(path: str, lang: str, mode: str) -> int:
+    """
+    测量载入过程中 Python 分配的峰值字节数（tracemalloc）
+
+    :param path: loc.json 路径
+    :param lang: 语言代码
+    :param mode: 载入方式，见 MODES
+    :return: 峰值字节数
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        anyio.run(_LOADERS[mode], path, lang)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_peak_rss(path: str, lang: str, mode: str) -> int:
+    """
+    在新的子进程中载入一次，返回进程峰值 RSS 相对于只导入模块时的增量，避免同进程内的其他测量互相影响
+
+    :param path: loc.json 路径
+    :param lang: 语言代码
+    :param mode: 载入方式，见 MODES，为 "none" 时只导入模块
+    :return: 峰值 RSS 增量字节数
+    """
+    def run(child_mode: str) -> int:
+        output = subprocess.run([sys.executable, "-m", "src.enka.loc_bench", "--rss", path, lang, child_mode],
+                                capture_output=True, text=True, check=True).stdout
+        return int(output.split()[-1])
+
+    return run(mode) - run("none")
+
+
+def _child_rss(path: str, lang: str, mode: str) -> None:
+    if mode != "none":
+        anyio.run(_LOADERS[mode], path, lang)
+    # Linux 上 ru_maxrss 会继承父进程的峰值，优先读取 exec 时重置的 VmHWM，单位均为 KiB
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            peak = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(peak * 1024)
+
+
+def main(loc_file: str | Path = DEFAULT_LOC_FILE, lang: str = "zh-cn") -> None:
+    """
+    对比整体反序列化与流式解析 loc.json 的耗时与峰值内存，不访问网络
+    测试用的 loc.json 只有数百 KB，流式解析的逐块读取与异步回调占比较高，耗时仍略多于整体反序列化；
+    在完整大小的 loc.json 上流式解析耗时持平或更少，峰值内存只与单个语言的数据量相关
+
+    :param loc_file: loc.json 路径，可传入从 Enka 下载的完整文件
+    :param lang: 语言代码
+    """
+    path = str(loc_file)
+    size = Path(path).stat().st_size
+    entries = len(anyio.run(load_stream, path, lang))
+    print(f"{Path(path).name}: {size / 2 ** 20:.2f} MiB, {lang}: {entries:,} entries")
+    print(f"{'mode':<8} {'wall ms':>8} {'traced MiB':>11} {'peak RSS MiB':>13}")
+    for mode in MODES:
+        print(f"{mode:<8} {measure_wall_time(path, lang, mode) * 1e3:>8.1f} "
+              f"{measure_traced_peak(path, lang, mode) / 2 ** 20:>11.2f} "
+              f"{measure_peak_rss(path, lang, mode) / 2 ** 20:>13.2f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--rss"]:
+        _child_rss(*sys.argv[2:5])
+    else:
+        main(*sys.argv[1:3])
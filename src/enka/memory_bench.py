@@ -0,0 +1,99 @@
+# memory_bench.py
+
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util.numeric import NumericMode
+from src.enka.stage.api_parser import EnkaParser
+from src.enka.stage.asset_parser import EnkaAssetParser
+from src.enka.stage.synchronizer import EnkaAssetSynchronizer
+
+# 测试样例所在目录
+TEST_DATA_DIR = Path(__file__).parent.parent.parent / "test" / "enka"
+# 默认使用的玩家接口响应样例
+DEFAULT_PLAYER_FILE = TEST_DATA_DIR / "json" / "uid" / "101242308"
+# 静态资源样例所在目录
+DEFAULT_ASSET_DIR = TEST_DATA_DIR / "asset"
+
+
+def load_asset_map(asset_dir: str | Path = DEFAULT_ASSET_DIR, lang: str = "zh-cn") -> dict:
+    """
+    由静态资源样例构建解析玩家所需的静态资源，与 test/conftest.py 的 asset_map 相同，不访问网络与本地数据库
+
+    :param asset_dir: 静态资源样例目录，包含 characters.json、loc.json、namecards.json、pfps.json
+    :param lang: 语言
+    :return: 静态资源字典
+    """
+    asset_dir = Path(asset_dir)
+
+    def load(name: str):
+        return json.loads((asset_dir / name).read_text(encoding="utf-8"))
+
+    # 角色元数据经内存数据库还原，与 EnkaClient 从数据库载入时的类型一致
+    db = DuckDBSession("memory")
+    try:
+        EnkaAssetSynchronizer.sync("character", EnkaAssetParser.parse_character_meta(load("characters.json")), db)
+        character = EnkaAssetSynchronizer.get("character", db)
+    finally:
+        db.close()
+    return {
+        "loc": EnkaAssetParser.parse_loc(load("loc.json"), lang),
+        "name_card": EnkaAssetParser.parse_name_card(load("namecards.json")),
+        "pfp": EnkaAssetParser.parse_pfp(load("pfps.json")),
+        "character": character,
+    }
+
+
+def measure_player_bytes(raw: str, asset_map: dict, numeric: NumericMode = NumericMode.DECIMAL,
+                         compact: bool = False, count: int = 200) -> float:
+    """
+    测量解析后每个 Player 常驻内存的平均字节数
+
+    每次都重新反序列化响应，与逐个获取玩家时一样得到互不共享的字符串与数值，
+    只统计解析结果本身（含紧凑表示下新增的共享实例），不含响应字典
+
+    :param raw: 玩家接口响应文本
+    :param asset_map: 静态资源字典
+    :param numeric: 数值模式
+    :param compact: 是否使用紧凑表示，否则为默认的非 __slots__ 表示
+    :param count: 常驻内存的玩家数量
+    :return: 每个 Player 的平均字节数
+    """
+    players = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        for _ in range(count):
+            data = json.loads(raw)
+            players.append(EnkaParser.parse_player(data, asset_map, numeric, compact))
+            del data
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    return used / len(players)
+
+
+def main(player_file: str | Path = DEFAULT_PLAYER_FILE, count: int = 200) -> None:
+    """
+    输出各数值模式下默认表示（普通数据类）与紧凑表示（__slots__ 数据类与共享实例）的每 Player 字节数
+
+    :param player_file: 玩家接口响应文件
+    :param count: 常驻内存的玩家数量
+    """
+    asset_map = load_asset_map()
+    raw = Path(player_file).read_text(encoding="utf-8")
+    print(f"{'numeric':<8} {'default B/Player':>17} {'compact B/Player':>17} {'saved':>7}")
+    for numeric in NumericMode:
+        default = measure_player_bytes(raw, asset_map, numeric, False, count)
+        compact = measure_player_bytes(raw, asset_map, numeric, True, count)
+        print(f"{numeric.value:<8} {default:>17,.0f} {compact:>17,.0f} {1 - compact / default:>7.1%}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *map(int, sys.argv[2:3]))
@@ -3,6 +3,7 @@
 from dataclasses import dataclass
 from typing import List
 
+from src.core.util.interning import compact_dataclass
 from src.enka.config.constants import EquipmentType
 from src.enka.model.stat import Stat, StatType
 
@@ -48,3 +49,7 @@ class Artifact:
         for sub_stat in self.sub_stats:
             result[sub_stat.stat_type.name] = sub_stat.stat_value
         return result
+
+
+# 紧凑表示，见 compact_dataclass
+CompactArtifact = compact_dataclass(Artifact)
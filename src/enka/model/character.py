@@ -3,6 +3,7 @@
 from dataclasses import dataclass
 from decimal import Decimal
 
+from src.core.util.interning import compact_dataclass
 from src.enka.config.constants import Element
 from src.enka.config.prop_stat import FightPropType
 from src.enka.model.artifact import Artifact
@@ -56,3 +57,7 @@ class Character:
     def gacha_image(self) -> str:
         """获取全身像"""
         return self.side_avatar_icon
+
+
+# 紧凑表示，见 compact_dataclass
+CompactCharacter = compact_dataclass(Character)
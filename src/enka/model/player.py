@@ -3,6 +3,7 @@
 from dataclasses import dataclass
 from typing import List
 
+from src.core.util.interning import compact_dataclass
 from src.enka.model.character import Character
 
 
@@ -49,4 +50,8 @@ class Player:
     max_friendship_character_count: int
 
     # 角色
-    characters: List[Character]
\ No newline at end of file
+    characters: List[Character]
+
+
+# 紧凑表示，见 compact_dataclass
+CompactPlayer = compact_dataclass(Player)
@@ -1,10 +1,12 @@
 # stat.py
 
+import functools
 from dataclasses import dataclass
 from decimal import Decimal
 from enum import StrEnum
 
 from src.core.misc.mvenum import FromNameMixin
+from src.core.util.interning import compact_dataclass
 
 
 class StatType(FromNameMixin, StrEnum):
@@ -45,6 +47,10 @@ class StatType(FromNameMixin, StrEnum):
     HEALING_BONUS = "FIGHT_PROP_HEAL_ADD"  # 治疗效果加成
 
 
+# 共享属性实例缓存的容量，超出后按最近最少使用淘汰，见 Stat.intern
+STAT_POOL_SIZE = 1 << 14
+
+
 @dataclass
 class Stat:
     """属性类"""
@@ -53,6 +59,11 @@ class Stat:
     # 属性值
     stat_value: Decimal
 
+    @staticmethod
+    def intern(stat_type: StatType, stat_value: Decimal | float) -> 'Stat':
+        """获取类型与取值相同的共享属性实例（不可变的紧凑表示），取值按类型与字符串形式区分，保证 stat_value_str 不变"""
+        return _shared_stat(stat_type, stat_value, str(stat_value))
+
     # 属性值转字符串
     @property
     def stat_value_str(self):
@@ -62,6 +73,16 @@ class Stat:
             return str(self.stat_value)
 
 
+# 紧凑表示，多处共享，构造后不可修改，见 compact_dataclass
+CompactStat = compact_dataclass(Stat, frozen=True)
+
+
+@functools.lru_cache(maxsize=STAT_POOL_SIZE, typed=True)
+def _shared_stat(stat_type: StatType, stat_value: Decimal | float, stat_value_str: str) -> Stat:
+    """按类型、取值与取值的字符串形式缓存的共享属性实例"""
+    return CompactStat(stat_type, stat_value)
+
+
 # 全部元素伤害加成的属性集合
 DMG_BONUS_STAT_TYPES = {
     StatType.FIRE_DMG_BONUS,
@@ -99,3 +120,6 @@ FIX_STAT_TYPES = {
     StatType.ATK,
     StatType.DEF,
 }
+
+# 接口取值到属性类型的查找表，解析与还原时不再逐个调用枚举构造
+STAT_TYPES_BY_VALUE = {stat_type.value: stat_type for stat_type in StatType}
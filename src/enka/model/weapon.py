@@ -2,6 +2,7 @@
 
 from dataclasses import dataclass
 
+from src.core.util.interning import compact_dataclass
 from src.enka.model.stat import Stat
 
 
@@ -26,3 +27,7 @@ class Weapon:
     weapon_stats: list[Stat]
     # 类型
     type: str = ""
+
+
+# 紧凑表示，见 compact_dataclass
+CompactWeapon = compact_dataclass(Weapon)
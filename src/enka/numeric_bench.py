@@ -0,0 +1,83 @@
+# numeric_bench.py
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from src.core.util.numeric import NumericMode
+from src.enka.memory_bench import DEFAULT_PLAYER_FILE, load_asset_map
+from src.enka.model.player import Player
+from src.enka.stage.api_parser import EnkaParser
+from src.evaluator.algorithm.stat_based import YSINAlgorithm
+from src.evaluator.algorithm.weight_based import XZSAlgorithm
+from src.evaluator.model.genre import GENRE_DEFAULT
+
+
+def measure_evaluate_throughput(player: Player, algorithm: XZSAlgorithm | YSINAlgorithm,
+                                number: int = 200, repeat: int = 7) -> float:
+    """
+    测量逐个角色调用 evaluate_character 的吞吐量，评分内核预先编译，只统计评分
+
+    :param player: 已按对应数值模式解析的玩家
+    :param algorithm: 评分算法实例
+    :param number: 每轮评分的玩家次数
+    :param repeat: 轮数，取最快的一轮
+    :return: 每秒评分的玩家数
+    """
+    kernel = algorithm.compile_kernel({stat_type: 1 for stat_type in GENRE_DEFAULT.effective_stats})
+
+    def evaluate():
+        for character in player.characters:
+            algorithm.evaluate_character(character, kernel)
+
+    seconds = min(timeit.repeat(evaluate, number=number, repeat=repeat))
+    return number / seconds
+
+
+def count_mismatches(decimal_player: Player, float_player: Player, algorithm_type: type) -> int:
+    """
+    统计两种数值模式在展示精度上不一致的角色总分与圣遗物得分数量
+
+    :param decimal_player: 以 DECIMAL 模式解析的玩家
+    :param float_player: 以 FLOAT 模式解析的玩家
+    :param algorithm_type: 评分算法类
+    :return: 不一致的数量
+    """
+    weights = {stat_type: 1 for stat_type in GENRE_DEFAULT.effective_stats}
+    decimal_algorithm, float_algorithm = algorithm_type(NumericMode.DECIMAL), algorithm_type(NumericMode.FLOAT)
+    mismatches = 0
+    for decimal_character, float_character in zip(decimal_player.characters, float_player.characters):
+        decimal_eval = decimal_algorithm.evaluate_character(decimal_character, weights)
+        float_eval = float_algorithm.evaluate_character(float_character, weights)
+        pairs = [(decimal_eval.total_score, float_eval.total_score)]
+        pairs += [(a.score, b.score) for a, b in zip(decimal_eval.artifacts, float_eval.artifacts)]
+        mismatches += sum(abs(float(a) - b) > 1e-9 for a, b in pairs)
+    return mismatches
+
+
+def main(player_file: str | Path = DEFAULT_PLAYER_FILE, number: int = 200) -> None:
+    """
+    对比 Decimal 与浮点数值模式下的解析与评分吞吐量，并核对两者结果，需先执行 fetch_assets 同步静态资源
+
+    :param player_file: 玩家接口响应文件
+    :param number: 每轮次数
+    """
+    asset_map = load_asset_map()
+    data = json.loads(Path(player_file).read_text(encoding="utf-8"))
+    players = {numeric: EnkaParser.parse_player(data, asset_map, numeric) for numeric in NumericMode}
+
+    print(f"{'algorithm':<14} {'numeric':<8} {'players/s':>10} {'us/player':>10} {'speedup':>8}")
+    for algorithm_type in (XZSAlgorithm, YSINAlgorithm):
+        baseline = None
+        for numeric in NumericMode:
+            players_per_second = measure_evaluate_throughput(players[numeric], algorithm_type(numeric), number)
+            baseline = baseline or players_per_second
+            print(f"{algorithm_type.__name__:<14} {numeric.value:<8} {players_per_second:>10,.0f} "
+                  f"{1e6 / players_per_second:>10,.1f} {players_per_second / baseline:>7.2f}x")
+        mismatches = count_mismatches(players[NumericMode.DECIMAL], players[NumericMode.FLOAT], algorithm_type)
+        print(f"{algorithm_type.__name__:<14} mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *map(int, sys.argv[2:3]))
@@ -0,0 +1,51 @@
+# parse_bench.py
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from src.core.util.numeric import NumericMode
+from src.enka.memory_bench import DEFAULT_PLAYER_FILE, load_asset_map
+from src.enka.stage.api_parser import EnkaParser
+
+
+def measure_parse_throughput(data: dict, asset_map: dict, numeric: NumericMode = NumericMode.DECIMAL,
+                             compact: bool = False, number: int = 200, repeat: int = 5) -> float:
+    """
+    测量 EnkaParser.parse_player 的吞吐量，只统计解析，不含 JSON 反序列化
+
+    :param data: 已反序列化的玩家接口响应
+    :param asset_map: 静态资源字典
+    :param numeric: 数值模式
+    :param compact: 是否使用紧凑表示
+    :param number: 每轮解析次数
+    :param repeat: 轮数，取最快的一轮
+    :return: 每秒解析的玩家数
+    """
+    seconds = min(timeit.repeat(lambda: EnkaParser.parse_player(data, asset_map, numeric, compact),
+                                number=number, repeat=repeat))
+    return number / seconds
+
+
+def main(player_file: str | Path = DEFAULT_PLAYER_FILE, number: int = 200) -> None:
+    """
+    输出各数值模式与表示下的解析吞吐量，需先执行 fetch_assets 同步静态资源
+
+    :param player_file: 玩家接口响应文件
+    :param number: 每轮解析次数
+    """
+    asset_map = load_asset_map()
+    data = json.loads(Path(player_file).read_text(encoding="utf-8"))
+    character_count = len(data.get("avatarInfoList", []))
+
+    print(f"{'numeric':<8} {'compact':<8} {'players/s':>10} {'characters/s':>13} {'us/player':>10}")
+    for numeric in NumericMode:
+        for compact in (False, True):
+            players_per_second = measure_parse_throughput(data, asset_map, numeric, compact, number)
+            print(f"{numeric.value:<8} {str(compact):<8} {players_per_second:>10,.0f} "
+                  f"{players_per_second * character_count:>13,.0f} {1e6 / players_per_second:>10,.1f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2], *map(int, sys.argv[2:3]))
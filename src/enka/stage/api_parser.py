@@ -1,21 +1,25 @@
 # parser.py
-from decimal import Decimal
 
-from src.enka.config.constants import EquipmentType, Element
-from src.enka.config.prop_stat import FightPropType
-from src.enka.model.artifact import Artifact
-from src.enka.model.character import Character
+from src.core.util.interning import intern_text, shared_id
+from src.core.util.numeric import NumericMode, numeric_backend, shared_number
+from src.enka.config.constants import EquipmentType, Element, EQUIPMENT_SLOTS, EQUIPMENT_TYPES_BY_VALUE
+from src.enka.config.prop_stat import FIGHT_PROP_TYPES_BY_KEY
+from src.enka.model.artifact import Artifact, CompactArtifact
+from src.enka.model.character import Character, CompactCharacter
 from src.enka.model.character_meta import CharacterMeta
-from src.enka.model.player import Player
-from src.enka.model.stat import Stat, StatType
-from src.enka.model.weapon import Weapon
+from src.enka.model.player import Player, CompactPlayer
+from src.enka.model.stat import Stat, StatType, STAT_TYPES_BY_VALUE
+from src.enka.model.weapon import Weapon, CompactWeapon
 
 
 class EnkaParser:
 
     @staticmethod
-    def parse_weapon(data: dict, asset_map: dict) -> Weapon:
-        """解析武器装备"""
+    def parse_weapon(data: dict, asset_map: dict, numeric: NumericMode = NumericMode.DECIMAL,
+                     compact: bool = False) -> Weapon:
+        """解析武器装备，compact 为 True 时使用紧凑表示的模型类，共享属性与数值实例并驻留重复的字符串"""
+        number = shared_number(numeric) if compact else numeric_backend(numeric).number
+        stat, text = (Stat.intern, intern_text) if compact else (Stat, str)
         weapon_data = data.get("weapon", {})
         flat_data = data.get("flat", {})
 
@@ -27,80 +31,99 @@ class EnkaParser:
         # 解析武器属性（主词条和副词条）
         weapon_stats_data = flat_data.get("weaponStats", [])
         weapon_stats = [
-            Stat(StatType(st.get("appendPropId")), Decimal(str(st.get("statValue", 0))))
+            stat(STAT_TYPES_BY_VALUE.get(st.get("appendPropId")) or StatType(st.get("appendPropId")),
+                 number(st.get("statValue", 0)))
             for st in weapon_stats_data
         ]
 
         # 构造参数字典
-        return Weapon(
+        return (CompactWeapon if compact else Weapon)(
             id=data.get("itemId", 0),
             name=asset_map["loc"].get(flat_data.get("nameTextMapHash")),
             level=weapon_data.get("level", 1),
             promote_level=weapon_data.get("promoteLevel", 0),
             refine=refine + 1,
             rank=flat_data.get("rankLevel", 0),
-            icon=flat_data.get("icon", ""),
+            icon=text(flat_data.get("icon", "")),
             weapon_stats=weapon_stats
         )
 
     @staticmethod
-    def parse_artifact(data: dict, asset_map: dict) -> Artifact:
-        """解析圣遗物装备"""
+    def parse_artifact(data: dict, asset_map: dict, numeric: NumericMode = NumericMode.DECIMAL,
+                       compact: bool = False) -> Artifact:
+        """解析圣遗物装备，compact 为 True 时使用紧凑表示的模型类，共享属性与数值实例并驻留重复的字符串"""
+        number = shared_number(numeric) if compact else numeric_backend(numeric).number
+        stat, text = (Stat.intern, intern_text) if compact else (Stat, str)
         reliquary_data = data.get("reliquary", {})
         flat_data = data.get("flat", {})
 
         # 解析主属性
         main_stat_data = flat_data.get("reliquaryMainstat", {})
-        main_stat = Stat(
-            StatType(main_stat_data.get("mainPropId")),
-            stat_value=Decimal(str(main_stat_data.get("statValue", 0.0)))
+        main_stat_type = main_stat_data.get("mainPropId")
+        main_stat = stat(
+            STAT_TYPES_BY_VALUE.get(main_stat_type) or StatType(main_stat_type),
+            stat_value=number(main_stat_data.get("statValue", 0.0))
         )
 
         # 解析副属性
         sub_stats = [
-            Stat(StatType(sub.get("appendPropId")), stat_value=Decimal(str(sub.get("statValue", 0.0))))
+            stat(STAT_TYPES_BY_VALUE.get(sub.get("appendPropId")) or StatType(sub.get("appendPropId")),
+                 stat_value=number(sub.get("statValue", 0.0)))
             for sub in flat_data.get("reliquarySubstats", [])
         ]
 
+        # 装备位置
+        equip_type = flat_data.get("equipType")
+
+        # 副词条 ID 列表，紧凑表示下共享相同的 ID
+        sub_stat_ids = reliquary_data.get("appendPropIdList")
+        if compact and sub_stat_ids:
+            sub_stat_ids = [shared_id(sub_stat_id) for sub_stat_id in sub_stat_ids]
+
         # 构造参数字典
-        return Artifact(
+        return (CompactArtifact if compact else Artifact)(
             id=data.get("itemId", 0),
             # 默认的loc查不到此名称
-            name="TextHash_" + flat_data.get("nameTextMapHash"),
+            name=text("TextHash_" + flat_data.get("nameTextMapHash")),
             level=reliquary_data.get("level", 1) - 1,
-            equipment_type=EquipmentType(flat_data.get("equipType")),
+            equipment_type=EQUIPMENT_TYPES_BY_VALUE.get(equip_type) or EquipmentType(equip_type),
             rank=flat_data.get("rankLevel", 0),
             set_id=flat_data.get("setId", 0),
             set_name=asset_map["loc"].get(flat_data.get("setNameTextMapHash")),
-            icon=flat_data.get("icon", ""),
+            icon=text(flat_data.get("icon", "")),
             main_stat_id=reliquary_data.get("mainPropId"),
-            sub_stat_ids=reliquary_data.get("appendPropIdList"),
+            sub_stat_ids=sub_stat_ids,
             main_stat=main_stat,
             sub_stats=sub_stats
         )
 
     @staticmethod
-    def parse_equip_item(data: dict, asset_map: dict) -> Artifact | Weapon | None:
+    def parse_equip_item(data: dict, asset_map: dict,
+                         numeric: NumericMode = NumericMode.DECIMAL, compact: bool = False) -> Artifact | Weapon | None:
         """解析圣遗物装备或武器装备"""
         if data.get("reliquary"):
-            return EnkaParser.parse_artifact(data, asset_map)
+            return EnkaParser.parse_artifact(data, asset_map, numeric, compact)
         elif data.get("weapon"):
-            return EnkaParser.parse_weapon(data, asset_map)
+            return EnkaParser.parse_weapon(data, asset_map, numeric, compact)
         else:
             return None
 
     @staticmethod
-    def parse_character(data: dict, asset_map: dict) -> Character:
+    def parse_character(data: dict, asset_map: dict, numeric: NumericMode = NumericMode.DECIMAL,
+                        compact: bool = False) -> Character:
         """
         解析角色信息
         :param asset_map: 国际化字典
         :param data: 包含角色信息的字典
+        :param numeric: 数值模式，FLOAT 时属性值解析为 float
+        :param compact: 是否使用紧凑表示：字段保存在 __slots__ 中，共享属性与数值实例并驻留重复的字符串
         :return: Character 对象
         """
+        number = shared_number(numeric) if compact else numeric_backend(numeric).number
 
         # 基础属性
         avatar_id = data.get("avatarId")
-        character_meta = asset_map["character"].get(avatar_id, CharacterMeta.default(avatar_id))
+        character_meta = asset_map["character"].get(avatar_id) or CharacterMeta.default(avatar_id)
 
         # 等级、经验值、突破
         prop_map = data.get("propMap")
@@ -113,9 +136,9 @@ class EnkaParser:
 
         # 解析战斗面板
         fight_prop_map = {
-            FightPropType(int(k)): Decimal(str(v))
+            prop_type: number(v)
             for k, v in data.get("fightPropMap", {}).items()
-            if int(k) in FightPropType
+            if (prop_type := FIGHT_PROP_TYPES_BY_KEY.get(k)) is not None
         }
 
         # 命座
@@ -137,17 +160,16 @@ class EnkaParser:
         artifact_list: list[Artifact | None] = [None] * 5
 
         for equip in equip_list:
-            parsed_item = EnkaParser.parse_equip_item(equip, asset_map)
+            parsed_item = EnkaParser.parse_equip_item(equip, asset_map, numeric, compact)
             if isinstance(parsed_item, Weapon):
                 weapon = parsed_item
             elif isinstance(parsed_item, Artifact):
                 # 按EquipmentType定义顺序构造圣遗物列表：花、羽、沙、杯、冠
-                index = list(EquipmentType).index(parsed_item.equipment_type)
-                artifact_list[index] = parsed_item
+                artifact_list[EQUIPMENT_SLOTS[parsed_item.equipment_type]] = parsed_item
                 pass
 
         # 构造参数字典
-        return Character(
+        return (CompactCharacter if compact else Character)(
             id=avatar_id,
             name=asset_map["loc"].get(character_meta.name_text_hash),
             _side_avatar_icon=character_meta.side_avatar_icon,
@@ -167,8 +189,9 @@ class EnkaParser:
         )
 
     @staticmethod
-    def parse_player(data: dict, asset_map: dict) -> Player:
-        """解析玩家信息"""
+    def parse_player(data: dict, asset_map: dict, numeric: NumericMode = NumericMode.DECIMAL,
+                     compact: bool = False) -> Player:
+        """解析玩家信息，numeric 为 FLOAT 时属性值解析为 float，compact 为 True 时使用紧凑表示"""
         if not asset_map:
             raise ValueError("asset_map is empty, please do fetch_assets() first!")
 
@@ -178,14 +201,14 @@ class EnkaParser:
         characters_data = data.get("avatarInfoList", [])
         characters = []
         for character_data in characters_data:
-            characters.append(EnkaParser.parse_character(character_data, asset_map))
+            characters.append(EnkaParser.parse_character(character_data, asset_map, numeric, compact))
 
         name_card_id = player_data.get("nameCardId", 0)
 
         profile_icon_id = player_data.get("profilePicture", {}).get("id", 100000)
 
         # 构造Player对象
-        return Player(
+        return (CompactPlayer if compact else Player)(
             uid=int(data.get("uid", 0)),
             nickname=player_data.get("nickname", ""),
             level=player_data.get("level", 1),
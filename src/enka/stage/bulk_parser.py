@@ -0,0 +1,215 @@
+# bulk_parser.py
+
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import pyarrow
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util.logger import logger
+from src.core.util.numeric import NumericMode
+from src.enka.model.player import Player
+from src.enka.stage.api_parser import EnkaParser
+from src.enka.stage.player_synchronizer import EnkaPlayerSynchronizer
+
+
+@dataclass
+class BulkParseBatch:
+    """一个分片的解析结果，可跨进程传递"""
+    # 以表名为键的 Arrow 表，见 EnkaPlayerSynchronizer.to_tables
+    tables: dict[str, pyarrow.Table]
+    # 解析成功的玩家 UID
+    uids: list[int]
+    # 解析失败的文件路径与原因
+    errors: list[tuple[str, str]]
+    # 分片内每个文件的路径与修改时间，无法读取修改时间时为 None
+    files: list[tuple[str, float | None]]
+    # table_builder 生成的附加表，以表名为键
+    extra_tables: dict[str, pyarrow.Table] = field(default_factory=dict)
+
+    @property
+    def file_count(self) -> int:
+        return len(self.files)
+
+    @property
+    def row_count(self) -> int:
+        return sum(table.num_rows for table in (*self.tables.values(), *self.extra_tables.values()))
+
+
+@dataclass
+class BulkParseStats:
+    """批量解析入库的统计"""
+    # 处理的文件数
+    files: int = 0
+    # 写入的玩家数
+    players: int = 0
+    # 写入的行数（各表合计）
+    rows: int = 0
+    # 解析失败的文件数
+    errors: int = 0
+    # 总耗时（秒）
+    seconds: float = 0.0
+
+
+# 由玩家列表生成附加 Arrow 表的函数，需可被 pickle（模块级函数或类方法）
+TableBuilder = Callable[[list[Player]], dict[str, pyarrow.Table]]
+
+# 子进程内的静态资源、数值模式与附加表函数，由 _init_worker 在进程启动时设置一次
+_worker_asset_map: dict = {}
+_worker_numeric: NumericMode = NumericMode.DECIMAL
+_worker_table_builder: TableBuilder | None = None
+
+
+def _init_worker(asset_map: dict, numeric: NumericMode, table_builder: TableBuilder = None) -> None:
+    """子进程初始化：只接收一次静态资源，之后的任务只传文件路径"""
+    global _worker_asset_map, _worker_numeric, _worker_table_builder
+    _worker_asset_map = asset_map
+    _worker_numeric = numeric
+    _worker_table_builder = table_builder
+
+
+def _parse_shard(paths: tuple[str, ...]) -> BulkParseBatch:
+    """子进程任务：使用初始化时接收的静态资源解析一个分片"""
+    return EnkaBulkParser.parse_shard(paths, _worker_asset_map, _worker_numeric, _worker_table_builder)
+
+
+class EnkaBulkParser:
+    """
+    归档玩家响应的多进程批量解析器
+    文件按分片分发到进程池，子进程启动时经 initializer 接收一次静态资源；
+    反序列化、解析与 Arrow 转换都在子进程内完成，父进程只按批追加写入 DuckDB
+    """
+
+    @staticmethod
+    def parse_shard(paths: Iterable[str | Path], asset_map: dict,
+                    numeric: NumericMode = NumericMode.DECIMAL, table_builder: TableBuilder = None) -> BulkParseBatch:
+        """
+        解析一组玩家响应文件，以文件修改时间作为快照时间
+
+        :param paths: 玩家 /uid 接口响应文件路径
+        :param asset_map: 静态资源字典
+        :param numeric: 数值模式
+        :param table_builder: 由同一批玩家生成附加表的函数，结果放在 extra_tables 中
+        :return: BulkParseBatch 实例，单个文件失败不影响其余文件
+        """
+        players, snapshot_ats, errors, files = [], [], [], []
+        for path in paths:
+            mtime = None
+            try:
+                mtime = os.path.getmtime(path)
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                players.append(EnkaParser.parse_player(data, asset_map, numeric))
+                snapshot_ats.append(mtime)
+            except Exception as e:
+                # 异常对象不一定可以序列化，只回传描述
+                errors.append((str(path), f"{type(e).__name__}: {e}"))
+            files.append((str(path), mtime))
+        return BulkParseBatch(
+            tables=EnkaPlayerSynchronizer.to_tables(players, snapshot_ats),
+            uids=[player.uid for player in players],
+            errors=errors,
+            files=files,
+            extra_tables=table_builder(players) if table_builder else {}
+        )
+
+    @classmethod
+    def iter_batches(cls, paths: Iterable[str | Path], asset_map: dict,
+                     numeric: NumericMode = NumericMode.DECIMAL, max_workers: int = None,
+                     shard_size: int = 64, table_builder: TableBuilder = None) -> Iterator[BulkParseBatch]:
+        """
+        将文件分片后在进程池中解析，按完成顺序逐个返回分片结果
+
+        同时提交的分片数不超过进程数的两倍，文件再多也只占用有限的内存；
+        调用方提前结束迭代时取消尚未开始的分片
+
+        :param paths: 玩家 /uid 接口响应文件路径
+        :param asset_map: 静态资源字典
+        :param numeric: 数值模式
+        :param max_workers: 进程数，默认为 CPU 核数
+        :param shard_size: 每个分片的文件数
+        :param table_builder: 在子进程中由同一批玩家生成附加表的函数，需可被 pickle
+        :return: BulkParseBatch 迭代器
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        shards = itertools.batched((str(path) for path in paths), shard_size)
+        # 子进程不继承父进程中 DuckDB 的线程与连接
+        executor = ProcessPoolExecutor(max_workers, mp_context=get_context("spawn"),
+                                       initializer=_init_worker, initargs=(asset_map, numeric, table_builder))
+        try:
+            pending = set()
+            for shard in shards:
+                pending.add(executor.submit(_parse_shard, shard))
+                if len(pending) >= max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @classmethod
+    def sync_files(cls, paths: Iterable[str | Path], asset_map: dict, db: DuckDBSession,
+                   numeric: NumericMode = NumericMode.DECIMAL, max_workers: int = None,
+                   shard_size: int = 64, write_batch_size: int = 1024, max_snapshots: int = 3) -> BulkParseStats:
+        """
+        多进程解析玩家响应文件，并按批写入玩家快照表
+
+        分片决定子进程间的负载均衡，写库按 write_batch_size 合并多个分片，
+        减少父进程中每次写入的固定开销
+
+        :param paths: 玩家 /uid 接口响应文件路径
+        :param asset_map: 静态资源字典
+        :param db: DuckDB 会话
+        :param numeric: 数值模式
+        :param max_workers: 进程数，默认为 CPU 核数
+        :param shard_size: 每个分片的文件数
+        :param write_batch_size: 每次写库的玩家数量
+        :param max_snapshots: 每个 UID 最多保留的快照数量
+        :return: BulkParseStats 实例
+        """
+        if not asset_map:
+            raise ValueError("asset_map is empty, please do fetch_assets() first!")
+        stats = BulkParseStats()
+        pending: list[BulkParseBatch] = []
+        start = time.perf_counter()
+
+        def flush():
+            uids = [uid for batch in pending for uid in batch.uids]
+            if uids:
+                tables = {name: pyarrow.concat_tables([batch.tables[name] for batch in pending])
+                          for name in pending[0].tables}
+                EnkaPlayerSynchronizer.write_tables(tables, uids, db, max_snapshots)
+                stats.players += len(uids)
+                stats.rows += sum(batch.row_count for batch in pending)
+            pending.clear()
+
+        try:
+            for batch in cls.iter_batches(paths, asset_map, numeric, max_workers, shard_size):
+                for path, error in batch.errors:
+                    logger.error(f"玩家响应解析失败: {path} - 错误: {error}")
+                stats.files += batch.file_count
+                stats.errors += len(batch.errors)
+                pending.append(batch)
+                if sum(len(pending_batch.uids) for pending_batch in pending) >= write_batch_size:
+                    flush()
+        finally:
+            # 调用方中断时也写入已解析的玩家
+            flush()
+        stats.seconds = time.perf_counter() - start
+
+        elapsed = max(stats.seconds, 1e-9)
+        logger.info(f"批量解析 {stats.files} 个文件，写入 {stats.players} 名玩家、{stats.rows} 行，"
+                    f"失败 {stats.errors} 个，耗时 {stats.seconds:.3f}s "
+                    f"({stats.files / elapsed:.1f} files/s, {stats.rows / elapsed:.1f} rows/s)")
+        return stats
@@ -0,0 +1,162 @@
+import json
+import time
+from typing import Optional
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+
+
+class EnkaPlayerCache:
+    """
+    玩家接口响应缓存
+    以 UID 为键将 /uid/{uid} 的原始响应连同获取时间与 TTL 存入 DuckDB，
+    TTL 内的重复请求直接从本地读取，不再消耗接口频率
+
+    只读数据库（如服务进程打开的快照）不能写入，此时新获取的响应只保存在进程内存中，
+    读取时先查内存再查数据库
+    """
+    # 表名常量定义
+    TABLE_PLAYER_RESPONSE = "ods_enka_player_response"
+
+    def __init__(self, max_entries: int = 10000, max_age: int = 86400, evict_interval: float = 600):
+        """
+        初始化缓存
+
+        :param max_entries: 最多缓存的 UID 数量，超出时淘汰最早获取的记录
+        :param max_age: 记录最长保留秒数，超出后被淘汰
+        :param evict_interval: 淘汰的最长间隔秒数；写入次数达到容量的十分之一时也会淘汰，
+                               两次淘汰之间记录数最多超出容量的十分之一
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.evict_interval = evict_interval
+        self.evict_batch = max(1, max_entries // 10)
+        # 各数据库实例自上次淘汰以来的 [写入次数, 上次淘汰时间]
+        self._evict_state: dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+        # 已建表的数据库实例（DuckDBSession.instance），建表语句每个数据库只执行一次
+        self._ready: set[str] = set()
+        # 只读数据库时的内存缓存 {UID: (原始响应, 过期时间戳)}，按写入顺序淘汰
+        self._memory: dict[str, tuple[dict, float]] = {}
+
+    def _ensure_table(self, db: DuckDBSession) -> bool:
+        """建表并返回表是否可用，只读数据库不建表，表不存在时只使用内存缓存"""
+        if db.instance in self._ready:
+            return True
+        if db.read_only:
+            if not db.table_exists(self.TABLE_PLAYER_RESPONSE):
+                return False
+            self._ready.add(db.instance)
+            return True
+        db.execute_sql(f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE_PLAYER_RESPONSE} (
+                uid VARCHAR PRIMARY KEY,
+                payload VARCHAR,
+                fetched_at DOUBLE,
+                ttl INTEGER
+            )
+        """)
+        self._ready.add(db.instance)
+        return True
+
+    def get(self, uid: str, db: DuckDBSession) -> Optional[dict]:
+        """
+        读取 TTL 内的玩家原始响应
+
+        :param uid: 玩家 UID
+        :param db: DuckDB 会话
+        :return: 原始响应字典，未命中或已过期时返回 None
+        """
+        entry = self._memory.get(str(uid))
+        if entry is not None and entry[1] > time.time():
+            self.hits += 1
+            return entry[0]
+        row = None
+        if self._ensure_table(db):
+            row = db.execute_sql(
+                f"SELECT payload FROM {self.TABLE_PLAYER_RESPONSE} WHERE uid = ? AND fetched_at + ttl > ?",
+                [str(uid), time.time()]).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def expires_at(self, uid: str, db: DuckDBSession) -> Optional[float]:
+        """
+        读取玩家原始响应的过期时间，即获取时间加上 Enka 返回的 TTL
+
+        :param uid: 玩家 UID
+        :param db: DuckDB 会话
+        :return: 过期时间戳，没有记录时返回 None
+        """
+        entry = self._memory.get(str(uid))
+        if entry is not None and entry[1] > time.time():
+            return entry[1]
+        if not self._ensure_table(db):
+            return None
+        row = db.execute_sql(f"SELECT fetched_at + ttl FROM {self.TABLE_PLAYER_RESPONSE} WHERE uid = ?",
+                             [str(uid)]).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, uid: str, data: dict, db: DuckDBSession) -> bool:
+        """
+        写入玩家原始响应，按写入次数或时间间隔执行淘汰，只读数据库时写入内存缓存
+
+        :param uid: 玩家 UID
+        :param data: 原始响应字典
+        :param db: DuckDB 会话
+        :return: 响应是否与上次记录的不同（不比较 ttl），没有记录时为 True
+        """
+        if db.read_only:
+            self._put_memory(str(uid), data)
+            return True
+        self._ensure_table(db)
+        row = db.execute_sql(f"SELECT payload FROM {self.TABLE_PLAYER_RESPONSE} WHERE uid = ?",
+                             [str(uid)]).fetchone()
+        changed = row is None or self._content(json.loads(row[0])) != self._content(data)
+        db.execute_sql(f"INSERT OR REPLACE INTO {self.TABLE_PLAYER_RESPONSE} VALUES (?, ?, ?, ?)",
+                       [str(uid), json.dumps(data, ensure_ascii=False), time.time(), int(data.get("ttl", 0))])
+        self._maybe_evict(db)
+        return changed
+
+    @staticmethod
+    def _content(data: dict) -> dict:
+        """响应中除 ttl 以外的内容，ttl 每次请求都可能不同"""
+        return {key: value for key, value in data.items() if key != "ttl"}
+
+    def _put_memory(self, uid: str, data: dict):
+        """写入内存缓存，超出容量时淘汰最早写入的记录"""
+        self._memory.pop(uid, None)
+        self._memory[uid] = (data, time.time() + int(data.get("ttl", 0)))
+        while len(self._memory) > self.max_entries:
+            del self._memory[next(iter(self._memory))]
+
+    def _maybe_evict(self, db: DuckDBSession):
+        """自上次淘汰以来的写入次数达到 evict_batch，或间隔超过 evict_interval 时才执行淘汰"""
+        state = self._evict_state.setdefault(db.instance, [0, time.monotonic()])
+        state[0] += 1
+        if state[0] >= self.evict_batch or time.monotonic() - state[1] >= self.evict_interval:
+            self.evict(db)
+
+    def evict(self, db: DuckDBSession):
+        """
+        淘汰超出保留时长或超出容量的记录，未超出容量时不对全表排序
+
+        :param db: DuckDB 会话
+        """
+        self._evict_state[db.instance] = [0, time.monotonic()]
+        db.execute_sql(f"DELETE FROM {self.TABLE_PLAYER_RESPONSE} WHERE fetched_at < ?",
+                       [time.time() - self.max_age])
+        count = db.execute_sql(f"SELECT count(*) FROM {self.TABLE_PLAYER_RESPONSE}").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        db.execute_sql(f"""
+            DELETE FROM {self.TABLE_PLAYER_RESPONSE} WHERE uid IN (
+                SELECT uid FROM {self.TABLE_PLAYER_RESPONSE} ORDER BY fetched_at DESC OFFSET ?
+            )
+        """, [self.max_entries])
+
+    def stats(self) -> dict[str, int]:
+        """返回缓存命中统计"""
+        return {"hits": self.hits, "misses": self.misses}
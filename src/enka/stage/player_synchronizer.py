@@ -0,0 +1,409 @@
+import json
+import time
+from typing import Iterable
+
+import pyarrow
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util.interning import intern_text, shared_id
+from src.core.util.numeric import NumericMode, numeric_backend, shared_number
+from src.enka.config.constants import EquipmentType, Element, EQUIPMENT_TYPES_BY_VALUE
+from src.enka.config.prop_stat import FIGHT_PROP_TYPES_BY_KEY
+from src.enka.model.artifact import Artifact, CompactArtifact
+from src.enka.model.character import Character, CompactCharacter
+from src.enka.model.player import Player, CompactPlayer
+from src.enka.model.stat import Stat, STAT_TYPES_BY_VALUE
+from src.enka.model.weapon import Weapon, CompactWeapon
+
+
+def _text(value: str | None, compact: bool) -> str | None:
+    """紧凑表示下驻留字符串"""
+    return intern_text(value) if compact else value
+
+
+def _number(numeric: NumericMode, compact: bool):
+    """还原数值的转换函数，与 EnkaParser 解析时一致：紧凑表示下共享相同取值的实例"""
+    return shared_number(numeric) if compact else numeric_backend(numeric).number
+
+
+class EnkaPlayerSynchronizer:
+    """
+    玩家快照同步器
+    将 Player / Character / Weapon / Artifact 按 (uid, snapshot_at) 拆分写入规范化的表，
+    每张表每批只做一次 Arrow 批量写入；读取时以少量集合查询还原最新快照。
+    玩家表最后写入，子表中没有对应玩家行的快照不会被读取
+    """
+    # 表名常量定义
+    TABLE_PLAYER = "ods_enka_player"
+    TABLE_CHARACTER = "ods_enka_character"
+    TABLE_WEAPON = "ods_enka_weapon"
+    TABLE_ARTIFACT = "ods_enka_artifact"
+
+    # 属性列表以 (属性类型, 属性值) 结构体数组保存，Decimal 以字符串保存以保证还原后数值完全一致
+    STAT_LIST_TYPE = pyarrow.list_(pyarrow.struct([("stat_type", pyarrow.string()), ("stat_value", pyarrow.string())]))
+
+    # 表结构定义
+    PLAYER_SCHEMA = pyarrow.schema([
+        ("uid", pyarrow.int64()),
+        ("snapshot_at", pyarrow.float64()),
+        ("nickname", pyarrow.string()),
+        ("level", pyarrow.int32()),
+        ("world_level", pyarrow.int32()),
+        ("name_card_id", pyarrow.int64()),
+        ("name_card", pyarrow.string()),
+        ("profile_icon_id", pyarrow.int64()),
+        ("profile_icon", pyarrow.string()),
+        ("finish_achievement_num", pyarrow.int32()),
+        ("abyss_floor_index", pyarrow.int32()),
+        ("abyss_level_index", pyarrow.int32()),
+        ("abyss_star_index", pyarrow.int32()),
+        ("theater_act_index", pyarrow.int32()),
+        ("theater_star_index", pyarrow.int32()),
+        ("stygian_difficulty", pyarrow.int32()),
+        ("stygian_clear_time", pyarrow.int64()),
+        ("max_friendship_character_count", pyarrow.int32()),
+    ])
+    CHARACTER_SCHEMA = pyarrow.schema([
+        ("uid", pyarrow.int64()),
+        ("snapshot_at", pyarrow.float64()),
+        ("position", pyarrow.int32()),
+        ("id", pyarrow.int64()),
+        ("name", pyarrow.string()),
+        ("side_avatar_icon", pyarrow.string()),
+        ("level", pyarrow.int32()),
+        ("exp", pyarrow.int64()),
+        ("promote_level", pyarrow.int32()),
+        ("rank", pyarrow.int32()),
+        ("element", pyarrow.string()),
+        ("talent_ids", pyarrow.list_(pyarrow.int64())),
+        ("skill_names", pyarrow.string()),
+        ("skill_level_map", pyarrow.string()),
+        ("skill_level_ext", pyarrow.string()),
+        ("friendship", pyarrow.int32()),
+        ("fight_prop", pyarrow.string()),
+    ])
+    WEAPON_SCHEMA = pyarrow.schema([
+        ("uid", pyarrow.int64()),
+        ("snapshot_at", pyarrow.float64()),
+        ("position", pyarrow.int32()),
+        ("id", pyarrow.int64()),
+        ("name", pyarrow.string()),
+        ("level", pyarrow.int32()),
+        ("promote_level", pyarrow.int32()),
+        ("refine", pyarrow.int32()),
+        ("rank", pyarrow.int32()),
+        ("icon", pyarrow.string()),
+        ("type", pyarrow.string()),
+        ("weapon_stats", STAT_LIST_TYPE),
+    ])
+    ARTIFACT_SCHEMA = pyarrow.schema([
+        ("uid", pyarrow.int64()),
+        ("snapshot_at", pyarrow.float64()),
+        ("position", pyarrow.int32()),
+        ("slot", pyarrow.int32()),
+        ("id", pyarrow.int64()),
+        ("name", pyarrow.string()),
+        ("level", pyarrow.int32()),
+        ("equipment_type", pyarrow.string()),
+        ("rank", pyarrow.int32()),
+        ("set_id", pyarrow.int64()),
+        ("set_name", pyarrow.string()),
+        ("icon", pyarrow.string()),
+        ("main_stat_id", pyarrow.int64()),
+        ("sub_stat_ids", pyarrow.list_(pyarrow.int64())),
+        ("main_stat", STAT_LIST_TYPE),
+        ("sub_stats", STAT_LIST_TYPE),
+    ])
+
+    @classmethod
+    def sync(cls, players: list[Player], db: DuckDBSession, snapshot_at: float = None,
+             max_snapshots: int = 3) -> int:
+        """
+        写入一批玩家快照
+
+        :param players: 玩家列表
+        :param db: DuckDB 会话
+        :param snapshot_at: 快照时间戳，默认为当前时间
+        :param max_snapshots: 每个 UID 最多保留的快照数量，超出时删除最早的快照
+        :return: 写入的玩家数量
+        """
+        if not players:
+            return 0
+        snapshot_at = time.time() if snapshot_at is None else snapshot_at
+        tables = cls.to_tables(players, [snapshot_at] * len(players))
+        cls.write_tables(tables, [player.uid for player in players], db, max_snapshots)
+        return len(players)
+
+    @classmethod
+    def to_tables(cls, players: list[Player], snapshot_ats: list[float]) -> dict[str, pyarrow.Table]:
+        """
+        将一批玩家拆分为各表的 Arrow 表，不访问数据库，可在子进程中执行
+
+        :param players: 玩家列表
+        :param snapshot_ats: 与玩家一一对应的快照时间戳
+        :return: 以表名为键、按写入顺序排列的 Arrow 表，玩家表在最后
+        """
+        player_rows, character_rows, weapon_rows, artifact_rows = [], [], [], []
+
+        for player, snapshot_at in zip(players, snapshot_ats):
+            key = {"uid": player.uid, "snapshot_at": snapshot_at}
+            player_rows.append({**key, **{name: getattr(player, name) for name in cls.PLAYER_SCHEMA.names[2:]}})
+            for position, character in enumerate(player.characters):
+                character_rows.append(cls._character_row(character, position, key))
+                if character.weapon is not None:
+                    weapon_rows.append(cls._weapon_row(character.weapon, position, key))
+                for slot, artifact in enumerate(character.artifacts):
+                    if artifact is not None:
+                        artifact_rows.append(cls._artifact_row(artifact, position, slot, key))
+
+        return {
+            cls.TABLE_CHARACTER: pyarrow.Table.from_pylist(character_rows, schema=cls.CHARACTER_SCHEMA),
+            cls.TABLE_WEAPON: pyarrow.Table.from_pylist(weapon_rows, schema=cls.WEAPON_SCHEMA),
+            cls.TABLE_ARTIFACT: pyarrow.Table.from_pylist(artifact_rows, schema=cls.ARTIFACT_SCHEMA),
+            cls.TABLE_PLAYER: pyarrow.Table.from_pylist(player_rows, schema=cls.PLAYER_SCHEMA),
+        }
+
+    @classmethod
+    def write_tables(cls, tables: dict[str, pyarrow.Table], uids: list[int], db: DuckDBSession,
+                     max_snapshots: int = 3) -> None:
+        """
+        按顺序追加写入 to_tables 生成的 Arrow 表，并清理超出数量的旧快照
+        已存在相同 (uid, snapshot_at) 的快照先删除再写入，重复导入同一份归档不会产生重复行
+
+        :param tables: 以表名为键的 Arrow 表
+        :param uids: 本批玩家的 UID 列表
+        :param db: DuckDB 会话
+        :param max_snapshots: 每个 UID 最多保留的快照数量
+        """
+        db.register_table(tables[cls.TABLE_PLAYER].select(["uid", "snapshot_at"]), "temp_snapshot_key")
+        try:
+            # 先删玩家表，读取方不会看到只剩部分子表的快照
+            for table_name in reversed(tables):
+                if db.table_exists(table_name):
+                    db.execute_sql(f"""
+                        DELETE FROM {table_name} t USING temp_snapshot_key k
+                        WHERE t.uid = k.uid AND t.snapshot_at = k.snapshot_at
+                    """)
+        finally:
+            db.unregister_table("temp_snapshot_key")
+        for table_name, table in tables.items():
+            db.append_table(table, table_name)
+        cls.prune(uids, db, max_snapshots)
+
+    @classmethod
+    def prune(cls, uids: Iterable[int], db: DuckDBSession, max_snapshots: int):
+        """
+        删除指定 UID 超出保留数量的旧快照
+
+        :param uids: 玩家 UID 列表
+        :param db: DuckDB 会话
+        :param max_snapshots: 每个 UID 最多保留的快照数量
+        """
+        db.register_table(cls._uid_table(uids), "temp_uid")
+        try:
+            db.execute_sql(f"""
+                CREATE OR REPLACE TEMP TABLE temp_stale_snapshot AS
+                SELECT uid, snapshot_at FROM (
+                    SELECT DISTINCT uid, snapshot_at FROM {cls.TABLE_PLAYER} WHERE uid IN (SELECT uid FROM temp_uid)
+                ) QUALIFY row_number() OVER (PARTITION BY uid ORDER BY snapshot_at DESC) > ?
+            """, [max_snapshots])
+        finally:
+            db.unregister_table("temp_uid")
+        for table_name in (cls.TABLE_PLAYER, cls.TABLE_CHARACTER, cls.TABLE_WEAPON, cls.TABLE_ARTIFACT):
+            db.execute_sql(f"""
+                DELETE FROM {table_name} t USING temp_stale_snapshot s
+                WHERE t.uid = s.uid AND t.snapshot_at = s.snapshot_at
+            """)
+
+    @classmethod
+    def exists(cls, db: DuckDBSession) -> bool:
+        return all(db.table_exists(table_name) for table_name in
+                   (cls.TABLE_PLAYER, cls.TABLE_CHARACTER, cls.TABLE_WEAPON, cls.TABLE_ARTIFACT))
+
+    @classmethod
+    def get(cls, uids: Iterable[int | str], db: DuckDBSession, compact: bool = False,
+            numeric: NumericMode = NumericMode.DECIMAL) -> dict[int, Player]:
+        """
+        读取指定 UID 的最新快照，每张表只查询一次
+
+        :param uids: 玩家 UID 列表
+        :param db: DuckDB 会话
+        :param compact: 是否使用紧凑表示：字段保存在 __slots__ 中，共享属性与数值实例并驻留重复的字符串
+        :param numeric: 数值模式，FLOAT 时属性值与面板还原为 float
+        :return: 以 UID 为键的 Player 字典，没有快照的 UID 不在结果中
+        """
+        if not cls.exists(db):
+            return {}
+        db.register_table(cls._uid_table(uids), "temp_uid")
+        try:
+            db.execute_sql(f"""
+                CREATE OR REPLACE TEMP TABLE temp_latest_snapshot AS
+                SELECT uid, max(snapshot_at) AS snapshot_at FROM {cls.TABLE_PLAYER}
+                WHERE uid IN (SELECT uid FROM temp_uid) GROUP BY uid
+            """)
+        finally:
+            db.unregister_table("temp_uid")
+
+        # 子表按 (uid, position[, slot]) 排序，顺序与快照写入时一致
+        weapons = {(row["uid"], row["position"]): cls._weapon_from_row(row, compact, numeric)
+                   for row in cls._fetch_latest(cls.TABLE_WEAPON, "uid, position", db)}
+        artifacts = {}
+        for row in cls._fetch_latest(cls.TABLE_ARTIFACT, "uid, position, slot", db):
+            slots = artifacts.setdefault((row["uid"], row["position"]), [None] * len(EquipmentType))
+            slots[row["slot"]] = cls._artifact_from_row(row, compact, numeric)
+        characters = {}
+        for row in cls._fetch_latest(cls.TABLE_CHARACTER, "uid, position", db):
+            key = (row["uid"], row["position"])
+            characters.setdefault(row["uid"], []).append(
+                cls._character_from_row(row, weapons.get(key), artifacts.get(key, [None] * len(EquipmentType)),
+                                        compact, numeric))
+
+        players = {}
+        player_class = CompactPlayer if compact else Player
+        for row in cls._fetch_latest(cls.TABLE_PLAYER, "uid", db):
+            fields = {name: row[name] for name in cls.PLAYER_SCHEMA.names[2:]}
+            players[row["uid"]] = player_class(uid=row["uid"], **fields, characters=characters.get(row["uid"], []))
+        return players
+
+    @staticmethod
+    def _uid_table(uids: Iterable[int | str]) -> pyarrow.Table:
+        """
+        UID 列表转为单列 Arrow 表，供注册后在 SQL 中引用
+        DuckDB 转换 Python 列表参数时会逐个元素尝试导入 pandas，未安装时每个元素都要完整查找一次模块
+        """
+        return pyarrow.table({"uid": pyarrow.array([int(uid) for uid in uids], type=pyarrow.int64())})
+
+    @staticmethod
+    def _fetch_latest(table_name: str, order_by: str, db: DuckDBSession) -> list[dict]:
+        """读取表中属于最新快照的行"""
+        return db.sql(f"""
+            SELECT t.* FROM {table_name} t JOIN temp_latest_snapshot s USING (uid, snapshot_at)
+            ORDER BY {order_by}
+        """).fetch_arrow_table().to_pylist()
+
+    @staticmethod
+    def _dump_stats(stats: list[Stat]) -> list[dict]:
+        return [{"stat_type": stat.stat_type.value, "stat_value": str(stat.stat_value)} for stat in stats]
+
+    @staticmethod
+    def _load_stats(data: list[dict], compact: bool = False,
+                    numeric: NumericMode = NumericMode.DECIMAL) -> list[Stat]:
+        number = _number(numeric, compact)
+        stat = Stat.intern if compact else Stat
+        return [stat(STAT_TYPES_BY_VALUE[item["stat_type"]], number(item["stat_value"])) for item in data]
+
+    @staticmethod
+    def _character_row(character: Character, position: int, key: dict) -> dict:
+        return {
+            **key,
+            "position": position,
+            "id": character.id,
+            "name": character.name,
+            "side_avatar_icon": character._side_avatar_icon,
+            "level": character.level,
+            "exp": character.exp,
+            "promote_level": character.promote_level,
+            "rank": character.rank,
+            "element": character.element.name,
+            "talent_ids": character.talent_ids,
+            "skill_names": json.dumps(character.skill_names, ensure_ascii=False),
+            "skill_level_map": json.dumps(character.skill_level_map),
+            "skill_level_ext": json.dumps(character.skill_level_ext),
+            "friendship": character.friendship,
+            "fight_prop": json.dumps({int(k): str(v) for k, v in character.fight_prop.items()}),
+        }
+
+    @staticmethod
+    def _character_from_row(row: dict, weapon: Weapon | None, artifacts: list[Artifact | None],
+                            compact: bool = False, numeric: NumericMode = NumericMode.DECIMAL) -> Character:
+        number = _number(numeric, compact)
+        return (CompactCharacter if compact else Character)(
+            id=row["id"],
+            name=_text(row["name"], compact),
+            _side_avatar_icon=_text(row["side_avatar_icon"], compact),
+            level=row["level"],
+            exp=row["exp"],
+            promote_level=row["promote_level"],
+            rank=row["rank"],
+            element=Element.from_name(row["element"]),
+            talent_ids=row["talent_ids"],
+            skill_names=json.loads(row["skill_names"]),
+            skill_level_map=json.loads(row["skill_level_map"]),
+            skill_level_ext=json.loads(row["skill_level_ext"]),
+            friendship=row["friendship"],
+            weapon=weapon,
+            artifacts=artifacts,
+            fight_prop={FIGHT_PROP_TYPES_BY_KEY[k]: number(v) for k, v in json.loads(row["fight_prop"]).items()},
+        )
+
+    @classmethod
+    def _weapon_row(cls, weapon: Weapon, position: int, key: dict) -> dict:
+        return {
+            **key,
+            "position": position,
+            "id": weapon.id,
+            "name": weapon.name,
+            "level": weapon.level,
+            "promote_level": weapon.promote_level,
+            "refine": weapon.refine,
+            "rank": weapon.rank,
+            "icon": weapon.icon,
+            "type": weapon.type,
+            "weapon_stats": cls._dump_stats(weapon.weapon_stats),
+        }
+
+    @classmethod
+    def _weapon_from_row(cls, row: dict, compact: bool = False,
+                         numeric: NumericMode = NumericMode.DECIMAL) -> Weapon:
+        return (CompactWeapon if compact else Weapon)(
+            id=row["id"],
+            name=_text(row["name"], compact),
+            level=row["level"],
+            promote_level=row["promote_level"],
+            refine=row["refine"],
+            rank=row["rank"],
+            icon=_text(row["icon"], compact),
+            weapon_stats=cls._load_stats(row["weapon_stats"], compact, numeric),
+            type=_text(row["type"], compact),
+        )
+
+    @classmethod
+    def _artifact_row(cls, artifact: Artifact, position: int, slot: int, key: dict) -> dict:
+        return {
+            **key,
+            "position": position,
+            "slot": slot,
+            "id": artifact.id,
+            "name": artifact.name,
+            "level": artifact.level,
+            "equipment_type": artifact.equipment_type.value,
+            "rank": artifact.rank,
+            "set_id": artifact.set_id,
+            "set_name": artifact.set_name,
+            "icon": artifact.icon,
+            "main_stat_id": artifact.main_stat_id,
+            "sub_stat_ids": artifact.sub_stat_ids,
+            "main_stat": cls._dump_stats([artifact.main_stat]),
+            "sub_stats": cls._dump_stats(artifact.sub_stats),
+        }
+
+    @classmethod
+    def _artifact_from_row(cls, row: dict, compact: bool = False,
+                           numeric: NumericMode = NumericMode.DECIMAL) -> Artifact:
+        sub_stat_ids = row["sub_stat_ids"]
+        if compact and sub_stat_ids:
+            sub_stat_ids = [shared_id(sub_stat_id) for sub_stat_id in sub_stat_ids]
+        return (CompactArtifact if compact else Artifact)(
+            id=row["id"],
+            name=_text(row["name"], compact),
+            level=row["level"],
+            equipment_type=EQUIPMENT_TYPES_BY_VALUE[row["equipment_type"]],
+            rank=row["rank"],
+            set_id=row["set_id"],
+            set_name=_text(row["set_name"], compact),
+            icon=_text(row["icon"], compact),
+            main_stat_id=row["main_stat_id"],
+            sub_stat_ids=sub_stat_ids,
+            main_stat=cls._load_stats(row["main_stat"], compact, numeric)[0],
+            sub_stats=cls._load_stats(row["sub_stats"], compact, numeric),
+        )
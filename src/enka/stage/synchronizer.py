@@ -1,6 +1,7 @@
 from src.core.duckdb.duckdb_engine import DuckDBSession
 from src.enka.model.character_meta import CharacterMeta
-from src.core.util.duckdb_util import sync_dict_to_duckdb, sync_list_to_duckdb, rows_into_model_dict
+from src.core.util.duckdb_util import sync_dict_to_duckdb, sync_dict_batches_to_duckdb, sync_list_to_duckdb, \
+    rows_into_model_dict
 
 
 class EnkaAssetSynchronizer:
@@ -10,31 +11,61 @@ class EnkaAssetSynchronizer:
     TABLE_PFP = "ods_enka_pfp"
     TABLE_CHARACTER_META = "ods_enka_character_meta"
 
+    # 资源代数 {数据库实例: 代数}，每次实际写库时递增，供内存缓存判断是否需要重新载入，数据库实例见 DuckDBSession.instance
+    generations: dict[str, int] = {}
+
     @classmethod
-    def sync_loc(cls, data: dict[str, str], db: DuckDBSession):
-        sync_dict_to_duckdb(data, cls.TABLE_LOC, db, overwrite=False)
+    def sync_loc(cls, data: dict[str, str], db: DuckDBSession) -> bool:
+        return sync_dict_to_duckdb(data, cls.TABLE_LOC, db, overwrite=False)
 
     @classmethod
-    def sync_name_card(cls, data: dict[int, str], db: DuckDBSession):
-        sync_dict_to_duckdb(data, cls.TABLE_NAME_CARD, db, overwrite=False)
+    def sync_loc_batches(cls, batches: list[dict[str, str]], db: DuckDBSession) -> bool:
+        """
+        在同一事务中写入流式解析得到的全部词汇批次，按整个语言计算指纹，资源代数只递增一次
+
+        :param batches: 词汇批次
+        :param db: DuckDB 会话
+        :return: 是否发生写入
+        """
+        written = sync_dict_batches_to_duckdb(batches, cls.TABLE_LOC, db)
+        if written:
+            cls.generations[db.instance] = cls.generations.get(db.instance, 0) + 1
+        return written
 
     @classmethod
-    def sync_pfp(cls, data: dict[int, str], db: DuckDBSession):
-        sync_dict_to_duckdb(data, cls.TABLE_PFP, db, overwrite=False)
+    def sync_name_card(cls, data: dict[int, str], db: DuckDBSession) -> bool:
+        return sync_dict_to_duckdb(data, cls.TABLE_NAME_CARD, db, overwrite=False)
 
     @classmethod
-    def sync_character_meta(cls, data: list[CharacterMeta], db: DuckDBSession):
-        sync_list_to_duckdb(data, cls.TABLE_CHARACTER_META, db, overwrite=False)
+    def sync_pfp(cls, data: dict[int, str], db: DuckDBSession) -> bool:
+        return sync_dict_to_duckdb(data, cls.TABLE_PFP, db, overwrite=False)
 
     @classmethod
-    def sync(cls, name: str, data, db: DuckDBSession):
+    def sync_character_meta(cls, data: list[CharacterMeta], db: DuckDBSession) -> bool:
+        return sync_list_to_duckdb(data, cls.TABLE_CHARACTER_META, db, overwrite=False)
+
+    @classmethod
+    def sync(cls, name: str, data, db: DuckDBSession) -> bool:
         sync_dict = {
             "character": cls.sync_character_meta,
             "name_card": cls.sync_name_card,
             "pfp": cls.sync_pfp,
             "loc": cls.sync_loc,
         }
-        return sync_dict[name](data, db)
+        written = sync_dict[name](data, db)
+        if written:
+            cls.generations[db.instance] = cls.generations.get(db.instance, 0) + 1
+        return written
+
+    @classmethod
+    def generation(cls, db: DuckDBSession) -> tuple[str, int]:
+        """
+        获取数据库的资源代数，只有写入同一数据库的同步才会使代数变化
+
+        :param db: DuckDB 会话
+        :return: (数据库实例, 代数)
+        """
+        return db.instance, cls.generations.get(db.instance, 0)
 
     @classmethod
     def get_loc(cls, db: DuckDBSession) -> dict[str, str]:
@@ -61,3 +92,13 @@ class EnkaAssetSynchronizer:
             "loc": cls.get_loc,
         }
         return get_dict[name](db)
+
+    @classmethod
+    def exists(cls, name: str, db: DuckDBSession) -> bool:
+        table_dict = {
+            "character": cls.TABLE_CHARACTER_META,
+            "name_card": cls.TABLE_NAME_CARD,
+            "pfp": cls.TABLE_PFP,
+            "loc": cls.TABLE_LOC,
+        }
+        return db.table_exists(table_dict[name])
@@ -2,12 +2,22 @@
 from decimal import Decimal
 from types import MappingProxyType
 
-from src.enka.config.prop_stat import FightPropType
+import numpy as np
+
+from src.core.util.numeric import NumericMode, numeric_backend
 from src.enka.model.artifact import Artifact
 from src.enka.model.character import Character
 from src.enka.model.stat import StatType, FIX_STAT_TYPES
+from src.evaluator.model.artifact_batch import (ArtifactBatch, BatchEvalResult, STAT_TYPES, STAT_INDEX,
+                                                BASE_PROP_TYPES, tie_bias, round_half_even)
 from src.evaluator.model.eval_model import CharacterEval, ArtifactEval
-from src.evaluator.model.genre import Genre
+from src.evaluator.model.weight_kernel import WeightKernel
+from src.evaluator.model.genre import Genre, COUNT_STAT_TYPES, DEFAULT_EFFECTIVE_ROLLS
+
+# 固定词条折算成的百分比词条
+CLAC_STAT_TYPES = MappingProxyType({
+    stat_type: StatType.from_name(stat_type.name + "_PERCENT") for stat_type in FIX_STAT_TYPES
+})
 
 
 class YSINAlgorithm:
@@ -29,49 +39,141 @@ class YSINAlgorithm:
         StatType.ELEMENTAL_CHARGE: Decimal(5.5),  # 充能效率
     })
 
+    def __init__(self, numeric: NumericMode = NumericMode.DECIMAL):
+        """
+        :param numeric: 数值模式，DECIMAL 用于精确展示，FLOAT 用于批量评分
+        """
+        self.numeric = numeric_backend(numeric)
+        # 按数值模式预先转换标准收益，除以收益时中点舍入方向与收益的偏差方向相反
+        self._benefits = {stat_type: self.numeric.constant(value)
+                          for stat_type, value in self.__SUB_STAT_BENEFIT.items()}
+        self._benefit_bias = {stat_type: -tie_bias(value) for stat_type, value in self.__SUB_STAT_BENEFIT.items()}
+
+    @property
+    def sub_stat_benefit(self) -> MappingProxyType:
+        """每个圣遗物词条的标准收益"""
+        return self.__SUB_STAT_BENEFIT
+
+    def compile_kernel(self, weights: dict[StatType, int]) -> WeightKernel:
+        """
+        将角色权重编译为评分内核：预先确定每种词条折算后的标准收益与加权有效次数的权重
+
+        参数:
+            weights (dict): 角色的属性权重。
+        返回:
+            WeightKernel: 仅可用于本算法实例的评分内核。
+        """
+        genre = Genre.intern(weights)
+        factors, factor_bias = {}, {}
+        for stat_type in StatType:
+            # 固定词条按折算后的百分比词条计算，只收录有效的词条
+            clac_type = CLAC_STAT_TYPES.get(stat_type, stat_type)
+            if clac_type in self._benefits and clac_type in genre.effective_stats:
+                factors[stat_type] = self._benefits[clac_type]
+                factor_bias[stat_type] = self._benefit_bias[clac_type]
+        clac_weights = {stat_type: self.numeric.constant(genre.clac_stat_weight(stat_type)) for stat_type in StatType}
+        return WeightKernel.compile(weights, factors, factor_bias, clac_weights)
+
     def evaluate_artifact(self, artifact: Artifact, character: Character,
-                          genre: Genre) -> ArtifactEval:
+                          genre: Genre | WeightKernel) -> ArtifactEval:
         """
         根据预设的权重计算圣遗物的总评分。
 
         参数:
             artifact (Artifact): 一个包含圣遗物信息的对象。
+            genre: 流派，或由 compile_kernel 编译的评分内核。
         返回:
             Decimal: 圣遗物的总评分。
         """
-        result = ArtifactEval(artifact)
+        if isinstance(genre, WeightKernel):
+            kernel = genre
+        else:
+            kernel = self.compile_kernel({stat_type: 1 for stat_type in genre.effective_stats})
+        num = self.numeric
+        result = ArtifactEval(artifact, num.zero)
 
         # 副词条收益统计
         for sub_stat in artifact.sub_stats:
-            clac_type = sub_stat.stat_type
-            # 固定词条折算成百分比词条
-            if clac_type in FIX_STAT_TYPES:
-                prop_type = FightPropType.from_name(clac_type.value.replace("PROP_", "PROP_BASE_"))
-                base_prop = character.fight_prop.get(prop_type) / 100
-                # 利用名称构造枚举
-                clac_type = StatType.from_name(clac_type.name + "_PERCENT")
-            else:
-                base_prop = Decimal(1)
+            stat_type = sub_stat.stat_type
+            benefit = kernel.factors.get(stat_type)
             # 计算有效词条数
-            if clac_type in self.__SUB_STAT_BENEFIT.keys() and clac_type in genre.effective_stats:
-                weight = genre.effective_stat_weight(clac_type)
-                effective_roll = sub_stat.stat_value * weight / base_prop / self.__SUB_STAT_BENEFIT[clac_type]
+            if benefit is not None:
+                # 固定词条按基础属性折算成百分比词条
+                prop_type = BASE_PROP_TYPES.get(stat_type)
+                base_prop = num.number(character.fight_prop.get(prop_type)) / 100 if prop_type else num.one
+                effective_roll = num.number(sub_stat.stat_value) / base_prop / benefit
+                bias = kernel.factor_bias[stat_type]
             else:
-                effective_roll = Decimal(0)
-            result.effective_rolls_dict[sub_stat.stat_type] = round(effective_roll, 2)
+                effective_roll, bias = num.zero, 0
+            result.effective_rolls_dict[stat_type] = num.round(effective_roll, 2, bias)
 
         return result
 
-    def evaluate_character(self, character: Character, weights: dict[StatType, int]) -> CharacterEval:
+    def evaluate_character(self, character: Character,
+                           weights: dict[StatType, int] | WeightKernel) -> CharacterEval:
 
-        result = CharacterEval(character)
-        result.genre = Genre.from_weights(weights)
-        artifact_evals = [self.evaluate_artifact(aft, character, result.genre)
+        kernel = weights if isinstance(weights, WeightKernel) else self.compile_kernel(weights)
+        num = self.numeric
+        result = CharacterEval(character, num.zero)
+        result.genre = kernel.genre
+        artifact_evals = [self.evaluate_artifact(aft, character, kernel)
                           for aft in character.artifacts]
-        result.total_effective_rolls = sum(aft.effective_rolls for aft in artifact_evals)
-        total_effective_rolls_clac = sum(aft.effective_rolls_clac(result.genre) for aft in artifact_evals)
+        # 各项已保留两位小数，再次取整只消除浮点累加误差
+        result.total_effective_rolls = num.round(sum((aft.effective_rolls for aft in artifact_evals), num.zero), 2)
+        total_effective_rolls_clac = sum((rolls * kernel.clac_weights[stat_type]
+                                          for aft in artifact_evals
+                                          for stat_type, rolls in aft.effective_rolls_dict.items()), num.zero)
 
-        # 计算总分
-        result.total_score = round(total_effective_rolls_clac * 100 / result.genre.default_effective_rolls(), 2)
+        # 计算总分，有效属性数量不在定义范围内时由 default_effective_rolls 报错
+        default_rolls = kernel.default_rolls or kernel.genre.default_effective_rolls()
+        result.total_score = num.round(total_effective_rolls_clac * 100 / default_rolls, 2)
         result.artifacts = artifact_evals
         return result
+
+    def evaluate_batch(self, batch: ArtifactBatch) -> BatchEvalResult:
+        """
+        以矩阵运算批量计算有效词条数与总分，结果与逐个调用 evaluate_character 一致
+
+        参数:
+            batch (ArtifactBatch): 打包后的圣遗物矩阵。
+        返回:
+            BatchEvalResult: 有效词条数与角色总分。
+        """
+        benefit = np.zeros(len(STAT_TYPES))
+        for stat_type, value in self.__SUB_STAT_BENEFIT.items():
+            benefit[STAT_INDEX[stat_type]] = float(value)
+
+        # 固定词条折算成百分比词条后的列下标
+        clac_index = np.arange(len(STAT_TYPES))
+        for stat_type, clac_type in CLAC_STAT_TYPES.items():
+            clac_index[STAT_INDEX[stat_type]] = STAT_INDEX[clac_type]
+        clac_benefit = benefit[clac_index]
+
+        # 计算有效词条数，以 0.01 为单位保存为整数
+        effective = batch.weights[batch.owner] > 0
+        valid = (clac_benefit > 0) & effective[:, clac_index]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rolls = batch.sub_values / batch.base_props[batch.owner] / np.where(clac_benefit > 0, clac_benefit, 1)
+        hundredths = round_half_even(np.where(valid, rolls, 0) * 100)
+
+        # 计算加权：充能与精通恒为 0.5，其余按原词条是否有效记 1 或 0，以 0.005 为单位
+        clac_units = np.where(effective, 2, 0)
+        clac_units[:, [STAT_INDEX[StatType.ELEMENTAL_CHARGE], STAT_INDEX[StatType.ELEMENTAL_MASTERY]]] = 1
+        character_clac = np.bincount(batch.owner, weights=(hundredths * clac_units).sum(axis=1),
+                                     minlength=batch.character_count)
+        artifact_hundredths = hundredths.sum(axis=1)
+        character_hundredths = np.bincount(batch.owner, weights=artifact_hundredths,
+                                           minlength=batch.character_count)
+
+        # 默认有效词条数，有效属性数量不在定义范围内时为 nan
+        count_index = [STAT_INDEX[stat_type] for stat_type in COUNT_STAT_TYPES]
+        default_rolls = np.array([DEFAULT_EFFECTIVE_ROLLS.get(n, np.nan) for n in range(len(count_index) + 1)])[
+            (batch.weights[:, count_index] > 0).sum(axis=1)]
+
+        return BatchEvalResult(
+            artifact_scores=np.zeros(len(artifact_hundredths)),
+            artifact_effective_rolls=artifact_hundredths / 100,
+            effective_rolls=hundredths / 100,
+            character_scores=round_half_even(character_clac * 50 / default_rolls) / 100,
+            character_effective_rolls=character_hundredths / 100
+        )
@@ -2,10 +2,16 @@
 from decimal import Decimal
 from types import MappingProxyType
 
+import numpy as np
+
+from src.core.util.numeric import NumericMode, numeric_backend
 from src.enka.model.artifact import Artifact
 from src.enka.model.character import Character
 from src.enka.model.stat import StatType
+from src.evaluator.model.artifact_batch import (ArtifactBatch, BatchEvalResult, STAT_TYPES, STAT_INDEX,
+                                                tie_bias, round_half_even)
 from src.evaluator.model.eval_model import CharacterEval, ArtifactEval
+from src.evaluator.model.weight_kernel import WeightKernel
 
 
 class XZSAlgorithm:
@@ -43,36 +49,94 @@ class XZSAlgorithm:
         StatType.ELEMENTAL_CHARGE: Decimal(1.197943),  # 充能效率
     })
 
-    def __init__(self):
+    def __init__(self, numeric: NumericMode = NumericMode.DECIMAL):
+        """
+        :param numeric: 数值模式，DECIMAL 用于精确展示，FLOAT 用于批量评分
+        """
         self.factor_dict = self.__XZS_ARTIFACT_STAT_FACTORS
+        self.numeric = numeric_backend(numeric)
+        # 按数值模式预先转换系数，并记录系数由浮点构造带来的中点舍入方向
+        self._factors = {stat_type: self.numeric.constant(factor) for stat_type, factor in self.factor_dict.items()}
+        self._factor_bias = {stat_type: tie_bias(factor) for stat_type, factor in self.factor_dict.items()}
+
+    def compile_kernel(self, weights: dict[StatType, int]) -> WeightKernel:
+        """
+        将角色权重与系数预先相乘，编译为评分内核
+
+        参数:
+            weights (dict): 角色的属性权重。
+        返回:
+            WeightKernel: 仅可用于本算法实例的评分内核。
+        """
+        return WeightKernel.compile(
+            weights,
+            factors={stat_type: factor * weights.get(stat_type, 0) for stat_type, factor in self._factors.items()},
+            factor_bias=self._factor_bias
+        )
 
     def evaluate_artifact(self, artifact: Artifact, character: Character,
-                          weights: dict[StatType, int]) -> ArtifactEval:
+                          weights: dict[StatType, int] | WeightKernel) -> ArtifactEval:
         """
         根据预设的权重计算圣遗物的总评分。
 
         参数:
             artifact (Artifact): 一个包含圣遗物信息的对象。
+            weights: 角色的属性权重，或由 compile_kernel 编译的评分内核。
         返回:
             Decimal: 圣遗物的总评分。
         """
-        result = ArtifactEval(artifact)
+        kernel = weights if isinstance(weights, WeightKernel) else self.compile_kernel(weights)
+        num = self.numeric
+        result = ArtifactEval(artifact, num.zero)
 
         # 副词条评分
         for sub_stat in artifact.sub_stats:
-            if sub_stat.stat_type in self.factor_dict.keys():
-                result.score +=  round(sub_stat.stat_value * self.factor_dict[sub_stat.stat_type] * weights.get(sub_stat.stat_type, 0) / 100, 1)
+            stat_type = sub_stat.stat_type
+            if stat_type in kernel.factors:
+                score = num.number(sub_stat.stat_value) * kernel.factors[stat_type] / 100
+                result.score += num.round(score, 1, kernel.factor_bias[stat_type])
 
-        result.score = round(result.score, 0)
+        result.score = num.round(result.score, 0)
         if artifact.main_stat.stat_type in [StatType.CRIT_DMG, StatType.CRIT_RATE]:
             result.score += 20
 
         return result
 
-    def evaluate_character(self, character: Character, weights: dict[StatType, int]) -> CharacterEval:
-        result = CharacterEval(character)
-        artifact_evals = [self.evaluate_artifact(aft, character, weights)
+    def evaluate_character(self, character: Character,
+                           weights: dict[StatType, int] | WeightKernel) -> CharacterEval:
+        kernel = weights if isinstance(weights, WeightKernel) else self.compile_kernel(weights)
+        result = CharacterEval(character, self.numeric.zero)
+        artifact_evals = [self.evaluate_artifact(aft, character, kernel)
                           for aft in character.artifacts]
-        result.total_score = sum(aft.score for aft in artifact_evals)
+        result.total_score = sum((aft.score for aft in artifact_evals), self.numeric.zero)
         result.artifacts = artifact_evals
         return result
+
+    def evaluate_batch(self, batch: ArtifactBatch) -> BatchEvalResult:
+        """
+        以矩阵运算批量计算圣遗物评分，结果与逐个调用 evaluate_character 一致
+
+        参数:
+            batch (ArtifactBatch): 打包后的圣遗物矩阵。
+        返回:
+            BatchEvalResult: 圣遗物得分与角色总分。
+        """
+        factors = np.zeros(len(STAT_TYPES))
+        bias = np.zeros(len(STAT_TYPES), dtype=np.int64)
+        for stat_type, factor in self.factor_dict.items():
+            factors[STAT_INDEX[stat_type]] = float(factor)
+            bias[STAT_INDEX[stat_type]] = tie_bias(factor)
+
+        # 副词条评分，以 0.1 分为单位保存为整数，避免浮点累加误差
+        sub_tenths = round_half_even(batch.sub_values * factors * batch.weights[batch.owner] / 10, bias)
+        artifact_scores = round_half_even(sub_tenths.sum(axis=1) / 10)
+        crit_main = np.isin(batch.main_stat_index, [STAT_INDEX[StatType.CRIT_DMG], STAT_INDEX[StatType.CRIT_RATE]])
+        artifact_scores += np.where(crit_main, 20, 0)
+
+        return BatchEvalResult(
+            artifact_scores=artifact_scores,
+            artifact_effective_rolls=np.zeros(len(artifact_scores)),
+            effective_rolls=np.zeros_like(batch.sub_values),
+            character_scores=np.bincount(batch.owner, weights=artifact_scores, minlength=batch.character_count),
+            character_effective_rolls=np.zeros(batch.character_count)
+        )
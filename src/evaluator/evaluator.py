@@ -1,14 +1,25 @@
-from src.core.util.http_util import fetch_and_parse
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util.http_util import fetch_and_parse, NOT_MODIFIED
+from src.core.util.http_validator import HttpValidatorStore
+from src.core.util.logger import logger
 from src.core.util.s3_auth import S3RequestsAuth
 from src.enka.client import EnkaClient
+from src.enka.model.artifact import Artifact
 from src.enka.model.character import Character
 from src.enka.model.player import Player
 from src.evaluator.algorithm.stat_based import YSINAlgorithm
 from src.evaluator.algorithm.weight_based import XZSAlgorithm
+from src.evaluator.model.artifact_batch import ArtifactBatch, BatchEvalResult
 from src.config.oss_conf import *
 from src.evaluator.model.genre import GENRE_DEFAULT
+from src.evaluator.model.weight_kernel import WeightKernel
+from src.evaluator.stage.archive_ingestor import ArchiveIngestor, IngestStats
+from src.evaluator.stage.artifact_inventory_synchronizer import ArtifactInventorySynchronizer
+from src.evaluator.stage.artifact_fact_synchronizer import ArtifactFactSynchronizer
+from src.evaluator.stage.sql_scorer import SqlScorer
 from src.evaluator.stage.stat_weight_parser import StatWeightParser
 from src.evaluator.stage.synchronizer import StatWeightSynchronizer
+from src.mona.stage.mona_parser import MonaParser
 
 
 class Evaluator:
@@ -19,8 +30,19 @@ class Evaluator:
         self.algorithm = algorithm
         self._enka_client = client
         self._character_weights_map = {}
+        # 当前载入的权重版本 (数据库实例, 版本)，见 StatWeightSynchronizer.get_cached
+        self._weights_version = None
+        # 按角色编译的评分内核，权重变化时重新编译
+        self._kernels: dict[int, WeightKernel] = {}
+        self._default_kernel: WeightKernel | None = None
 
     async def fetch_character_weights(self):
+        if self._enka_client.read_only:
+            # 只读会话的权重由写入进程同步，这里只载入快照中已有的权重
+            logger.warning("只读会话不能同步角色权重，请在写入进程中执行 fetch_character_weights()")
+            await self.refresh_weights_async()
+            return self._character_weights_map
+
         # 创建认证对象
         auth = S3RequestsAuth(
             access_key=ACCESS_KEY,
@@ -31,28 +53,75 @@ class Evaluator:
         )
 
         url = f"{CLAW_CLOUD_RUN_BASE_URL}/{BUCKET}/{self.algorithm.REMOTE_WEIGHT_TABLE}.csv"
+        algorithm_name = self.algorithm.__class__.__name__
+        adb = self._enka_client.adb
+        # 本地已有权重时才发起条件请求
+        validators = await adb.read(
+            lambda db: HttpValidatorStore.get(url, db) if StatWeightSynchronizer.exists(algorithm_name, db) else {})
 
         character_stat_weights = await fetch_and_parse(
             client=self._enka_client.client,
             url=url,
             parser=StatWeightParser.parse_character_weight,
             data_type="csv",
-            auth=auth
+            auth=auth,
+            validators=validators
         )
+        if character_stat_weights is NOT_MODIFIED:
+            # 权重未变更，跳过入库
+            await self.refresh_weights_async()
+            return self._character_weights_map
+
+        def sync(db: DuckDBSession):
+            written = StatWeightSynchronizer.sync(algorithm_name, character_stat_weights, db)
+            HttpValidatorStore.sync(validators, db)
+            # 权重表整体替换后重新创建评分视图
+            SqlScorer.ensure_installed(algorithm_name, db, refresh=written)
+            # 在写入线程中重新载入权重并编译评分内核
+            self._refresh_weights(db)
+
         # 同步入库并从数据库重新载入缓存
-        algorithm_name = self.algorithm.__class__.__name__
-        StatWeightSynchronizer.sync(algorithm_name, character_stat_weights, self._enka_client.db)
-        self._character_weights_map = StatWeightSynchronizer.get(algorithm_name, self._enka_client.db)
+        await adb.write(sync)
 
         return self._character_weights_map
 
+    @property
+    def weights_loaded(self) -> bool:
+        """是否已载入角色权重"""
+        return bool(self._character_weights_map)
+
+    @property
+    def weights_version(self):
+        """当前载入的权重版本 (数据库实例, 版本)，切换数据库（如新的快照）后随之变化"""
+        return self._weights_version
+
     def refresh_weights(self):
-        algorithm_name = self.algorithm.__class__.__name__
-        data = StatWeightSynchronizer.get(algorithm_name, self._enka_client.db)
-        if data:
-            self._character_weights_map = data
+        """载入权重，权重版本未变化时沿用缓存与已编译的评分内核"""
+        self._refresh_weights(self._enka_client.db)
+        return
+
+    async def refresh_weights_async(self):
+        """refresh_weights 的异步版本，读取权重与编译评分内核在工作线程中执行，不阻塞事件循环"""
+        await self._enka_client.adb.read(self._refresh_weights)
         return
 
+    def _refresh_weights(self, db: DuckDBSession):
+        """从指定会话载入权重，版本变化时重新编译评分内核"""
+        algorithm_name = self.algorithm.__class__.__name__
+        version, data = StatWeightSynchronizer.get_cached(algorithm_name, db)
+        # 版本号按数据库实例计数，切换数据库后即使版本号相同也要重新载入
+        version = (db.instance, version)
+        if data and version != self._weights_version:
+            self._set_weights(data)
+            self._weights_version = version
+
+    def _set_weights(self, data: dict):
+        """替换角色权重并重新编译所有角色的评分内核"""
+        self._character_weights_map = data
+        self._kernels = {character_id: self.algorithm.compile_kernel(weight.to_dict())
+                         for character_id, weight in data.items()}
+        self._default_kernel = self.algorithm.compile_kernel({k: 1 for k in GENRE_DEFAULT.effective_stats})
+
     def evaluate_player(self, player: Player):
         """计算玩家角色携带的所有圣遗物"""
         self.refresh_weights()
@@ -61,11 +130,60 @@ class Evaluator:
 
     def evaluate_character(self, character: Character):
         """计算角色携带的所有圣遗物"""
-        if character.id in self._character_weights_map:
-            weights = self._character_weights_map.get(character.id).to_dict()
+        return self.algorithm.evaluate_character(character, self.character_kernel(character))
+
+    def evaluate_batch(self, characters: list[Character]) -> BatchEvalResult:
+        """以矩阵运算批量计算多个角色携带的所有圣遗物"""
+        batch = ArtifactBatch.pack(characters, [self.character_kernel(c).vector for c in characters])
+        return self.algorithm.evaluate_batch(batch)
+
+    def evaluate_inventory(self, artifacts: list[Artifact], character: Character) -> BatchEvalResult:
+        """以矩阵运算按角色的权重与基础属性批量计算背包中的圣遗物，只使用结果中圣遗物的部分"""
+        batch = ArtifactBatch.pack_inventory(artifacts, character, self.character_kernel(character).vector)
+        return self.algorithm.evaluate_batch(batch)
+
+    def import_mona_inventory(self, path: str, uid: int) -> int:
+        """流式解析 Mona 格式的圣遗物背包，整体替换账号在背包表中的数据，返回圣遗物数量"""
+        artifacts = MonaParser.iter_file(path, self._enka_client.numeric)
+        return ArtifactInventorySynchronizer.sync(int(uid), artifacts, self._enka_client.db)
+
+    def load_inventory(self, uid: int) -> list[Artifact]:
+        """从背包表读取账号的圣遗物"""
+        return ArtifactInventorySynchronizer.get(int(uid), self._enka_client.db, self._enka_client.numeric)
+
+    def sync_artifacts(self, players: list[Player]) -> int:
+        """将玩家携带的圣遗物写入事实表，供库内评分使用"""
+        count = ArtifactFactSynchronizer.sync(players, self._enka_client.db)
+        SqlScorer.ensure_installed(self.algorithm.__class__.__name__, self._enka_client.db)
+        return count
+
+    def ingest_archive(self, root: str, max_workers: int = None, shard_size: int = 64,
+                       write_batch_size: int = 1024) -> IngestStats:
+        """导入目录树中归档的玩家响应，按当前算法评分后入库，中断后可续传，见 ArchiveIngestor"""
+        self._enka_client.refresh_assets()
+        return ArchiveIngestor.ingest(root, self._enka_client.asset_map, self._enka_client.db,
+                                      self._enka_client.numeric, [self.algorithm.__class__.__name__],
+                                      max_workers, shard_size, write_batch_size)
+
+    def rank_characters(self, character_id: int = None, limit: int = 100):
+        """在 DuckDB 中对已入库的角色按当前算法评分并排行"""
+        return SqlScorer.leaderboard(self.algorithm.__class__.__name__, self._enka_client.db, character_id, limit)
+
+    def character_kernel(self, character: Character) -> WeightKernel:
+        """获取角色的评分内核，缺少该角色时使用默认流派"""
+        kernel = self._kernels.get(character.id)
+        if kernel is not None:
+            return kernel
         elif self._character_weights_map:
-            weights = {k: 1 for k in GENRE_DEFAULT.effective_stats}
+            return self._default_kernel
         else:
             raise ValueError("没有找到角色权重")
 
-        return self.algorithm.evaluate_character(character, weights)
+    def character_weights(self, character: Character):
+        """获取角色的属性权重，缺少该角色时使用默认流派"""
+        if character.id in self._character_weights_map:
+            return self._character_weights_map.get(character.id).to_dict()
+        elif self._character_weights_map:
+            return {k: 1 for k in GENRE_DEFAULT.effective_stats}
+        else:
+            raise ValueError("没有找到角色权重")
@@ -0,0 +1,160 @@
+# artifact_batch.py
+
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Sequence
+
+import numpy as np
+
+from src.enka.config.prop_stat import FightPropType
+from src.enka.model.artifact import Artifact
+from src.enka.model.character import Character
+from src.enka.model.stat import StatType, FIX_STAT_TYPES
+
+# 矩阵列顺序与 StatType 定义顺序一致
+STAT_TYPES = tuple(StatType)
+STAT_INDEX = MappingProxyType({stat_type: i for i, stat_type in enumerate(STAT_TYPES)})
+
+# 固定值词条对应的基础属性
+BASE_PROP_TYPES = MappingProxyType({
+    stat_type: FightPropType.from_name(stat_type.value.replace("PROP_", "PROP_BASE_"))
+    for stat_type in FIX_STAT_TYPES
+})
+
+
+@dataclass
+class ArtifactBatch:
+    """多个角色所携带圣遗物的稠密矩阵表示，供批量评分使用"""
+    # 副词条数值矩阵 (圣遗物 × StatType)
+    sub_values: np.ndarray
+    # 主词条类型下标 (圣遗物,)
+    main_stat_index: np.ndarray
+    # 圣遗物所属角色下标 (圣遗物,)
+    owner: np.ndarray
+    # 角色权重矩阵 (角色 × StatType)
+    weights: np.ndarray
+    # 角色基础属性 / 100 (角色 × StatType)，仅固定值词条所在列有效，其余为 1
+    base_props: np.ndarray
+    # 每个圣遗物的来源 (角色下标, 槽位下标)
+    slots: list[tuple[int, int]]
+
+    @property
+    def character_count(self) -> int:
+        return self.weights.shape[0]
+
+    @classmethod
+    def pack(cls, characters: Sequence[Character],
+             weights: Sequence[dict[StatType, int] | np.ndarray]) -> 'ArtifactBatch':
+        """
+        将角色及其权重打包为矩阵
+
+        :param characters: 角色列表
+        :param weights: 与角色一一对应的权重字典，或按 STAT_TYPES 顺序排列的权重向量
+        :return: ArtifactBatch 实例
+        """
+        stat_count = len(STAT_TYPES)
+        weight_matrix = np.zeros((len(characters), stat_count))
+        base_props = np.ones((len(characters), stat_count))
+        rows, main_stat_index, owner, slots = [], [], [], []
+
+        for c, (character, weight) in enumerate(zip(characters, weights)):
+            if isinstance(weight, np.ndarray):
+                weight_matrix[c] = weight
+            else:
+                for stat_type, value in weight.items():
+                    weight_matrix[c, STAT_INDEX[stat_type]] = value
+            for stat_type, prop_type in BASE_PROP_TYPES.items():
+                base = character.fight_prop.get(prop_type)
+                base_props[c, STAT_INDEX[stat_type]] = float(base) / 100 if base is not None else np.nan
+
+            for slot, artifact in enumerate(character.artifacts):
+                if artifact is None:
+                    continue
+                rows.append(cls._sub_value_row(artifact))
+                main_stat_index.append(STAT_INDEX[artifact.main_stat.stat_type])
+                owner.append(c)
+                slots.append((c, slot))
+
+        return cls(
+            sub_values=np.array(rows).reshape(len(rows), stat_count),
+            main_stat_index=np.array(main_stat_index, dtype=np.int64),
+            owner=np.array(owner, dtype=np.int64),
+            weights=weight_matrix,
+            base_props=base_props,
+            slots=slots
+        )
+
+    @classmethod
+    def pack_inventory(cls, artifacts: Sequence[Artifact], character: Character,
+                       weight: dict[StatType, int] | np.ndarray) -> 'ArtifactBatch':
+        """
+        将不属于任何角色的圣遗物（如整个背包）按同一角色的权重与基础属性打包，
+        所有圣遗物的所属角色下标为 0，来源为 (0, 圣遗物在列表中的下标)；角色总分没有意义，只使用圣遗物的结果
+
+        :param artifacts: 圣遗物列表
+        :param character: 提供权重与基础属性的角色，不使用其携带的圣遗物
+        :param weight: 角色的权重字典，或按 STAT_TYPES 顺序排列的权重向量
+        :return: ArtifactBatch 实例
+        """
+        batch = cls.pack([character], [weight])
+        stat_count = len(STAT_TYPES)
+        batch.sub_values = np.array([cls._sub_value_row(artifact) for artifact in artifacts]).reshape(
+            len(artifacts), stat_count)
+        batch.main_stat_index = np.array([STAT_INDEX[artifact.main_stat.stat_type] for artifact in artifacts],
+                                         dtype=np.int64)
+        batch.owner = np.zeros(len(artifacts), dtype=np.int64)
+        batch.slots = [(0, index) for index in range(len(artifacts))]
+        return batch
+
+    @staticmethod
+    def _sub_value_row(artifact: Artifact) -> np.ndarray:
+        """圣遗物的副词条数值行"""
+        row = np.zeros(len(STAT_TYPES))
+        for sub_stat in artifact.sub_stats:
+            row[STAT_INDEX[sub_stat.stat_type]] = float(sub_stat.stat_value)
+        return row
+
+
+@dataclass
+class BatchEvalResult:
+    """批量评分结果"""
+    # 圣遗物得分 (圣遗物,)
+    artifact_scores: np.ndarray
+    # 圣遗物有效词条数 (圣遗物,)
+    artifact_effective_rolls: np.ndarray
+    # 副词条有效词条数 (圣遗物 × StatType)
+    effective_rolls: np.ndarray
+    # 角色总分 (角色,)
+    character_scores: np.ndarray
+    # 角色总有效词条数 (角色,)
+    character_effective_rolls: np.ndarray
+
+
+def tie_bias(factor: Decimal, digits: int = 10) -> int:
+    """
+    系数由浮点数构造时，其精确值相对名义值的偏差方向
+    Decimal 运算在名义值恰好落在进位中点时按此方向舍入
+
+    :param factor: 系数
+    :param digits: 名义值的有效位数
+    :return: 1 向上，-1 向下，0 无偏差
+    """
+    nominal = Decimal(format(factor, f".{digits}g"))
+    return (factor > nominal) - (factor < nominal)
+
+
+def round_half_even(values: np.ndarray, bias: np.ndarray | int = 0, atol: float = 1e-9) -> np.ndarray:
+    """
+    按 Decimal 的 ROUND_HALF_EVEN 规则取整
+    与进位中点的距离小于 atol 时视为名义上的中点，按 bias 方向舍入，无偏差时取偶数
+
+    :param values: 待取整的数组
+    :param bias: 每列的偏差方向，见 tie_bias
+    :param atol: 中点判定容差
+    :return: 取整后的数组
+    """
+    floor = np.floor(values)
+    tie = np.abs(values - floor - 0.5) < atol
+    tie_result = np.where(bias > 0, floor + 1, np.where(bias < 0, floor, floor + np.mod(floor, 2)))
+    return np.where(tie, tie_result, np.rint(values))
@@ -1,7 +1,22 @@
 from dataclasses import dataclass
+from types import MappingProxyType
 
 from src.enka.model.stat import StatType
 
+# 属性类型与权重表列名的对应关系
+STAT_WEIGHT_COLUMNS = MappingProxyType({
+    StatType.ATK_PERCENT: "attack_percent",
+    StatType.HP_PERCENT: "hp_percent",
+    StatType.DEF_PERCENT: "defense_percent",
+    StatType.CRIT_RATE: "critical",
+    StatType.CRIT_DMG: "critical_hurt",
+    StatType.ELEMENTAL_MASTERY: "element_mastery",
+    StatType.ELEMENTAL_CHARGE: "charge_efficiency",
+    StatType.HP: "hp",
+    StatType.ATK: "attack",
+    StatType.DEF: "defense",
+})
+
 
 @dataclass
 class CharacterStatWeight:
@@ -22,15 +37,4 @@ class CharacterStatWeight:
     defense: int
 
     def to_dict(self):
-        return {
-            StatType.ATK_PERCENT: self.attack_percent,
-            StatType.HP_PERCENT: self.hp_percent,
-            StatType.DEF_PERCENT: self.defense_percent,
-            StatType.CRIT_RATE: self.critical,
-            StatType.CRIT_DMG: self.critical_hurt,
-            StatType.ELEMENTAL_MASTERY: self.element_mastery,
-            StatType.ELEMENTAL_CHARGE: self.charge_efficiency,
-            StatType.HP: self.hp,
-            StatType.ATK: self.attack,
-            StatType.DEF: self.defense,
-        }
+        return {stat_type: getattr(self, column) for stat_type, column in STAT_WEIGHT_COLUMNS.items()}
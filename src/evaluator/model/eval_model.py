@@ -1,38 +1,73 @@
 from decimal import Decimal
+from operator import attrgetter
 
+from src.core.util.numeric import DecimalBackend
 from src.enka.model.artifact import Artifact
 from src.enka.model.character import Character
 from src.enka.model.stat import StatType
 from src.evaluator.model.genre import Genre
 
 
-class ArtifactEval(Artifact):
+class _SourceView:
+    """
+    评分结果视图的公共部分：只保存评分字段，源对象的其余字段以只读属性转发，
+    不再复制源对象的全部字段
+    """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # 为未在 __slots__ 中声明的数据类字段生成转发属性
+        for name in cls.__dataclass_fields__:
+            if name not in cls.__slots__:
+                setattr(cls, name, property(attrgetter(f"source.{name}")))
+
+    def __getstate__(self) -> dict:
+        # 只序列化视图自身的字段，转发属性由 source 还原
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class ArtifactEval(_SourceView, Artifact):
+    """圣遗物评分结果，引用源圣遗物"""
+    __slots__ = ("source", "score", "effective_rolls_dict")
+
     def __init__(self, artifact: Artifact, score: Decimal = Decimal(0)):
-        # 复制父类的所有属性
-        super().__init__(**artifact.__dict__)
-        # 添加新的字段
+        # 评分结果之间不嵌套，始终引用原始圣遗物
+        self.source = artifact.source if isinstance(artifact, ArtifactEval) else artifact
         self.score = score
         self.effective_rolls_dict: dict[StatType, Decimal] = dict()
 
     @property
     def effective_rolls(self) -> Decimal:
-        return sum(self.effective_rolls_dict.values(), Decimal(0))
+        # 与得分使用同一数值类型累加
+        return sum(self.effective_rolls_dict.values(), type(self.score)(0))
 
-    def effective_rolls_clac(self, genre: Genre) -> Decimal:
+    def effective_rolls_clac(self, genre: Genre, numeric=DecimalBackend) -> Decimal:
         """
         计算加权的有效次数总和
         使用genre的clac_stat_weight方法作为权重
+
+        :param genre: 流派
+        :param numeric: 数值后端，需与有效次数的数值类型一致
         """
-        weight_values = [rolls * genre.clac_stat_weight(stat_type)
+        weight_values = [rolls * numeric.constant(genre.clac_stat_weight(stat_type))
                          for stat_type, rolls in self.effective_rolls_dict.items()]
-        return sum(weight_values, Decimal(0))
+        return sum(weight_values, numeric.zero)
+
 
+class CharacterEval(_SourceView, Character):
+    """角色评分结果，引用源角色，artifacts 为圣遗物评分结果"""
+    __slots__ = ("source", "artifacts", "genre", "total_score", "total_effective_rolls")
 
-class CharacterEval(Character):
     def __init__(self, character: Character, total_score: Decimal = Decimal(0)):
-        # 复制父类的所有属性
-        super().__init__(**character.__dict__)
-        # 添加新的字段
+        # 评分结果之间不嵌套，始终引用原始角色
+        self.source = character.source if isinstance(character, CharacterEval) else character
+        self.artifacts = character.artifacts
         self.genre = None
         self.total_score = total_score
-        self.total_effective_rolls = Decimal(0)
+        # 与总分使用同一数值类型
+        self.total_effective_rolls = type(total_score)(0)
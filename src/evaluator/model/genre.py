@@ -2,9 +2,33 @@
 
 from dataclasses import dataclass
 from decimal import Decimal
+from types import MappingProxyType
 
 from src.enka.model.stat import StatType
 
+# 计入默认有效次数的属性集合
+COUNT_STAT_TYPES = frozenset({
+    StatType.HP_PERCENT,
+    StatType.ATK_PERCENT,
+    StatType.DEF_PERCENT,
+    StatType.ELEMENTAL_CHARGE,
+    StatType.ELEMENTAL_MASTERY,
+    StatType.CRIT_RATE,
+    StatType.CRIT_DMG,
+})
+
+# 加权有效次数的权重，充能与精通恒为 0.5
+CLAC_HALF_STAT_TYPES = frozenset({StatType.ELEMENTAL_CHARGE, StatType.ELEMENTAL_MASTERY})
+_CLAC_WEIGHT_HALF = Decimal(0.5)
+_CLAC_WEIGHT_FULL = Decimal(1.0)
+_CLAC_WEIGHT_NONE = Decimal(0.0)
+
+# 有效属性数量对应的默认有效次数
+DEFAULT_EFFECTIVE_ROLLS = MappingProxyType({2: 18, 3: 22, 4: 25, 5: 28, 6: 31, 7: 34})
+
+# 按有效属性集合缓存的流派实例，见 Genre.intern
+_GENRE_POOL: dict[frozenset[StatType], 'Genre'] = {}
+
 
 @dataclass
 class Genre:
@@ -20,6 +44,15 @@ class Genre:
         name = cls._generate_name_from_stats(effective_stats)
         return cls(name, effective_stats)
 
+    @classmethod
+    def intern(cls, weights: dict[StatType, int]) -> 'Genre':
+        """从权重字典获取Genre实例，有效属性相同的权重共享同一实例，调用方不应修改返回值"""
+        key = frozenset(stat_type for stat_type, weight in weights.items() if weight > 0)
+        genre = _GENRE_POOL.get(key)
+        if genre is None:
+            genre = _GENRE_POOL.setdefault(key, cls.from_weights(weights))
+        return genre
+
     @staticmethod
     def _generate_name_from_stats(effective_stats) -> str:
         """根据有效属性生成名称"""
@@ -53,28 +86,18 @@ class Genre:
 
     def clac_stat_weight(self, stat_type: StatType) -> Decimal:
         """获取所有属性的权重字典，有效属性为1，无效属性为0"""
-        if stat_type in {StatType.ELEMENTAL_CHARGE, StatType.ELEMENTAL_MASTERY}:
-            return Decimal(0.5)
+        if stat_type in CLAC_HALF_STAT_TYPES:
+            return _CLAC_WEIGHT_HALF
         elif stat_type in self.effective_stats:
-            return Decimal(1.0)
+            return _CLAC_WEIGHT_FULL
         else:
-            return Decimal(0.0)
+            return _CLAC_WEIGHT_NONE
 
     def default_effective_rolls(self) -> int:
         """获取所有属性的默认有效次数"""
-        count_stat_set = {
-            StatType.HP_PERCENT,
-            StatType.ATK_PERCENT,
-            StatType.DEF_PERCENT,
-            StatType.ELEMENTAL_CHARGE,
-            StatType.ELEMENTAL_MASTERY,
-            StatType.CRIT_RATE,
-            StatType.CRIT_DMG,
-        }
-
-        effective_stats = len(self.effective_stats & count_stat_set)
-
-        return {2: 18, 3: 22, 4: 25, 5: 28, 6: 31, 7: 34}[effective_stats]
+        effective_stats = len(self.effective_stats & COUNT_STAT_TYPES)
+
+        return DEFAULT_EFFECTIVE_ROLLS[effective_stats]
 
     pass
 
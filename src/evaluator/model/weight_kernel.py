@@ -0,0 +1,61 @@
+# weight_kernel.py
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Optional
+
+import numpy as np
+
+from src.enka.model.stat import StatType
+from src.evaluator.model.artifact_batch import STAT_TYPES, STAT_INDEX
+from src.evaluator.model.genre import Genre, COUNT_STAT_TYPES, DEFAULT_EFFECTIVE_ROLLS
+
+
+@dataclass(frozen=True, slots=True)
+class WeightKernel:
+    """
+    角色权重编译后的不可变评分内核
+    权重载入后每个角色只编译一次，逐角色评分时只需查表与算术运算
+    """
+    # 属性权重
+    weights: MappingProxyType
+    # 按 STAT_TYPES 顺序排列的稠密权重向量（只读）
+    vector: np.ndarray
+    # 流派，有效属性相同的内核共享同一实例
+    genre: Genre
+    # 默认有效次数，有效属性数量不在定义范围内时为 None
+    default_rolls: Optional[int]
+    # 每个属性预先计算好的算法系数，含义由编译内核的算法决定
+    factors: MappingProxyType
+    # 系数对应的中点舍入方向，见 artifact_batch.tie_bias
+    factor_bias: MappingProxyType
+    # 每个属性计入加权有效次数的权重
+    clac_weights: MappingProxyType
+
+    @classmethod
+    def compile(cls, weights: dict[StatType, int], factors: dict[StatType, Any] = None,
+                factor_bias: dict[StatType, int] = None, clac_weights: dict[StatType, Any] = None) -> 'WeightKernel':
+        """
+        编译角色权重
+
+        :param weights: 属性权重字典
+        :param factors: 算法系数
+        :param factor_bias: 算法系数的中点舍入方向
+        :param clac_weights: 加权有效次数的权重
+        :return: WeightKernel 实例
+        """
+        vector = np.zeros(len(STAT_TYPES))
+        for stat_type, weight in weights.items():
+            vector[STAT_INDEX[stat_type]] = weight
+        vector.setflags(write=False)
+
+        genre = Genre.intern(weights)
+        return cls(
+            weights=MappingProxyType(dict(weights)),
+            vector=vector,
+            genre=genre,
+            default_rolls=DEFAULT_EFFECTIVE_ROLLS.get(len(genre.effective_stats & COUNT_STAT_TYPES)),
+            factors=MappingProxyType(factors or {}),
+            factor_bias=MappingProxyType(factor_bias or {}),
+            clac_weights=MappingProxyType(clac_weights or {})
+        )
@@ -0,0 +1,263 @@
+# archive_ingestor.py
+
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pyarrow
+import pyarrow.compute
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util.logger import logger
+from src.core.util.numeric import NumericMode
+from src.enka.stage.bulk_parser import BulkParseBatch, EnkaBulkParser
+from src.enka.stage.player_synchronizer import EnkaPlayerSynchronizer
+from src.evaluator.stage.artifact_fact_synchronizer import ArtifactFactSynchronizer
+from src.evaluator.stage.sql_scorer import SqlScorer
+from src.evaluator.stage.synchronizer import StatWeightSynchronizer
+
+
+@dataclass
+class IngestStats:
+    """归档导入的统计"""
+    # 本次处理的文件数
+    files: int = 0
+    # 检查点中已导入、本次跳过的文件数
+    skipped: int = 0
+    # 写入的玩家数
+    players: int = 0
+    # 写入的行数（快照表、事实表与评分表合计）
+    rows: int = 0
+    # 解析失败的文件数
+    errors: int = 0
+    # 写入评分表的角色数（各算法合计）
+    scored: int = 0
+    # 总耗时（秒）
+    seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / max(self.seconds, 1e-9)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / max(self.seconds, 1e-9)
+
+
+class ArchiveIngestor:
+    """
+    归档玩家响应的增量导入器
+    遍历 uid/<uid> 布局的目录树，文件在子进程中解析并展开为快照表与圣遗物事实表，
+    父进程按批写入后用 SqlScorer 对本批玩家评分并写入评分表；
+    每批的数据与检查点在同一事务中提交，中断后再次执行只处理未导入或修改时间变化的文件
+    """
+    # 表名常量定义
+    TABLE_CHECKPOINT = "ods_ingest_checkpoint"
+    TABLE_CHARACTER_SCORE = "ads_ingest_character_score"
+
+    # 表结构定义
+    CHECKPOINT_SCHEMA = pyarrow.schema([
+        ("path", pyarrow.string()),
+        ("mtime", pyarrow.float64()),
+        ("ok", pyarrow.bool_()),
+        ("ingested_at", pyarrow.float64()),
+    ])
+
+    @staticmethod
+    def iter_files(root: str | Path) -> Iterator[Path]:
+        """
+        按路径顺序惰性遍历目录树中的玩家响应文件（文件名为 UID）
+
+        :param root: 根目录
+        :return: 文件绝对路径迭代器
+        """
+        for directory, dir_names, file_names in os.walk(Path(root).resolve()):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                if file_name.isdigit():
+                    yield Path(directory) / file_name
+
+    @classmethod
+    def checkpoint(cls, root: str | Path, db: DuckDBSession) -> dict[str, float]:
+        """
+        读取根目录下已导入文件的检查点，解析失败的文件同样记录，修改前不再重试
+
+        :param root: 根目录
+        :param db: DuckDB 会话
+        :return: {文件路径: 导入时的修改时间}
+        """
+        if not db.table_exists(cls.TABLE_CHECKPOINT):
+            return {}
+        table = db.sql(f"SELECT path, mtime FROM {cls.TABLE_CHECKPOINT} WHERE starts_with(path, $prefix)",
+                       params={"prefix": cls._prefix(root)}).fetch_arrow_table()
+        return dict(zip(table.column("path").to_pylist(), table.column("mtime").to_pylist()))
+
+    @classmethod
+    def reset(cls, root: str | Path, db: DuckDBSession) -> None:
+        """
+        清除根目录下的检查点，下次导入时重新处理全部文件
+
+        :param root: 根目录
+        :param db: DuckDB 会话
+        """
+        if db.table_exists(cls.TABLE_CHECKPOINT):
+            db.execute_sql(f"DELETE FROM {cls.TABLE_CHECKPOINT} WHERE starts_with(path, ?)", [cls._prefix(root)])
+
+    @classmethod
+    def ingest(cls, root: str | Path, asset_map: dict, db: DuckDBSession,
+               numeric: NumericMode = NumericMode.DECIMAL, algorithms: Iterable[str] = (),
+               max_workers: int = None, shard_size: int = 64, write_batch_size: int = 1024,
+               max_snapshots: int = 3) -> IngestStats:
+        """
+        导入目录树中的玩家响应文件：解析 → 评分 → 入库
+
+        内存占用只与在途分片数和 write_batch_size 有关，与文件总数无关（检查点字典除外）
+
+        :param root: 根目录，布局同 test/enka/json/uid/<uid>
+        :param asset_map: 静态资源字典
+        :param db: DuckDB 会话
+        :param numeric: 数值模式
+        :param algorithms: 参与评分的算法类名，本地没有权重的算法跳过
+        :param max_workers: 进程数，默认为 CPU 核数
+        :param shard_size: 每个分片的文件数
+        :param write_batch_size: 每次写库的玩家数量
+        :param max_snapshots: 每个 UID 最多保留的快照数量
+        :return: IngestStats 实例
+        """
+        if not asset_map:
+            raise ValueError("asset_map is empty, please do fetch_assets() first!")
+        algorithms = [name for name in algorithms if cls._has_weights(name, db)]
+        stats = IngestStats()
+        done = cls.checkpoint(root, db)
+        pending: list[BulkParseBatch] = []
+        start = time.perf_counter()
+
+        def pending_files() -> Iterator[str]:
+            for path in cls.iter_files(root):
+                path = str(path)
+                if path in done and done[path] == os.path.getmtime(path):
+                    stats.skipped += 1
+                    continue
+                yield path
+
+        def flush():
+            if pending:
+                with db.transaction():
+                    cls._write_batches(pending, algorithms, db, max_snapshots, stats)
+            pending.clear()
+
+        try:
+            for batch in EnkaBulkParser.iter_batches(pending_files(), asset_map, numeric, max_workers, shard_size,
+                                                     ArtifactFactSynchronizer.to_tables):
+                for path, error in batch.errors:
+                    logger.error(f"玩家响应解析失败: {path} - 错误: {error}")
+                stats.files += batch.file_count
+                stats.errors += len(batch.errors)
+                pending.append(batch)
+                if sum(len(pending_batch.uids) for pending_batch in pending) >= write_batch_size:
+                    flush()
+        except KeyboardInterrupt:
+            # 调用方中断时提交已解析的批次，检查点与数据保持一致
+            flush()
+            raise
+        # 工作进程出错时直接抛出，不写入检查点，下次导入时重新处理未提交的文件
+        flush()
+        stats.seconds = time.perf_counter() - start
+
+        logger.info(f"导入 {stats.files} 个文件（跳过 {stats.skipped} 个），写入 {stats.players} 名玩家、"
+                    f"{stats.rows} 行，评分 {stats.scored} 个角色，失败 {stats.errors} 个，"
+                    f"耗时 {stats.seconds:.3f}s ({stats.files_per_second:.1f} files/s, "
+                    f"{stats.rows_per_second:.1f} rows/s)")
+        return stats
+
+    @classmethod
+    def _write_batches(cls, batches: list[BulkParseBatch], algorithms: list[str], db: DuckDBSession,
+                       max_snapshots: int, stats: IngestStats) -> None:
+        """在调用方的事务中写入快照表、事实表、评分表与检查点"""
+        uids = [uid for batch in batches for uid in batch.uids]
+        if uids:
+            tables = {name: pyarrow.concat_tables([batch.tables[name] for batch in batches])
+                      for name in batches[0].tables}
+            EnkaPlayerSynchronizer.write_tables(tables, uids, db, max_snapshots)
+            facts = cls._latest_facts(batches)
+            ArtifactFactSynchronizer.write_tables(facts, uids, db)
+            stats.players += len(uids)
+            stats.rows += sum(table.num_rows for table in (*tables.values(), *facts.values()))
+            for name in algorithms:
+                scored = cls._write_scores(name, uids, db)
+                stats.scored += scored
+                stats.rows += scored
+
+        ingested_at = time.time()
+        files = [(path, mtime) for batch in batches for path, mtime in batch.files if mtime is not None]
+        failed = {path for batch in batches for path, _ in batch.errors}
+        checkpoint = pyarrow.table({
+            "path": [path for path, _ in files],
+            "mtime": [mtime for _, mtime in files],
+            "ok": [path not in failed for path, _ in files],
+            "ingested_at": [ingested_at] * len(files),
+        }, schema=cls.CHECKPOINT_SCHEMA)
+        if db.table_exists(cls.TABLE_CHECKPOINT):
+            db.register_table(checkpoint, "temp_checkpoint")
+            try:
+                db.execute_sql(f"INSERT OR REPLACE INTO {cls.TABLE_CHECKPOINT} SELECT * FROM temp_checkpoint")
+            finally:
+                db.unregister_table("temp_checkpoint")
+        else:
+            db.append_table(checkpoint, cls.TABLE_CHECKPOINT)
+            db.execute_sql(f"ALTER TABLE {cls.TABLE_CHECKPOINT} ADD PRIMARY KEY (path)")
+
+    @staticmethod
+    def _latest_facts(batches: list[BulkParseBatch]) -> dict[str, pyarrow.Table]:
+        """合并各分片的事实表，同一 UID 出现在多个分片时只保留最后一个分片的行"""
+        seen = pyarrow.array([], type=pyarrow.int64())
+        parts: dict[str, list[pyarrow.Table]] = {}
+        for batch in reversed(batches):
+            for name, table in batch.extra_tables.items():
+                keep = pyarrow.compute.invert(pyarrow.compute.is_in(table.column("uid"), value_set=seen))
+                parts.setdefault(name, []).append(table.filter(keep))
+            seen = pyarrow.concat_arrays([seen, pyarrow.array(batch.uids, type=pyarrow.int64())])
+        return {name: pyarrow.concat_tables(tables[::-1]) for name, tables in parts.items()}
+
+    @classmethod
+    def _write_scores(cls, name: str, uids: list[int], db: DuckDBSession) -> int:
+        """
+        用 SqlScorer 的视图对本批玩家评分，按 (算法, UID) 替换评分表中的行
+
+        :param name: 算法类名
+        :param uids: 本批玩家的 UID 列表
+        :param db: DuckDB 会话
+        :return: 写入的角色数
+        """
+        SqlScorer.ensure_installed(name, db)
+        db.register_table(pyarrow.table({"uid": pyarrow.array(uids, type=pyarrow.int64())}), "temp_score_uid")
+        try:
+            scores = db.sql(f"""
+                SELECT $name AS algorithm, s.uid, s.character_id,
+                       CAST(s.total_score AS DOUBLE) AS total_score,
+                       CAST(s.total_effective_rolls AS DOUBLE) AS total_effective_rolls
+                FROM {SqlScorer.VIEW_CHARACTER_SCORE[name]} s
+                WHERE s.uid IN (SELECT uid FROM temp_score_uid)
+            """, params={"name": name}).fetch_arrow_table()
+            if db.table_exists(cls.TABLE_CHARACTER_SCORE):
+                db.execute_sql(f"""
+                    DELETE FROM {cls.TABLE_CHARACTER_SCORE}
+                    WHERE algorithm = ? AND uid IN (SELECT uid FROM temp_score_uid)
+                """, [name])
+        finally:
+            db.unregister_table("temp_score_uid")
+        db.append_table(scores, cls.TABLE_CHARACTER_SCORE)
+        return scores.num_rows
+
+    @staticmethod
+    def _has_weights(name: str, db: DuckDBSession) -> bool:
+        if StatWeightSynchronizer.exists(name, db):
+            return True
+        logger.warning(f"本地没有 {name} 的角色权重，导入时跳过该算法的评分")
+        return False
+
+    @staticmethod
+    def _prefix(root: str | Path) -> str:
+        return os.path.join(Path(root).resolve(), "")
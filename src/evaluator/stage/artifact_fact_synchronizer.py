@@ -0,0 +1,115 @@
+import pyarrow
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.enka.model.player import Player
+from src.evaluator.model.artifact_batch import BASE_PROP_TYPES
+
+
+class ArtifactFactSynchronizer:
+    """
+    圣遗物事实表同步器
+    将玩家角色携带的圣遗物按 UID × 角色 × 圣遗物 × 副词条 展开为一行一条写入 DuckDB，
+    同时记录角色的基础属性，供 SqlScorer 在库内完成评分
+    """
+    # 表名常量定义
+    TABLE_ARTIFACT_SUB_STAT = "ods_artifact_sub_stat"
+    TABLE_CHARACTER_BASE_PROP = "ods_character_base_prop"
+
+    # 表结构定义
+    ARTIFACT_SUB_STAT_SCHEMA = pyarrow.schema([
+        ("uid", pyarrow.int64()),
+        ("character_id", pyarrow.int64()),
+        ("slot", pyarrow.int32()),
+        ("artifact_id", pyarrow.int64()),
+        ("set_id", pyarrow.int64()),
+        ("main_stat_type", pyarrow.string()),
+        ("stat_type", pyarrow.string()),
+        ("stat_value", pyarrow.float64()),
+    ])
+    CHARACTER_BASE_PROP_SCHEMA = pyarrow.schema([
+        ("uid", pyarrow.int64()),
+        ("character_id", pyarrow.int64()),
+        ("stat_type", pyarrow.string()),
+        ("base_value", pyarrow.float64()),
+    ])
+
+    @classmethod
+    def sync(cls, players: list[Player], db: DuckDBSession) -> int:
+        """
+        以玩家为单位整体替换事实表中的数据
+
+        :param players: 玩家列表
+        :param db: DuckDB 会话
+        :return: 写入的副词条行数
+        """
+        if not players:
+            return 0
+        tables = cls.to_tables(players)
+        uids = [player.uid for player in players]
+        db.replace_rows(tables[cls.TABLE_ARTIFACT_SUB_STAT], cls.TABLE_ARTIFACT_SUB_STAT, "uid", uids)
+        db.replace_rows(tables[cls.TABLE_CHARACTER_BASE_PROP], cls.TABLE_CHARACTER_BASE_PROP, "uid", uids)
+        return tables[cls.TABLE_ARTIFACT_SUB_STAT].num_rows
+
+    @classmethod
+    def to_tables(cls, players: list[Player]) -> dict[str, pyarrow.Table]:
+        """
+        将一批玩家展开为事实表的 Arrow 表，不访问数据库，可在子进程中执行
+
+        :param players: 玩家列表，同一 UID 出现多次时以最后一个为准
+        :return: 以表名为键的 Arrow 表
+        """
+        players = {player.uid: player for player in players}.values()
+        sub_stat_rows = {name: [] for name in cls.ARTIFACT_SUB_STAT_SCHEMA.names}
+        base_prop_rows = {name: [] for name in cls.CHARACTER_BASE_PROP_SCHEMA.names}
+
+        for player in players:
+            for character in player.characters:
+                for stat_type, prop_type in BASE_PROP_TYPES.items():
+                    base = character.fight_prop.get(prop_type)
+                    if base is None:
+                        continue
+                    cls._append(base_prop_rows, uid=player.uid, character_id=character.id,
+                                stat_type=stat_type.value, base_value=float(base))
+
+                for slot, artifact in enumerate(character.artifacts):
+                    if artifact is None:
+                        continue
+                    row = dict(uid=player.uid, character_id=character.id, slot=slot, artifact_id=artifact.id,
+                               set_id=artifact.set_id, main_stat_type=artifact.main_stat.stat_type.value)
+                    # 没有副词条的圣遗物保留一行空词条，保证主词条加分不丢失
+                    for sub_stat in artifact.sub_stats or [None]:
+                        cls._append(sub_stat_rows, **row,
+                                    stat_type=sub_stat.stat_type.value if sub_stat else None,
+                                    stat_value=float(sub_stat.stat_value) if sub_stat else 0.0)
+
+        return {
+            cls.TABLE_ARTIFACT_SUB_STAT: pyarrow.table(sub_stat_rows, schema=cls.ARTIFACT_SUB_STAT_SCHEMA),
+            cls.TABLE_CHARACTER_BASE_PROP: pyarrow.table(base_prop_rows, schema=cls.CHARACTER_BASE_PROP_SCHEMA),
+        }
+
+    @classmethod
+    def write_tables(cls, tables: dict[str, pyarrow.Table], uids: list[int], db: DuckDBSession) -> None:
+        """
+        以玩家为单位替换 to_tables 生成的 Arrow 表，不开启事务，可与其他写入放在同一事务中
+
+        :param tables: 以表名为键的 Arrow 表
+        :param uids: 本批玩家的 UID 列表
+        :param db: DuckDB 会话
+        """
+        db.register_table(pyarrow.table({"uid": pyarrow.array(uids, type=pyarrow.int64())}), "temp_fact_uid")
+        try:
+            for table_name, table in tables.items():
+                if db.table_exists(table_name):
+                    db.execute_sql(f"DELETE FROM {table_name} WHERE uid IN (SELECT uid FROM temp_fact_uid)")
+                db.append_table(table, table_name)
+        finally:
+            db.unregister_table("temp_fact_uid")
+
+    @classmethod
+    def exists(cls, db: DuckDBSession) -> bool:
+        return db.table_exists(cls.TABLE_ARTIFACT_SUB_STAT) and db.table_exists(cls.TABLE_CHARACTER_BASE_PROP)
+
+    @staticmethod
+    def _append(columns: dict[str, list], **row):
+        for name, value in row.items():
+            columns[name].append(value)
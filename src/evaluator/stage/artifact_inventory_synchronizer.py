@@ -0,0 +1,124 @@
+import time
+from typing import Iterable
+
+import pyarrow
+import pyarrow.compute
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util.numeric import NumericMode, numeric_backend
+from src.enka.config.constants import EQUIPMENT_SLOTS, EQUIPMENT_TYPES
+from src.enka.model.artifact import Artifact
+from src.enka.model.stat import Stat, PERCENT_STAT_TYPES, STAT_TYPES_BY_VALUE
+
+
+class ArtifactInventorySynchronizer:
+    """
+    圣遗物背包同步器
+    将一个账号的整个圣遗物背包（如 Mona 导出）按 账号 × 圣遗物 × 副词条 展开为一行一条写入 DuckDB，
+    每个账号整体替换，一次 Arrow 批量写入；读取后可交由 Evaluator.evaluate_inventory 批量评分
+    """
+    # 表名常量定义
+    TABLE_ARTIFACT_INVENTORY = "ods_artifact_inventory"
+
+    # 表结构定义
+    ARTIFACT_INVENTORY_SCHEMA = pyarrow.schema([
+        ("uid", pyarrow.int64()),
+        ("artifact_index", pyarrow.int32()),
+        ("slot", pyarrow.int32()),
+        ("set_id", pyarrow.int64()),
+        ("set_name", pyarrow.string()),
+        ("rank", pyarrow.int32()),
+        ("level", pyarrow.int32()),
+        ("main_stat_type", pyarrow.string()),
+        ("main_stat_value", pyarrow.float64()),
+        ("stat_type", pyarrow.string()),
+        ("stat_value", pyarrow.float64()),
+        ("imported_at", pyarrow.float64()),
+    ])
+
+    @classmethod
+    def sync(cls, uid: int, artifacts: Iterable[Artifact], db: DuckDBSession) -> int:
+        """
+        整体替换账号的圣遗物背包
+
+        :param uid: 账号 UID
+        :param artifacts: 圣遗物，可以是流式解析的迭代器
+        :param db: DuckDB 会话
+        :return: 写入的圣遗物数量
+        """
+        table = cls.to_table(uid, artifacts)
+        db.replace_rows(table, cls.TABLE_ARTIFACT_INVENTORY, "uid", [uid])
+        return pyarrow.compute.count_distinct(table.column("artifact_index")).as_py()
+
+    @classmethod
+    def to_table(cls, uid: int, artifacts: Iterable[Artifact]) -> pyarrow.Table:
+        """
+        将圣遗物展开为背包表的 Arrow 表，不访问数据库，圣遗物逐个消费，不保留 Artifact 实例
+
+        :param uid: 账号 UID
+        :param artifacts: 圣遗物
+        :return: Arrow 表
+        """
+        rows = {name: [] for name in cls.ARTIFACT_INVENTORY_SCHEMA.names}
+        imported_at = time.time()
+        for index, artifact in enumerate(artifacts):
+            row = dict(uid=uid, artifact_index=index, slot=EQUIPMENT_SLOTS[artifact.equipment_type],
+                       set_id=artifact.set_id, set_name=artifact.set_name, rank=artifact.rank,
+                       level=artifact.level, main_stat_type=artifact.main_stat.stat_type.value,
+                       main_stat_value=float(artifact.main_stat.stat_value), imported_at=imported_at)
+            # 没有副词条的圣遗物保留一行空词条，保证圣遗物本身不丢失
+            for sub_stat in artifact.sub_stats or [None]:
+                for name, value in row.items():
+                    rows[name].append(value)
+                rows["stat_type"].append(sub_stat.stat_type.value if sub_stat else None)
+                rows["stat_value"].append(float(sub_stat.stat_value) if sub_stat else None)
+        return pyarrow.table(rows, schema=cls.ARTIFACT_INVENTORY_SCHEMA)
+
+    @classmethod
+    def get(cls, uid: int, db: DuckDBSession, numeric: NumericMode = NumericMode.DECIMAL) -> list[Artifact]:
+        """
+        读取账号的圣遗物背包
+
+        :param uid: 账号 UID
+        :param db: DuckDB 会话
+        :param numeric: 数值模式
+        :return: 按导入顺序排列的圣遗物列表，没有背包时为空列表
+        """
+        if not cls.exists(db):
+            return []
+        table = db.sql(f"""
+            SELECT * FROM {cls.TABLE_ARTIFACT_INVENTORY} WHERE uid = $uid ORDER BY artifact_index
+        """, params={"uid": uid}).fetch_arrow_table()
+        backend = numeric_backend(numeric)
+
+        def stat(stat_type: str, value: float) -> Stat:
+            # 固定值属性在 Enka 与 Mona 解析结果中均为整数，还原为整数
+            stat_type = STAT_TYPES_BY_VALUE[stat_type]
+            return Stat(stat_type, backend.number(value if stat_type in PERCENT_STAT_TYPES else int(value)))
+
+        artifacts = []
+        last_index = None
+        for row in table.to_pylist():
+            if row["artifact_index"] != last_index:
+                last_index = row["artifact_index"]
+                artifacts.append(Artifact(
+                    id=0,
+                    name="",
+                    level=row["level"],
+                    equipment_type=EQUIPMENT_TYPES[row["slot"]],
+                    rank=row["rank"],
+                    set_id=row["set_id"],
+                    set_name=row["set_name"],
+                    icon="",
+                    main_stat_id=0,
+                    sub_stat_ids=[],
+                    main_stat=stat(row["main_stat_type"], row["main_stat_value"]),
+                    sub_stats=[],
+                ))
+            if row["stat_type"] is not None:
+                artifacts[-1].sub_stats.append(stat(row["stat_type"], row["stat_value"]))
+        return artifacts
+
+    @classmethod
+    def exists(cls, db: DuckDBSession) -> bool:
+        return db.table_exists(cls.TABLE_ARTIFACT_INVENTORY)
@@ -0,0 +1,263 @@
+import pyarrow
+from duckdb.duckdb import DuckDBPyRelation
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.enka.model.stat import StatType
+from src.evaluator.algorithm.stat_based import YSINAlgorithm, CLAC_STAT_TYPES
+from src.evaluator.algorithm.weight_based import XZSAlgorithm
+from src.evaluator.model.artifact_batch import tie_bias
+from src.evaluator.model.character_stat_weight import STAT_WEIGHT_COLUMNS
+from src.evaluator.model.genre import GENRE_DEFAULT, COUNT_STAT_TYPES, DEFAULT_EFFECTIVE_ROLLS, CLAC_HALF_STAT_TYPES
+from src.evaluator.stage.artifact_fact_synchronizer import ArtifactFactSynchronizer
+from src.evaluator.stage.synchronizer import StatWeightSynchronizer
+
+
+class SqlScorer:
+    """
+    库内评分器
+    以视图形式在 DuckDB 中实现 XZS 与 YSIN 评分，直接关联圣遗物事实表与权重表，
+    排行与重新评分无需将数据取回 Python，结果与 Evaluator.evaluate_character 一致
+    视图在同步权重或事实表时由写入方创建一次（见 ensure_installed），查询只执行 SELECT，可用于只读快照
+    """
+    # 表名常量定义
+    TABLE_STAT_FACTOR = "dim_stat_factor"
+    # 按 Decimal ROUND_HALF_EVEN 取整的宏，见 artifact_batch.round_half_even
+    MACRO_ROUND_HALF_EVEN = "round_half_even_biased"
+
+    # 视图名常量定义
+    VIEW_STAT_WEIGHT = {
+        "XZSAlgorithm": "ads_stat_weight_xzs",
+        "YSINAlgorithm": "ads_stat_weight_ym",
+    }
+    VIEW_ARTIFACT_SCORE = {
+        "XZSAlgorithm": "ads_artifact_score_xzs",
+        "YSINAlgorithm": "ads_artifact_score_ym",
+    }
+    VIEW_CHARACTER_SCORE = {
+        "XZSAlgorithm": "ads_character_score_xzs",
+        "YSINAlgorithm": "ads_character_score_ym",
+    }
+
+    @classmethod
+    def install(cls, name: str, db: DuckDBSession):
+        """
+        创建评分所需的维表、宏与视图，可重复调用
+
+        :param name: 算法类名
+        :param db: DuckDB 会话
+        """
+        if not ArtifactFactSynchronizer.exists(db):
+            raise ValueError("圣遗物事实表不存在，请先同步玩家数据")
+        if not StatWeightSynchronizer.exists(name, db):
+            raise ValueError("没有找到角色权重")
+
+        cls._install_stat_factor(db)
+        db.execute_sql(f"""
+            CREATE OR REPLACE MACRO {cls.MACRO_ROUND_HALF_EVEN}(x, bias) AS
+            CASE WHEN abs(x - floor(x) - 0.5) < 1e-9 THEN
+                CASE WHEN bias > 0 THEN floor(x) + 1
+                     WHEN bias < 0 THEN floor(x)
+                     ELSE floor(x) + ((CAST(floor(x) AS BIGINT) % 2) + 2) % 2 END
+            ELSE round_even(x, 0) END
+        """)
+        cls._install_stat_weight(name, db)
+        install_dict = {
+            "XZSAlgorithm": cls._install_xzs,
+            "YSINAlgorithm": cls._install_ym,
+        }
+        install_dict[name](db)
+
+    @classmethod
+    def installed(cls, name: str, db: DuckDBSession) -> bool:
+        """
+        评分视图是否已创建
+
+        :param name: 算法类名
+        :param db: DuckDB 会话
+        :return: 是否已创建
+        """
+        return db.table_exists(cls.VIEW_CHARACTER_SCORE[name])
+
+    @classmethod
+    def ensure_installed(cls, name: str, db: DuckDBSession, refresh: bool = False) -> bool:
+        """
+        事实表与权重表均已存在时创建评分视图，已创建时跳过，在同步权重或事实表后调用
+
+        :param name: 算法类名
+        :param db: DuckDB 会话
+        :param refresh: 已创建时是否重新创建，如权重表被整体替换后
+        :return: 视图是否可用
+        """
+        if cls.installed(name, db) and not refresh:
+            return True
+        if db.read_only or not ArtifactFactSynchronizer.exists(db) or not StatWeightSynchronizer.exists(name, db):
+            return cls.installed(name, db)
+        cls.install(name, db)
+        return True
+
+    @classmethod
+    def _check_installed(cls, name: str, db: DuckDBSession):
+        if not cls.installed(name, db):
+            raise ValueError("评分视图不存在，请先同步角色权重与玩家数据")
+
+    @classmethod
+    def character_scores(cls, name: str, db: DuckDBSession, uid: int = None) -> DuckDBPyRelation:
+        """
+        查询角色总分
+
+        :param name: 算法类名
+        :param db: DuckDB 会话
+        :param uid: 玩家 UID，为空时查询全部玩家
+        :return: (uid, character_id, total_score, total_effective_rolls) 关系
+        """
+        cls._check_installed(name, db)
+        view = cls.VIEW_CHARACTER_SCORE[name]
+        if uid is None:
+            return db.sql(f"SELECT * FROM {view} ORDER BY uid, character_id")
+        return db.sql(f"SELECT * FROM {view} WHERE uid = $uid ORDER BY character_id", params={"uid": uid})
+
+    @classmethod
+    def leaderboard(cls, name: str, db: DuckDBSession, character_id: int = None,
+                    limit: int = 100) -> DuckDBPyRelation:
+        """
+        按角色总分排行
+
+        :param name: 算法类名
+        :param db: DuckDB 会话
+        :param character_id: 角色ID，为空时对全部角色排行
+        :param limit: 返回条数
+        :return: 带名次的角色总分关系
+        """
+        cls._check_installed(name, db)
+        where_clause = "" if character_id is None else "WHERE character_id = $character_id"
+        params = {"limit": limit} if character_id is None else {"limit": limit, "character_id": character_id}
+        return db.sql(f"""
+            SELECT rank() OVER (ORDER BY total_score DESC, total_effective_rolls DESC) AS rank, *
+            FROM {cls.VIEW_CHARACTER_SCORE[name]} {where_clause}
+            ORDER BY rank, uid, character_id
+            LIMIT $limit
+        """, params=params)
+
+    @classmethod
+    def _install_stat_factor(cls, db: DuckDBSession):
+        """由 Python 侧的算法常量生成属性系数维表，保证两侧系数一致"""
+        xzs_factors = XZSAlgorithm().factor_dict
+        ym_benefits = YSINAlgorithm().sub_stat_benefit
+        rows = []
+        for stat_type in StatType:
+            factor = xzs_factors.get(stat_type)
+            benefit = ym_benefits.get(stat_type)
+            # 固定词条折算成百分比词条
+            clac_type = CLAC_STAT_TYPES.get(stat_type, stat_type)
+            rows.append({
+                "stat_type": stat_type.value,
+                "xzs_factor": float(factor) if factor is not None else None,
+                "xzs_tie_bias": tie_bias(factor) if factor is not None else 0,
+                "ym_benefit": float(benefit) if benefit is not None else None,
+                "clac_stat_type": clac_type.value,
+                # 充能与精通恒以 0.5 计入加权有效次数
+                "half_clac": stat_type in CLAC_HALF_STAT_TYPES,
+                "default_weight": 1 if stat_type in GENRE_DEFAULT.effective_stats else 0,
+                "count_stat": stat_type in COUNT_STAT_TYPES,
+            })
+        db.register_table(pyarrow.Table.from_pylist(rows), "temp_stat_factor")
+        db.execute_sql(f"CREATE OR REPLACE TABLE {cls.TABLE_STAT_FACTOR} AS SELECT * FROM temp_stat_factor")
+
+    @classmethod
+    def _install_stat_weight(cls, name: str, db: DuckDBSession):
+        """将宽表形式的权重展开为 (角色, 属性, 权重)，缺少的角色使用默认流派"""
+        weight_table = StatWeightSynchronizer.table_name(name)
+        columns = ", ".join(STAT_WEIGHT_COLUMNS.values())
+        mapping = ", ".join(f"('{column}', '{stat_type.value}')" for stat_type, column in STAT_WEIGHT_COLUMNS.items())
+        db.execute_sql(f"""
+            CREATE OR REPLACE VIEW {cls.VIEW_STAT_WEIGHT[name]} AS
+            WITH weight_long AS (
+                SELECT u.id AS character_id, m.stat_type, u.weight
+                FROM (UNPIVOT (SELECT id, {columns} FROM {weight_table})
+                      ON {columns} INTO NAME weight_column VALUE weight) u
+                JOIN (VALUES {mapping}) m(weight_column, stat_type) USING (weight_column)
+            )
+            SELECT c.character_id, d.stat_type,
+                   CASE WHEN k.id IS NULL THEN d.default_weight ELSE coalesce(w.weight, 0) END AS weight
+            FROM (SELECT DISTINCT character_id FROM {ArtifactFactSynchronizer.TABLE_ARTIFACT_SUB_STAT}) c
+            CROSS JOIN {cls.TABLE_STAT_FACTOR} d
+            LEFT JOIN (SELECT DISTINCT id FROM {weight_table}) k ON k.id = c.character_id
+            LEFT JOIN weight_long w ON w.character_id = c.character_id AND w.stat_type = d.stat_type
+        """)
+
+    @classmethod
+    def _install_xzs(cls, db: DuckDBSession):
+        """副词条得分以 0.1 分为单位取整后累加，头冠为暴击/爆伤时加 20 分"""
+        name = "XZSAlgorithm"
+        rnd = cls.MACRO_ROUND_HALF_EVEN
+        db.execute_sql(f"""
+            CREATE OR REPLACE VIEW {cls.VIEW_ARTIFACT_SCORE[name]} AS
+            SELECT f.uid, f.character_id, f.slot,
+                   any_value(f.artifact_id) AS artifact_id,
+                   any_value(f.set_id) AS set_id,
+                   any_value(f.main_stat_type) AS main_stat_type,
+                   {rnd}(sum(coalesce({rnd}(f.stat_value * d.xzs_factor * w.weight / 10, d.xzs_tie_bias), 0)) / 10, 0)
+                   + CASE WHEN any_value(f.main_stat_type) IN ('{StatType.CRIT_DMG.value}', '{StatType.CRIT_RATE.value}')
+                          THEN 20 ELSE 0 END AS score,
+                   CAST(0 AS DOUBLE) AS effective_rolls
+            FROM {ArtifactFactSynchronizer.TABLE_ARTIFACT_SUB_STAT} f
+            LEFT JOIN {cls.TABLE_STAT_FACTOR} d ON d.stat_type = f.stat_type
+            LEFT JOIN {cls.VIEW_STAT_WEIGHT[name]} w ON w.character_id = f.character_id AND w.stat_type = f.stat_type
+            GROUP BY f.uid, f.character_id, f.slot
+        """)
+        db.execute_sql(f"""
+            CREATE OR REPLACE VIEW {cls.VIEW_CHARACTER_SCORE[name]} AS
+            SELECT uid, character_id, sum(score) AS total_score, CAST(0 AS DOUBLE) AS total_effective_rolls
+            FROM {cls.VIEW_ARTIFACT_SCORE[name]}
+            GROUP BY uid, character_id
+        """)
+
+    @classmethod
+    def _install_ym(cls, db: DuckDBSession):
+        """有效词条数以 0.01 为单位取整，加权有效次数以 0.005 为单位累加，总分按默认有效次数折算"""
+        name = "YSINAlgorithm"
+        rnd = cls.MACRO_ROUND_HALF_EVEN
+        weight_view = cls.VIEW_STAT_WEIGHT[name]
+        default_rolls = " ".join(f"WHEN {count} THEN {rolls}" for count, rolls in DEFAULT_EFFECTIVE_ROLLS.items())
+        db.execute_sql(f"""
+            CREATE OR REPLACE VIEW {cls.VIEW_ARTIFACT_SCORE[name]} AS
+            WITH sub AS (
+                SELECT f.uid, f.character_id, f.slot, f.artifact_id, f.set_id, f.main_stat_type,
+                       CASE WHEN c.ym_benefit IS NOT NULL AND wc.weight > 0
+                            THEN {rnd}(f.stat_value / coalesce(b.base_value / 100, 1) / c.ym_benefit * 100, 0)
+                            ELSE 0 END AS hundredths,
+                       CASE WHEN d.half_clac THEN 1 WHEN wo.weight > 0 THEN 2 ELSE 0 END AS clac_units
+                FROM {ArtifactFactSynchronizer.TABLE_ARTIFACT_SUB_STAT} f
+                LEFT JOIN {cls.TABLE_STAT_FACTOR} d ON d.stat_type = f.stat_type
+                LEFT JOIN {cls.TABLE_STAT_FACTOR} c ON c.stat_type = d.clac_stat_type
+                LEFT JOIN {weight_view} wc ON wc.character_id = f.character_id AND wc.stat_type = d.clac_stat_type
+                LEFT JOIN {weight_view} wo ON wo.character_id = f.character_id AND wo.stat_type = f.stat_type
+                LEFT JOIN {ArtifactFactSynchronizer.TABLE_CHARACTER_BASE_PROP} b
+                       ON b.uid = f.uid AND b.character_id = f.character_id AND b.stat_type = f.stat_type
+            )
+            SELECT uid, character_id, slot,
+                   any_value(artifact_id) AS artifact_id,
+                   any_value(set_id) AS set_id,
+                   any_value(main_stat_type) AS main_stat_type,
+                   CAST(0 AS DOUBLE) AS score,
+                   sum(hundredths) / 100 AS effective_rolls,
+                   sum(hundredths) AS effective_hundredths,
+                   sum(hundredths * clac_units) AS clac_units
+            FROM sub
+            GROUP BY uid, character_id, slot
+        """)
+        db.execute_sql(f"""
+            CREATE OR REPLACE VIEW {cls.VIEW_CHARACTER_SCORE[name]} AS
+            WITH default_rolls AS (
+                SELECT w.character_id,
+                       CASE count(*) FILTER (WHERE w.weight > 0 AND d.count_stat) {default_rolls} END AS rolls
+                FROM {weight_view} w JOIN {cls.TABLE_STAT_FACTOR} d USING (stat_type)
+                GROUP BY w.character_id
+            )
+            SELECT a.uid, a.character_id,
+                   {rnd}(sum(a.clac_units) * 50 / any_value(r.rolls), 0) / 100 AS total_score,
+                   sum(a.effective_hundredths) / 100 AS total_effective_rolls
+            FROM {cls.VIEW_ARTIFACT_SCORE[name]} a
+            LEFT JOIN default_rolls r USING (character_id)
+            GROUP BY a.uid, a.character_id
+        """)
@@ -8,21 +8,31 @@ class StatWeightSynchronizer:
     TABLE_CHARACTER_STAT_WEIGHT_XZS = "ods_character_stat_weight_xzs"
     TABLE_CHARACTER_STAT_WEIGHT_YM = "ods_character_stat_weight_ym"
 
+    # 权重版本 {(数据库实例, 算法名): 版本}，每次实际写库时递增，数据库实例见 DuckDBSession.instance
+    versions: dict[tuple[str, str], int] = {}
+    # 进程内权重缓存 {(数据库实例, 算法名): (版本, 权重字典)}，同一数据库的所有 Evaluator 共享
+    _cache: dict[tuple[str, str], tuple[int, dict[int, CharacterStatWeight]]] = {}
+
     @staticmethod
-    def sync_character_stat_weight_xzs(data: list[CharacterStatWeight], db: DuckDBSession):
-        sync_list_to_duckdb(data, StatWeightSynchronizer.TABLE_CHARACTER_STAT_WEIGHT_XZS, db, overwrite=True)
+    def sync_character_stat_weight_xzs(data: list[CharacterStatWeight], db: DuckDBSession) -> bool:
+        return sync_list_to_duckdb(data, StatWeightSynchronizer.TABLE_CHARACTER_STAT_WEIGHT_XZS, db, overwrite=True)
 
     @staticmethod
-    def sync_character_stat_weight_ym(data: list[CharacterStatWeight], db: DuckDBSession):
-        sync_list_to_duckdb(data, StatWeightSynchronizer.TABLE_CHARACTER_STAT_WEIGHT_YM, db, overwrite=True)
+    def sync_character_stat_weight_ym(data: list[CharacterStatWeight], db: DuckDBSession) -> bool:
+        return sync_list_to_duckdb(data, StatWeightSynchronizer.TABLE_CHARACTER_STAT_WEIGHT_YM, db, overwrite=True)
 
     @classmethod
-    def sync(cls, name: str, data, db: DuckDBSession):
+    def sync(cls, name: str, data, db: DuckDBSession) -> bool:
         sync_dict = {
             "XZSAlgorithm": cls.sync_character_stat_weight_xzs,
             "YSINAlgorithm": cls.sync_character_stat_weight_ym,
         }
-        return sync_dict[name](data, db)
+        written = sync_dict[name](data, db)
+        if written:
+            key = (db.instance, name)
+            cls.versions[key] = cls.versions.get(key, 0) + 1
+        return written
+
     @classmethod
     def get_character_stat_weight_xzs(cls, db: DuckDBSession) -> dict[int, CharacterStatWeight]:
         return rows_into_model_dict(db.extract_table(cls.TABLE_CHARACTER_STAT_WEIGHT_XZS), CharacterStatWeight)
@@ -37,3 +47,32 @@ class StatWeightSynchronizer:
             "YSINAlgorithm": cls.get_character_stat_weight_ym,
         }
         return get_dict[name](db)
+
+    @classmethod
+    def get_cached(cls, name: str, db: DuckDBSession) -> tuple[int, dict[int, CharacterStatWeight]]:
+        """
+        读取权重，版本未变化时直接返回进程内缓存，不再查询数据库
+
+        :param name: 算法类名
+        :param db: DuckDB 会话
+        :return: (权重版本, 权重字典)，权重字典为共享对象，调用方不应修改
+        """
+        key = (db.instance, name)
+        version = cls.versions.get(key, 0)
+        cached = cls._cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached
+        cached = cls._cache[key] = (version, cls.get(name, db))
+        return cached
+
+    @classmethod
+    def table_name(cls, name: str) -> str:
+        table_dict = {
+            "XZSAlgorithm": cls.TABLE_CHARACTER_STAT_WEIGHT_XZS,
+            "YSINAlgorithm": cls.TABLE_CHARACTER_STAT_WEIGHT_YM,
+        }
+        return table_dict[name]
+
+    @classmethod
+    def exists(cls, name: str, db: DuckDBSession) -> bool:
+        return db.table_exists(cls.table_name(name))
@@ -0,0 +1,89 @@
+# constants.py
+
+from types import MappingProxyType
+
+from src.enka.config.constants import EquipmentType
+from src.enka.model.stat import StatType
+
+# Mona 导出中的部位键到装备位置
+MONA_POSITIONS = MappingProxyType({
+    "flower": EquipmentType.FLOWER,
+    "feather": EquipmentType.PLUME,
+    "sand": EquipmentType.SANDS,
+    "cup": EquipmentType.GOBLET,
+    "head": EquipmentType.CIRCLET,
+})
+
+# Mona 导出中的词条名到属性类型
+MONA_STAT_TYPES = MappingProxyType({
+    "lifeStatic": StatType.HP,
+    "lifePercentage": StatType.HP_PERCENT,
+    "attackStatic": StatType.ATK,
+    "attackPercentage": StatType.ATK_PERCENT,
+    "defendStatic": StatType.DEF,
+    "defendPercentage": StatType.DEF_PERCENT,
+    "critical": StatType.CRIT_RATE,
+    "criticalDamage": StatType.CRIT_DMG,
+    "elementalMastery": StatType.ELEMENTAL_MASTERY,
+    "recharge": StatType.ELEMENTAL_CHARGE,
+    "cureEffect": StatType.HEALING_BONUS,
+    "fireBonus": StatType.FIRE_DMG_BONUS,
+    "thunderBonus": StatType.ELECTRO_DMG_BONUS,
+    "iceBonus": StatType.ICE_DMG_BONUS,
+    "waterBonus": StatType.WATER_DMG_BONUS,
+    "rockBonus": StatType.ROCK_DMG_BONUS,
+    "windBonus": StatType.WIND_DMG_BONUS,
+    "dendroBonus": StatType.GRASS_DMG_BONUS,
+    "physicalBonus": StatType.PHYSICAL_DMG_BONUS,
+})
+
+# Mona 导出中的套装键到 Enka 的套装ID（flat.setId）
+MONA_SET_IDS = MappingProxyType({
+    "resolutionOfSojourner": 10001,
+    "braveHeart": 10002,
+    "defenderWill": 10003,
+    "tinyMiracle": 10004,
+    "berserker": 10005,
+    "martialArtist": 10006,
+    "instructor": 10007,
+    "gambler": 10008,
+    "theExile": 10009,
+    "adventurer": 10010,
+    "luckyDog": 10011,
+    "scholar": 10012,
+    "travelingDoctor": 10013,
+    "blizzardStrayer": 14001,
+    "thunderSmoother": 14002,
+    "lavaWalker": 14003,
+    "maidenBeloved": 14004,
+    "gladiatorFinale": 15001,
+    "viridescentVenerer": 15002,
+    "wandererTroupe": 15003,
+    "thunderingFury": 15005,
+    "crimsonWitch": 15006,
+    "noblesseOblige": 15007,
+    "bloodstainedChivalry": 15008,
+    "archaicPetra": 15014,
+    "retracingBolide": 15015,
+    "heartOfDepth": 15016,
+    "tenacityOfTheMillelith": 15017,
+    "paleFlame": 15018,
+    "shimenawaReminiscence": 15019,
+    "emblemOfSeveredFate": 15020,
+    "huskOfOpulentDreams": 15021,
+    "oceanHuedClam": 15022,
+    "VermillionHereafter": 15023,
+    "EchoesOfAnOffering": 15024,
+    "DeepwoodMemories": 15025,
+    "GildedDreams": 15026,
+    "DesertPavilionChronicle": 15027,
+    "FlowerOfParadiseLost": 15028,
+    "NymphsDream": 15029,
+    "VourukashasGlow": 15030,
+    "MarechausseeHunter": 15031,
+    "GoldenTroupe": 15032,
+    "SongOfDaysPast": 15033,
+    "NighttimeWhispersInTheEchoingWoods": 15034,
+    "FragmentOfHarmonicWhimsy": 15035,
+    "UnfinishedReverie": 15036,
+})
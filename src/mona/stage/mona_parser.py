@@ -0,0 +1,94 @@
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from src.core.util.numeric import NumericMode, numeric_backend
+from src.enka.model.artifact import Artifact
+from src.enka.model.stat import Stat, PERCENT_STAT_TYPES
+from src.mona.config.constants import MONA_POSITIONS, MONA_STAT_TYPES, MONA_SET_IDS
+from src.mona.stage.mona_stream_parser import MonaStreamParser
+
+
+class MonaParser:
+    """
+    Mona 格式（莫娜占卜铺导出）圣遗物背包的解析器
+    将 setName / mainTag / normalTags 映射为 Artifact / Stat / StatType，数值换算为与 Enka 接口一致的展示值：
+    百分比属性由小数（0.0777）换算为保留一位小数的百分数（7.8），固定值属性取整
+    Mona 不提供圣遗物ID与本地化名称，id 为 0，套装名称为 Mona 的套装键，未知套装的套装ID为 0
+    """
+
+    @staticmethod
+    def parse_stat(data: dict, numeric: NumericMode = NumericMode.DECIMAL) -> Stat:
+        """
+        解析一个词条
+
+        :param data: {"name": 词条名, "value": 数值}
+        :param numeric: 数值模式
+        :return: Stat 实例
+        """
+        name = data.get("name")
+        stat_type = MONA_STAT_TYPES.get(name)
+        if stat_type is None:
+            raise ValueError(f"未知的 Mona 词条: {name}")
+        value = float(data.get("value", 0))
+        value = round(value * 100, 1) if stat_type in PERCENT_STAT_TYPES else round(value)
+        return Stat(stat_type, numeric_backend(numeric).number(value))
+
+    @classmethod
+    def parse_artifact(cls, data: dict, numeric: NumericMode = NumericMode.DECIMAL) -> Artifact:
+        """
+        解析一个圣遗物
+
+        :param data: Mona 导出中的圣遗物对象
+        :param numeric: 数值模式
+        :return: Artifact 实例
+        """
+        position = data.get("position")
+        equipment_type = MONA_POSITIONS.get(position)
+        if equipment_type is None:
+            raise ValueError(f"未知的 Mona 部位: {position}")
+        set_name = data.get("setName", "")
+        return Artifact(
+            id=0,
+            name="",
+            level=data.get("level", 0),
+            equipment_type=equipment_type,
+            rank=data.get("star", 0),
+            set_id=MONA_SET_IDS.get(set_name, 0),
+            set_name=set_name,
+            icon="",
+            main_stat_id=0,
+            sub_stat_ids=[],
+            main_stat=cls.parse_stat(data.get("mainTag", {}), numeric),
+            sub_stats=[cls.parse_stat(tag, numeric) for tag in data.get("normalTags", [])]
+        )
+
+    @classmethod
+    def iter_artifacts(cls, chunks: Iterable[str],
+                       numeric: NumericMode = NumericMode.DECIMAL) -> Iterator[Artifact]:
+        """
+        从文本块流式解析圣遗物，按文件中的顺序逐个返回
+
+        :param chunks: 导出文件的文本块，如分块读取的文件或上传流
+        :param numeric: 数值模式
+        :return: Artifact 迭代器
+        """
+        parser = MonaStreamParser(MONA_POSITIONS)
+        for chunk in chunks:
+            for _, data in parser.feed(chunk):
+                yield cls.parse_artifact(data, numeric)
+        for _, data in parser.close():
+            yield cls.parse_artifact(data, numeric)
+
+    @classmethod
+    def iter_file(cls, path: str | Path, numeric: NumericMode = NumericMode.DECIMAL,
+                  chunk_size: int = 1 << 16) -> Iterator[Artifact]:
+        """
+        分块读取导出文件并流式解析，不把整个文件载入内存
+
+        :param path: 导出文件路径
+        :param numeric: 数值模式
+        :param chunk_size: 每次读取的字符数
+        :return: Artifact 迭代器
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            yield from cls.iter_artifacts(iter(lambda: f.read(chunk_size), ""), numeric)
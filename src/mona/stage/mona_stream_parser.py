@@ -0,0 +1,156 @@
+import json
+import re
+from typing import Iterable
+
+# 空白与分隔符
+_SEPARATOR = re.compile(r'[\s,]*')
+
+_decoder = json.JSONDecoder()
+
+
+class MonaStreamParser:
+    """
+    Mona 导出文件的增量解析器
+    逐块输入文本，按部位数组逐个反序列化圣遗物对象，峰值内存与单个圣遗物的数据量相关，而非整个文件；
+    部位数组以外的顶层键（如 version）整体解码后丢弃
+    """
+
+    # 解析状态
+    _START, _TOP_KEY, _ARRAY, _DONE = range(4)
+
+    def __init__(self, positions: Iterable[str]):
+        """
+        初始化解析器
+
+        :param positions: 部位键，这些键的值按圣遗物数组逐个解析
+        """
+        self._positions = set(positions)
+        self._buf = ""
+        self._pos = 0
+        self._state = self._START
+        self._position = None
+
+    def feed(self, chunk: str) -> list[tuple[str, dict]]:
+        """
+        输入一块文本
+
+        :param chunk: 导出文件的一段文本
+        :return: 本次解析出的 (部位键, 圣遗物对象) 列表
+        """
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        rows = []
+        while self._step(rows, final=False):
+            pass
+        return rows
+
+    def close(self) -> list[tuple[str, dict]]:
+        """
+        结束输入并校验文档完整性
+
+        :return: 剩余的 (部位键, 圣遗物对象) 列表
+        """
+        rows = []
+        while self._step(rows, final=True):
+            pass
+        if self._state != self._DONE:
+            raise ValueError("Mona 导出数据不完整")
+        return rows
+
+    def _step(self, rows: list, final: bool) -> bool:
+        """推进一步状态机，数据不足时返回 False"""
+        if self._state == self._START:
+            self._skip_separator()
+            if self._pos >= len(self._buf):
+                return False
+            self._expect("{")
+            self._state = self._TOP_KEY
+            return True
+
+        if self._state == self._TOP_KEY:
+            self._skip_separator()
+            if self._pos >= len(self._buf):
+                return False
+            if self._buf[self._pos] == "}":
+                self._pos += 1
+                self._state = self._DONE
+                return True
+            decoded = self._decode_key(final)
+            if decoded is None:
+                return False
+            key, value_start = decoded
+            if key in self._positions:
+                self._pos = value_start
+                self._expect("[")
+                self._position = key
+                self._state = self._ARRAY
+                return True
+            # 其他顶层键的值很小，完整到达后整体跳过
+            value = self._decode_value(value_start, final)
+            if value is None:
+                return False
+            self._pos = value[1]
+            return True
+
+        if self._state == self._ARRAY:
+            self._skip_separator()
+            if self._pos >= len(self._buf):
+                return False
+            if self._buf[self._pos] == "]":
+                self._pos += 1
+                self._state = self._TOP_KEY
+                return True
+            value = self._decode_value(self._pos, final)
+            if value is None:
+                return False
+            artifact, self._pos = value
+            if not isinstance(artifact, dict):
+                raise ValueError(f"Mona 导出格式错误: {self._position} 中的元素不是对象")
+            rows.append((self._position, artifact))
+            return True
+
+        return False
+
+    def _decode_key(self, final: bool) -> tuple[str, int] | None:
+        """解码 "key": 并返回键与值的起始位置，数据不足时返回 None"""
+        try:
+            key, end = _decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError("Mona 导出数据不完整")
+            return None
+        end = self._skip_whitespace(end)
+        if end >= len(self._buf):
+            return None
+        if self._buf[end] != ":":
+            raise ValueError(f"Mona 导出格式错误: 位置 {end} 缺少 ':'")
+        value_start = self._skip_whitespace(end + 1)
+        if value_start >= len(self._buf):
+            return None
+        return key, value_start
+
+    def _decode_value(self, start: int, final: bool) -> tuple[object, int] | None:
+        """解码一个完整的值并返回 (值, 结束位置)，数据不足时返回 None"""
+        try:
+            value, end = _decoder.raw_decode(self._buf, start)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError("Mona 导出数据不完整")
+            return None
+        # 值位于缓冲区末尾时可能被截断（如数字），等待更多数据
+        if end >= len(self._buf) and not final:
+            return None
+        return value, end
+
+    def _skip_separator(self):
+        self._pos = _SEPARATOR.match(self._buf, self._pos).end()
+
+    def _skip_whitespace(self, pos: int) -> int:
+        while pos < len(self._buf) and self._buf[pos].isspace():
+            pos += 1
+        return pos
+
+    def _expect(self, char: str):
+        if self._buf[self._pos] != char:
+            raise ValueError(f"Mona 导出格式错误: 位置 {self._pos} 应为 '{char}'")
+        self._pos += 1
@@ -0,0 +1,95 @@
+# result_cache.py
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+
+@dataclass(slots=True)
+class CachedResult:
+    """一条已序列化的响应"""
+    # 响应体（JSON 字节串）
+    body: bytes
+    # 强 ETag，由响应体的摘要生成，带引号
+    etag: str
+    # 过期时间戳（秒）
+    expires_at: float
+
+    def max_age(self) -> int:
+        """距过期的剩余秒数"""
+        return max(int(self.expires_at - time.time()), 0)
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """
+        判断 If-None-Match 请求头是否与本条响应匹配，按 RFC 9110 使用弱比较
+
+        :param if_none_match: If-None-Match 请求头
+        :return: 是否匹配，匹配时应返回 304
+        """
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+
+class ResultCache:
+    """
+    已序列化响应的 LRU 缓存
+    命中时直接返回序列化好的响应体与 ETag，不再评分与序列化；
+    条目按上游 Enka 响应的 TTL 过期，超出容量时淘汰最久未使用的条目
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        :param max_entries: 最多缓存的条目数
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, CachedResult] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[CachedResult]:
+        """
+        读取未过期的条目
+
+        :param key: 缓存键
+        :return: CachedResult 实例，未命中或已过期时返回 None
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, body: bytes, expires_at: float) -> CachedResult:
+        """
+        写入条目并执行淘汰，已过期的响应只生成 ETag 不写入
+
+        :param key: 缓存键
+        :param body: 响应体
+        :param expires_at: 过期时间戳（秒）
+        :return: CachedResult 实例
+        """
+        entry = CachedResult(body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', expires_at)
+        if expires_at > time.time():
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        """返回缓存命中统计"""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,58 @@
+# serializer.py
+
+from dataclasses import fields, is_dataclass
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from src.enka.model.player import Player
+from src.evaluator.model.eval_model import ArtifactEval, CharacterEval
+
+
+def to_json(value: Any) -> Any:
+    """
+    将模型对象递归转换为可 JSON 序列化的值
+    数据类按字段转为字典（去掉字段名的前导下划线），枚举取值，Decimal 转为 float
+
+    :param value: 模型对象
+    :return: 由 dict / list / str / int / float / None 组成的值
+    """
+    if is_dataclass(value):
+        return {field.name.lstrip("_"): to_json(getattr(value, field.name)) for field in fields(value)}
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {to_json(key): to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
+
+
+def player_to_json(player: Player) -> dict:
+    """玩家信息"""
+    return to_json(player)
+
+
+def artifact_eval_to_json(artifact: ArtifactEval | None) -> dict | None:
+    """圣遗物评分结果：圣遗物字段加上得分与有效词条数"""
+    if artifact is None:
+        return None
+    return {
+        **to_json(artifact.source),
+        "score": to_json(artifact.score),
+        "effective_rolls": to_json(artifact.effective_rolls),
+        "effective_rolls_dict": to_json(artifact.effective_rolls_dict),
+    }
+
+
+def character_eval_to_json(character: CharacterEval) -> dict:
+    """角色评分结果：角色字段加上流派、总分与各圣遗物的评分"""
+    return {
+        **to_json(character.source),
+        "genre": character.genre.name if character.genre else None,
+        "total_score": to_json(character.total_score),
+        "total_effective_rolls": to_json(character.total_effective_rolls),
+        "artifacts": [artifact_eval_to_json(artifact) for artifact in character.artifacts],
+    }
@@ -1,28 +1,229 @@
+import argparse
+import json
+import os
+from contextlib import asynccontextmanager
+
+import anyio
+import anyio.to_thread
 from starlette.applications import Starlette
-from starlette.responses import HTMLResponse, JSONResponse
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 from starlette.routing import Route, Mount
 from starlette.staticfiles import StaticFiles
-from starlette.templating import Jinja2Templates
 import uvicorn
 
-# 创建模板和静态文件目录
-# templates = Jinja2Templates(directory="templates")
+from src.core.duckdb.snapshot_store import DuckDBSnapshotStore
+from src.core.util.logger import logger
+from src.core.util.single_flight import CallCancelledError, SingleFlight
+from src.enka.client import EnkaClient
+from src.enka.model.player import Player
+from src.evaluator.algorithm.stat_based import YSINAlgorithm
+from src.evaluator.algorithm.weight_based import XZSAlgorithm
+from src.evaluator.evaluator import Evaluator
+from src.server.result_cache import CachedResult, ResultCache
+from src.server.serializer import player_to_json, character_eval_to_json
+
+# Enka 客户端配置
+LANGUAGE = "zh-cn"
+PROXY = None
+# 结果缓存的最大条目数
+RESULT_CACHE_SIZE = 4096
+# 快照目录：设置时以只读模式服务已发布的快照，可启动多个工作进程；未设置时直接读写 data/main.db
+# 多进程时由环境变量传给各工作进程，见 __main__
+SNAPSHOT_DIR = os.environ.get("ABYSSAL_SNAPSHOT_DIR")
+# 检查新快照的间隔（秒）
+SNAPSHOT_POLL_SECONDS = 5.0
+
+# 评分算法参数与算法类的对应关系
+ALGORITHMS = {
+    "xzs": XZSAlgorithm,
+    "ysin": YSINAlgorithm,
+}
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    """
+    应用生命周期：创建常驻的 EnkaClient 与各算法的 Evaluator，所有请求共用同一连接池与内存缓存；
+    合并请求的调用在生命周期持有的任务组中执行
+    快照模式下只读打开当前快照，并在后台切换到写入进程新发布的快照
+    """
+    async with EnkaClient(LANGUAGE, proxy=PROXY) as client, anyio.create_task_group() as tg:
+        if SNAPSHOT_DIR:
+            store = DuckDBSnapshotStore(SNAPSHOT_DIR)
+            await client.replace_db(store.open())
+            tg.start_soon(follow_snapshots, client, store)
+        await client.refresh_assets_async()
+        if not client.asset_map:
+            if client.read_only:
+                raise RuntimeError("快照中没有静态资源，请先在写入进程中同步静态资源并发布快照")
+            await client.fetch_assets()
+        evaluators = {name: Evaluator(client, algorithm()) for name, algorithm in ALGORITHMS.items()}
+        for evaluator in evaluators.values():
+            await evaluator.refresh_weights_async()
+
+        app.state.client = client
+        app.state.evaluators = evaluators
+        app.state.single_flight = SingleFlight(tg)
+        app.state.result_cache = ResultCache(RESULT_CACHE_SIZE)
+        yield
+        tg.cancel_scope.cancel()
+
+
+async def follow_snapshots(client: EnkaClient, store: DuckDBSnapshotStore) -> None:
+    """定期检查快照指针，写入进程发布新快照后切换过去，结果缓存的键随数据库路径变化"""
+    while True:
+        await anyio.sleep(SNAPSHOT_POLL_SECONDS)
+        path = store.current()
+        if path is None or str(path) == client.db.path:
+            continue
+        try:
+            await client.replace_db(store.open(path))
+        except Exception as e:
+            # 快照可能在读取指针后被删除，下次检查时重试
+            logger.error(f"快照切换失败: {path.name} - 错误: {e}")
+            continue
+        logger.info(f"已切换到快照: {path.name}")
+
+
+async def fetch_player(app: Starlette, uid: int) -> Player | None:
+    """获取玩家信息，同一 UID 的并发请求只向 Enka 发起一次"""
+    client: EnkaClient = app.state.client
+    return await app.state.single_flight.do(("player", uid), client.fetch_player, str(uid))
+
+
+async def load_weights(app: Starlette, algorithm: str) -> Evaluator:
+    """取得算法的 Evaluator，本地没有权重时获取一次远端权重"""
+    evaluator: Evaluator = app.state.evaluators[algorithm]
+    await evaluator.refresh_weights_async()
+    if not evaluator.weights_loaded:
+        await app.state.single_flight.do(("weights", algorithm), evaluator.fetch_character_weights)
+    return evaluator
+
+
+def render(content: dict) -> bytes:
+    """与 JSONResponse 相同的 JSON 序列化"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+async def player_expires_at(app: Starlette, uid: int) -> float:
+    """玩家结果的过期时间，跟随上游 Enka 响应的 TTL"""
+    client: EnkaClient = app.state.client
+    return await client.adb.read(client.player_cache.expires_at, str(uid)) or 0.0
 
-# 处理函数
-async def homepage(request):
-    return templates.TemplateResponse("index.html", {"request": request})
 
+async def build_player(app: Starlette, key: tuple, uid: int) -> CachedResult | None:
+    """获取玩家信息并序列化写入结果缓存"""
+    player = await fetch_player(app, uid)
+    if player is None:
+        return None
+    body = render({"status": "success", "data": player_to_json(player)})
+    return app.state.result_cache.put(key, body, await player_expires_at(app, uid))
+
+
+async def build_evaluation(app: Starlette, key: tuple, uid: int, algorithm: str) -> CachedResult | None:
+    """获取并评分玩家，评分与序列化在工作线程中执行，不阻塞事件循环，结果写入结果缓存"""
+    player = await fetch_player(app, uid)
+    if player is None:
+        return None
+    evaluator = await load_weights(app, algorithm)
+
+    def evaluate() -> bytes:
+        # 不修改共享的 Player，评分结果单独返回
+        characters = [evaluator.evaluate_character(character) for character in player.characters]
+        return render({"status": "success", "data": {
+            "uid": player.uid,
+            "nickname": player.nickname,
+            "algorithm": algorithm,
+            "characters": [character_eval_to_json(character) for character in characters],
+        }})
+
+    body = await anyio.to_thread.run_sync(evaluate)
+    return app.state.result_cache.put(key, body, await player_expires_at(app, uid))
+
+
+async def cached_response(request: Request, key: tuple, build, *args) -> Response:
+    """
+    优先返回结果缓存中的响应，未命中时同一键只构建一次
+    条件请求的 ETag 匹配时返回 304，不发送响应体
+
+    :param request: 请求
+    :param key: 结果缓存键，同时作为合并请求的键
+    :param build: 构建并缓存结果的异步函数，玩家不存在时返回 None
+    :param args: build 的参数（不含 app 与 key）
+    :return: 响应
+    """
+    uid = request.path_params["uid"]
+    entry = request.app.state.result_cache.get(key)
+    if entry is None:
+        try:
+            entry = await request.app.state.single_flight.do(key, build, request.app, key, *args)
+        except CallCancelledError as e:
+            logger.warning(f"请求被中断: {uid} - 错误: {e}")
+            return JSONResponse({"status": "error", "message": f"服务暂不可用，请稍后重试: {uid}"}, status_code=503)
+    if entry is None:
+        return JSONResponse({"status": "error", "message": f"玩家不存在或获取失败: {uid}"}, status_code=404)
+    headers = {"ETag": entry.etag, "Cache-Control": f"private, max-age={entry.max_age()}"}
+    if entry.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+# 处理函数
 async def api_data(request):
     return JSONResponse({"data": "example", "status": "success"})
 
+
+async def api_player(request: Request):
+    uid = request.path_params["uid"]
+    client: EnkaClient = request.app.state.client
+    key = ("player", uid, client.db.instance, client.asset_generation)
+    return await cached_response(request, key, build_player, uid)
+
+
+async def api_player_evaluate(request: Request):
+    uid = request.path_params["uid"]
+    algorithm = request.query_params.get("algorithm", "ysin").lower()
+    if algorithm not in ALGORITHMS:
+        return JSONResponse({"status": "error", "message": f"不支持的算法: {algorithm}，可选 {', '.join(ALGORITHMS)}"},
+                            status_code=400)
+    client: EnkaClient = request.app.state.client
+    evaluator: Evaluator = request.app.state.evaluators[algorithm]
+    await evaluator.refresh_weights_async()
+    # 权重、静态资源或快照更新后键随之变化，旧结果不再命中，由 LRU 淘汰
+    key = ("evaluate", uid, algorithm, evaluator.weights_version, client.db.instance, client.asset_generation)
+    try:
+        return await cached_response(request, key, build_evaluation, uid, algorithm)
+    except ValueError as e:
+        logger.error(f"评分失败: {uid} - 错误: {e}")
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=503)
+
+
 # 路由配置
 routes = [
-    Route("/", homepage),
     Route("/api/data", api_data),
-    Mount("/static", StaticFiles(directory="static"), name="static"),
+    Route("/api/player/{uid:int}", api_player),
+    Route("/api/player/{uid:int}/evaluate", api_player_evaluate),
+    Mount("/static", StaticFiles(directory="static", check_dir=False), name="static"),
 ]
 
-app = Starlette(routes=routes)
+app = Starlette(routes=routes, lifespan=lifespan)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="工作进程数，大于 1 时需要 --snapshots")
+    parser.add_argument("--snapshots", default=SNAPSHOT_DIR,
+                        help="快照目录，以只读模式服务写入进程（main.py writer）发布的快照")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    arguments = parse_args()
+    if arguments.workers > 1 and not arguments.snapshots:
+        # DuckDB 同一数据库文件只允许一个读写进程
+        raise SystemExit("多个工作进程只能服务只读快照，请指定 --snapshots")
+    if arguments.snapshots:
+        os.environ["ABYSSAL_SNAPSHOT_DIR"] = str(arguments.snapshots)
+    uvicorn.run("src.server.server:app", host=arguments.host, port=arguments.port, workers=arguments.workers)
@@ -0,0 +1,63 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.enka.model.stat import StatType
+from src.enka.stage.api_parser import EnkaParser
+from src.enka.stage.asset_parser import EnkaAssetParser
+from src.enka.stage.synchronizer import EnkaAssetSynchronizer
+from src.evaluator.model.character_stat_weight import STAT_WEIGHT_COLUMNS
+from src.evaluator.model.genre import COUNT_STAT_TYPES, GENRE_DEFAULT
+
+ASSET_DIR = Path(__file__).parent / "enka" / "asset"
+PLAYER_FILE = Path(__file__).parent / "enka" / "json" / "uid" / "101242308"
+
+
+def _load(name: str):
+    return json.loads((ASSET_DIR / name).read_text(encoding="utf-8"))
+
+
+@pytest.fixture(scope="session")
+def asset_map() -> dict:
+    """由 test/enka/asset 中的静态资源构建，不访问网络与本地数据库"""
+    db = DuckDBSession("memory")
+    try:
+        EnkaAssetSynchronizer.sync("character", EnkaAssetParser.parse_character_meta(_load("characters.json")), db)
+        character = EnkaAssetSynchronizer.get("character", db)
+    finally:
+        db.close()
+    return {
+        "loc": EnkaAssetParser.parse_loc(_load("loc.json"), "zh-cn"),
+        "name_card": EnkaAssetParser.parse_name_card(_load("namecards.json")),
+        "pfp": EnkaAssetParser.parse_pfp(_load("pfps.json")),
+        "character": character,
+    }
+
+
+@pytest.fixture(scope="session")
+def player_data() -> dict:
+    return json.loads(PLAYER_FILE.read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def player(player_data, asset_map):
+    return EnkaParser.parse_player(player_data, asset_map)
+
+
+def _weights(seed: int) -> dict[StatType, int]:
+    """随机权重，计入默认有效次数的属性为 2 至 7 个"""
+    rng = random.Random(seed)
+    counted = rng.sample(sorted(COUNT_STAT_TYPES, key=lambda stat_type: stat_type.value), rng.randint(2, 7))
+    weights = {stat_type: 0 for stat_type in STAT_WEIGHT_COLUMNS}
+    weights.update({stat_type: rng.choice([50, 75, 100]) for stat_type in counted})
+    weights.update({stat_type: rng.choice([0, 30, 50]) for stat_type in (StatType.HP, StatType.ATK, StatType.DEF)})
+    return weights
+
+
+@pytest.fixture(scope="session")
+def weight_sets() -> list[dict[StatType, int]]:
+    """默认流派与 20 组固定种子的随机权重"""
+    return [{stat_type: 1 for stat_type in GENRE_DEFAULT.effective_stats}] + [_weights(seed) for seed in range(20)]
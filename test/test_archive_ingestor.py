@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.enka.stage.bulk_parser import EnkaBulkParser
+from src.evaluator.stage import archive_ingestor
+from src.evaluator.stage.archive_ingestor import ArchiveIngestor
+
+
+@pytest.fixture
+def root(tmp_path, player_data):
+    """两个玩家响应文件，内容与 test/enka/json/uid 中的样例相同"""
+    (tmp_path / "uid").mkdir()
+    for uid in ("1", "2"):
+        (tmp_path / "uid" / uid).write_text(json.dumps(player_data), encoding="utf-8")
+    return tmp_path
+
+
+def failing_batches(error: BaseException):
+    """解析第一个文件后抛出 error 的 iter_batches"""
+
+    def iter_batches(paths, asset_map, numeric, max_workers, shard_size, table_builder):
+        yield EnkaBulkParser.parse_shard([next(iter(paths))], asset_map, numeric, table_builder)
+        raise error
+
+    return iter_batches
+
+
+def test_worker_error_not_checkpointed(root, asset_map, monkeypatch):
+    monkeypatch.setattr(archive_ingestor.EnkaBulkParser, "iter_batches", failing_batches(RuntimeError("worker")))
+    db = DuckDBSession("memory")
+    try:
+        with pytest.raises(RuntimeError):
+            ArchiveIngestor.ingest(root, asset_map, db)
+        assert ArchiveIngestor.checkpoint(root, db) == {}
+    finally:
+        db.close()
+
+
+def test_interrupt_flushes_parsed_batches(root, asset_map, monkeypatch):
+    monkeypatch.setattr(archive_ingestor.EnkaBulkParser, "iter_batches", failing_batches(KeyboardInterrupt()))
+    db = DuckDBSession("memory")
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            ArchiveIngestor.ingest(root, asset_map, db)
+        assert list(ArchiveIngestor.checkpoint(root, db)) == [str((root / "uid" / "1").resolve())]
+    finally:
+        db.close()
@@ -0,0 +1,60 @@
+import pytest
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util import duckdb_util
+from src.enka.stage.synchronizer import EnkaAssetSynchronizer
+
+
+def test_generation_per_database(tmp_path):
+    db = DuckDBSession(path=tmp_path / "a.db")
+    other = DuckDBSession(path=tmp_path / "b.db")
+    try:
+        before = EnkaAssetSynchronizer.generation(other)
+        assert EnkaAssetSynchronizer.sync("pfp", {1: "a"}, db)
+        # 写入其他数据库不会使本库的内存资源失效
+        assert EnkaAssetSynchronizer.generation(other) == before
+        assert EnkaAssetSynchronizer.generation(db) == (db.instance, 1)
+        # 数据未变化时不写入，代数不变
+        assert not EnkaAssetSynchronizer.sync("pfp", {1: "a"}, db)
+        assert EnkaAssetSynchronizer.generation(db) == (db.instance, 1)
+    finally:
+        db.close()
+        other.close()
+
+
+def test_loc_batches_single_write(tmp_path):
+    db = DuckDBSession(path=tmp_path / "main.db")
+    try:
+        loc = {str(i): f"text {i}" for i in range(10)}
+        items = list(loc.items())
+        batches = [dict(items[i:i + 3]) for i in range(0, len(items), 3)]
+        generation = EnkaAssetSynchronizer.generation(db)[1]
+        assert EnkaAssetSynchronizer.sync_loc_batches(batches, db)
+        assert EnkaAssetSynchronizer.get_loc(db) == loc
+        # 多批写入只使资源代数递增一次
+        assert EnkaAssetSynchronizer.generation(db)[1] == generation + 1
+        # 指纹覆盖整个语言且与分批方式无关，重复同步被跳过
+        assert not EnkaAssetSynchronizer.sync_loc_batches([loc], db)
+        assert not EnkaAssetSynchronizer.sync_loc_batches(False, db)
+        assert EnkaAssetSynchronizer.generation(db)[1] == generation + 1
+    finally:
+        db.close()
+
+
+def test_loc_batches_rolled_back(tmp_path, monkeypatch):
+    db = DuckDBSession(path=tmp_path / "main.db")
+    try:
+        EnkaAssetSynchronizer.sync_loc_batches([{"1": "a"}], db)
+
+        def fail(*args):
+            raise RuntimeError("fingerprint")
+
+        # 批次写入后失败时整个语言回滚，指纹不变
+        with monkeypatch.context() as m:
+            m.setattr(duckdb_util, "save_fingerprint", fail)
+            with pytest.raises(RuntimeError):
+                EnkaAssetSynchronizer.sync_loc_batches([{"1": "b"}, {"2": "c"}], db)
+        assert EnkaAssetSynchronizer.get_loc(db) == {"1": "a"}
+        assert not EnkaAssetSynchronizer.sync_loc_batches([{"1": "a"}], db)
+    finally:
+        db.close()
@@ -0,0 +1,31 @@
+import pytest
+
+from src.evaluator.algorithm.stat_based import YSINAlgorithm
+from src.evaluator.algorithm.weight_based import XZSAlgorithm
+from src.evaluator.model.artifact_batch import ArtifactBatch, STAT_INDEX
+
+
+@pytest.mark.parametrize("algorithm", [XZSAlgorithm(), YSINAlgorithm()], ids=lambda a: a.__class__.__name__)
+def test_batch_matches_evaluate_character(player, weight_sets, algorithm):
+    """批量评分与逐个调用 evaluate_character 在展示精度上完全一致"""
+    for weights in weight_sets:
+        _assert_batch_matches(player, algorithm, weights)
+
+
+def _assert_batch_matches(player, algorithm, weights):
+    kernel = algorithm.compile_kernel(weights)
+    characters = player.characters
+    batch = ArtifactBatch.pack(characters, [kernel.vector] * len(characters))
+    result = algorithm.evaluate_batch(batch)
+    evals = [algorithm.evaluate_character(character, kernel) for character in characters]
+
+    for index, character_eval in enumerate(evals):
+        assert result.character_scores[index] == pytest.approx(float(character_eval.total_score), abs=1e-9)
+        assert result.character_effective_rolls[index] == pytest.approx(
+            float(character_eval.total_effective_rolls), abs=1e-9)
+    for row, (c, slot) in enumerate(batch.slots):
+        artifact_eval = evals[c].artifacts[slot]
+        assert result.artifact_scores[row] == pytest.approx(float(artifact_eval.score), abs=1e-9)
+        assert result.artifact_effective_rolls[row] == pytest.approx(float(artifact_eval.effective_rolls), abs=1e-9)
+        for stat_type, rolls in artifact_eval.effective_rolls_dict.items():
+            assert result.effective_rolls[row, STAT_INDEX[stat_type]] == pytest.approx(float(rolls), abs=1e-9)
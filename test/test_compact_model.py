@@ -0,0 +1,45 @@
+import dataclasses
+import pickle
+from decimal import Decimal
+
+import pytest
+
+from src.enka.model.artifact import Artifact, CompactArtifact
+from src.enka.model.player import Player, CompactPlayer
+from src.enka.model.stat import Stat, StatType, CompactStat, STAT_POOL_SIZE, _shared_stat
+from src.enka.stage.api_parser import EnkaParser
+
+
+def test_default_layout_unchanged(player):
+    # 默认表示仍是普通数据类，不受紧凑表示影响
+    assert type(player) is Player
+    assert not hasattr(Player, "__slots__") and not hasattr(Stat, "__slots__")
+    artifact = next(a for c in player.characters for a in c.artifacts if a is not None)
+    assert type(artifact) is Artifact and type(artifact.main_stat) is Stat
+    artifact.main_stat.stat_value = artifact.main_stat.stat_value
+
+
+def test_compact_equals_default(player_data, asset_map, player):
+    compact = EnkaParser.parse_player(player_data, asset_map, compact=True)
+    assert type(compact) is CompactPlayer and isinstance(compact, Player)
+    assert "uid" in CompactPlayer.__slots__
+    assert compact == player and player == compact
+    artifact = next(a for c in compact.characters for a in c.artifacts if a is not None)
+    assert type(artifact) is CompactArtifact
+    assert pickle.loads(pickle.dumps(compact)) == player
+
+
+def test_interned_stat_shared_and_frozen():
+    stat = Stat.intern(StatType.ATK, Decimal("5.8"))
+    assert type(stat) is CompactStat
+    assert Stat.intern(StatType.ATK, Decimal("5.8")) is stat
+    # 取值相等但字符串形式或类型不同时不共享
+    assert Stat.intern(StatType.ATK, Decimal("5.80")) is not stat
+    assert Stat.intern(StatType.ATK, 5.8) is not stat
+    assert stat == Stat(StatType.ATK, Decimal("5.8"))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        stat.stat_value = Decimal(0)
+
+
+def test_stat_pool_bounded():
+    assert _shared_stat.cache_info().maxsize == STAT_POOL_SIZE
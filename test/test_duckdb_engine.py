@@ -0,0 +1,57 @@
+import pytest
+
+from src.core.duckdb.async_duckdb import AsyncDuckDBSession
+from src.core.duckdb.duckdb_engine import DuckDBSession
+
+
+@pytest.fixture
+def db():
+    db = DuckDBSession("memory")
+    yield db
+    db.close()
+
+
+def test_dict_values_coerced_to_varchar(db):
+    db.save_table({1: "a", 2: 3, 3: None, 4: 1.5}, "test_dict")
+    assert db.execute_sql("SELECT id, value FROM test_dict ORDER BY id").fetchall() == [
+        (1, "a"), (2, "3"), (3, None), (4, "1.5")]
+    db.upsert_table({2: 4, 5: "e"}, "test_dict", "id")
+    assert db.execute_sql("SELECT id, value FROM test_dict ORDER BY id").fetchall() == [
+        (1, "a"), (2, "4"), (3, None), (4, "1.5"), (5, "e")]
+
+
+def test_dict_string_keys(db):
+    db.save_table({"x": "1", "y": "2"}, "test_dict")
+    db.upsert_table({"y": "3"}, "test_dict", "id")
+    assert db.execute_sql("SELECT id, value FROM test_dict ORDER BY id").fetchall() == [("x", "1"), ("y", "3")]
+
+
+def test_memory_instance_changes_after_close():
+    first = DuckDBSession("memory")
+    shared = DuckDBSession("memory")
+    cursor = first.cursor()
+    assert first.instance == shared.instance == cursor.instance
+    cursor.close()
+    first.close()
+    shared.close()
+    second = DuckDBSession("memory")
+    try:
+        assert second.instance != first.instance
+    finally:
+        second.close()
+
+
+def test_async_sessions_share_write_limiter(tmp_path):
+    db = DuckDBSession(path=tmp_path / "main.db")
+    other = DuckDBSession(path=tmp_path / "main.db")
+    try:
+        # 同一连接上的异步外观共用一个写入者，不同数据库各自独立
+        assert AsyncDuckDBSession(db)._write_limiter is AsyncDuckDBSession(other)._write_limiter
+        memory = DuckDBSession("memory")
+        try:
+            assert AsyncDuckDBSession(memory)._write_limiter is not AsyncDuckDBSession(db)._write_limiter
+        finally:
+            memory.close()
+    finally:
+        db.close()
+        other.close()
@@ -0,0 +1,149 @@
+import anyio
+import pytest
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.enka import client as client_module
+from src.enka.client import EnkaClient
+from src.enka.stage.player_cache import EnkaPlayerCache
+from src.enka.stage.synchronizer import EnkaAssetSynchronizer
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """不发起网络请求的客户端：取消缓存读取，获取玩家时返回 UID 本身，记录写入快照表的批次"""
+    client = EnkaClient("zh-cn", db=DuckDBSession("memory"))
+    client._asset_map = {"loc": {}}
+    client._asset_generation = EnkaAssetSynchronizer.generation(client.db)
+    client.synced = []
+    client.started = []
+
+    async def fetch_player(uid, use_cache=True):
+        client.started.append(uid)
+        await anyio.sleep(0.01)
+        # 偶数 UID 的响应与上次相同
+        return uid, int(uid) % 2 == 1
+
+    monkeypatch.setattr(client, "_fetch_player", fetch_player)
+    monkeypatch.setattr(client_module.EnkaPlayerSynchronizer, "sync",
+                        lambda players, db: client.synced.append(list(players)))
+    yield client
+    client.db.close()
+
+
+async def test_fetch_players_all(client):
+    uids = [str(uid) for uid in range(10)]
+    async with client.fetch_players(uids, max_concurrency=3, rate=1000, burst=10, use_cache=False,
+                                    snapshot_batch_size=4) as results:
+        received = [result.uid async for result in results]
+    assert sorted(received) == uids
+    # 只有响应变化的玩家写入快照表
+    assert sorted(uid for batch in client.synced for uid in batch) == [uid for uid in uids if int(uid) % 2]
+
+
+async def test_fetch_players_break_early(client):
+    uids = [str(uid) for uid in range(100)]
+    received = []
+    async with client.fetch_players(uids, max_concurrency=2, rate=1000, burst=10, use_cache=False) as results:
+        async for result in results:
+            received.append(result.uid)
+            if len(received) == 2:
+                break
+    # 退出上下文时取消剩余请求，已获取的玩家写入快照表
+    assert len(client.started) < len(uids)
+    assert [uid for batch in client.synced for uid in batch] == [uid for uid in received if int(uid) % 2]
+
+
+async def test_fetch_players_caller_error_propagates(client):
+    # 调用方的异常原样抛出，不包装为异常组
+    with pytest.raises(KeyError):
+        async with client.fetch_players(["1", "2", "3"], rate=1000, burst=10, use_cache=False) as results:
+            async for _ in results:
+                raise KeyError("stop")
+
+
+async def test_fetch_players_cancelled(client):
+    uids = [str(uid) for uid in range(100)]
+    with anyio.move_on_after(0.05) as scope:
+        async with client.fetch_players(uids, max_concurrency=2, rate=1000, burst=10, use_cache=False) as results:
+            async for _ in results:
+                pass
+    assert scope.cancelled_caught
+    assert len(client.started) < len(uids)
+
+
+async def test_fetch_player_snapshots_changed_only(client):
+    await client.fetch_player("2")
+    assert client.synced == []
+    await client.fetch_player("3")
+    assert client.synced == [["3"]]
+
+
+def test_player_cache_put_changed():
+    db = DuckDBSession("memory")
+    try:
+        cache = EnkaPlayerCache()
+        data = {"uid": "1", "ttl": 60, "playerInfo": {"level": 60}}
+        assert cache.put("1", data, db)
+        # 只有 ttl 不同时视为未变化
+        assert not cache.put("1", {**data, "ttl": 30}, db)
+        assert cache.put("1", {**data, "playerInfo": {"level": 59}}, db)
+    finally:
+        db.close()
+
+
+def test_player_cache_new_memory_database():
+    cache = EnkaPlayerCache()
+    db = DuckDBSession("memory")
+    cache.put("1", {"uid": "1", "ttl": 60}, db)
+    db.close()
+    # 内存数据库关闭后被丢弃，新的内存数据库需要重新建表
+    db = DuckDBSession("memory")
+    try:
+        assert cache.get("1", db) is None
+        assert cache.put("1", {"uid": "1", "ttl": 60}, db)
+        assert cache.get("1", db)["uid"] == "1"
+    finally:
+        db.close()
+
+
+def test_player_cache_evicts_in_batches():
+    cache = EnkaPlayerCache(max_entries=20)
+    db = DuckDBSession("memory")
+    try:
+        def count():
+            return db.execute_sql(f"SELECT count(*) FROM {cache.TABLE_PLAYER_RESPONSE}").fetchone()[0]
+
+        for uid in range(30):
+            cache.put(str(uid), {"uid": str(uid), "ttl": 60}, db)
+            # 两次淘汰之间最多超出 evict_batch - 1 条
+            assert count() <= cache.max_entries + cache.evict_batch - 1
+        cache.put("30", {"uid": "30", "ttl": 60}, db)
+        assert count() == 21
+        cache.evict(db)
+        assert count() == 20
+        assert cache.get("30", db) is not None
+    finally:
+        db.close()
+
+
+async def test_replace_db_loads_assets(client, tmp_path):
+    memory = client.db
+    snapshot = DuckDBSession(path=tmp_path / "snapshot.db")
+    EnkaAssetSynchronizer.sync("pfp", {1: "a"}, snapshot)
+    try:
+        await client.replace_db(snapshot)
+        assert client.asset_map["pfp"] == {1: "a"}
+        assert client.asset_generation == EnkaAssetSynchronizer.generation(snapshot)
+        # 代数未变化时不重新读取
+        client.asset_map["pfp"] = {}
+        await client.refresh_assets_async()
+        assert client.asset_map["pfp"] == {}
+    finally:
+        memory.close()
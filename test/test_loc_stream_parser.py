@@ -0,0 +1,36 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.enka.stage.loc_stream_parser import EnkaLocStreamParser
+
+LOC_TEXT = (Path(__file__).parent / "enka" / "asset" / "loc.json").read_text(encoding="utf-8")
+
+
+def _parse(langs: list[str], chunk_size: int, text: str = LOC_TEXT) -> list[tuple[str, str, str]]:
+    parser = EnkaLocStreamParser(langs)
+    rows = []
+    for start in range(0, len(text), chunk_size):
+        rows += parser.feed(text[start:start + chunk_size])
+    return rows + parser.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000, 1 << 16])
+@pytest.mark.parametrize("langs", [["zh-cn"], ["en", "ru"], []])
+def test_matches_json_loads(langs, chunk_size):
+    data = json.loads(LOC_TEXT)
+    expected = [(lang, key, value) for lang in data if lang in langs for key, value in data[lang].items()]
+    assert _parse(langs, chunk_size) == expected
+
+
+def test_brackets_inside_strings():
+    text = json.dumps({"en": {"1": "a}{[\"", "2": "]"}, "zh-cn": {"1": "{x}", "2": "\\\\"}})
+    assert _parse(["zh-cn"], 3, text) == [("zh-cn", "1", "{x}"), ("zh-cn", "2", "\\\\")]
+
+
+def test_truncated():
+    parser = EnkaLocStreamParser(["zh-cn"])
+    parser.feed(LOC_TEXT[:len(LOC_TEXT) // 2])
+    with pytest.raises(ValueError):
+        parser.close()
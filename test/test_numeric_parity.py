@@ -0,0 +1,63 @@
+import copy
+import random
+
+import pytest
+
+from src.core.util.numeric import NumericMode
+from src.enka.stage.api_parser import EnkaParser
+from src.evaluator.algorithm.stat_based import YSINAlgorithm
+from src.evaluator.algorithm.weight_based import XZSAlgorithm
+
+ALGORITHMS = [XZSAlgorithm, YSINAlgorithm]
+
+
+def _randomized(data: dict, seed: int) -> dict:
+    """随机改写副词条数值，百分比词条保留一或两位小数，覆盖更多取整中点"""
+    rng = random.Random(seed)
+    data = copy.deepcopy(data)
+    for avatar in data.get("avatarInfoList", []):
+        for equip in avatar.get("equipList", []):
+            for sub_stat in equip.get("flat", {}).get("reliquarySubstats", []):
+                value = sub_stat["statValue"]
+                if isinstance(value, float):
+                    sub_stat["statValue"] = round(rng.uniform(1, 40), rng.choice([1, 2]))
+                else:
+                    sub_stat["statValue"] = rng.randint(10, 300)
+    return data
+
+
+def _assert_same(decimal_eval, float_eval):
+    """Decimal 与浮点结果在转换为 float 后完全一致，即展示精度上一致"""
+    assert float(decimal_eval.total_score) == pytest.approx(float_eval.total_score, abs=1e-9)
+    assert float(decimal_eval.total_effective_rolls) == pytest.approx(float_eval.total_effective_rolls, abs=1e-9)
+    for decimal_artifact, float_artifact in zip(decimal_eval.artifacts, float_eval.artifacts):
+        assert float(decimal_artifact.score) == pytest.approx(float_artifact.score, abs=1e-9)
+        assert decimal_artifact.effective_rolls_dict.keys() == float_artifact.effective_rolls_dict.keys()
+        for stat_type, rolls in decimal_artifact.effective_rolls_dict.items():
+            assert float(rolls) == pytest.approx(float_artifact.effective_rolls_dict[stat_type], abs=1e-9)
+
+
+def test_parse_parity(player_data, asset_map):
+    decimal_player = EnkaParser.parse_player(player_data, asset_map, NumericMode.DECIMAL)
+    float_player = EnkaParser.parse_player(player_data, asset_map, NumericMode.FLOAT)
+    for decimal_character, float_character in zip(decimal_player.characters, float_player.characters):
+        assert {k: float(v) for k, v in decimal_character.fight_prop.items()} == float_character.fight_prop
+        for decimal_artifact, float_artifact in zip(decimal_character.artifacts, float_character.artifacts):
+            for decimal_stat, float_stat in zip(decimal_artifact.sub_stats, float_artifact.sub_stats):
+                assert float(decimal_stat.stat_value) == float_stat.stat_value
+                assert isinstance(float_stat.stat_value, float)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS, ids=lambda a: a.__name__)
+@pytest.mark.parametrize("seed", [None, *range(10)])
+def test_evaluate_parity(player_data, asset_map, weight_sets, algorithm, seed):
+    data = player_data if seed is None else _randomized(player_data, seed)
+    decimal_player = EnkaParser.parse_player(data, asset_map, NumericMode.DECIMAL)
+    float_player = EnkaParser.parse_player(data, asset_map, NumericMode.FLOAT)
+    decimal_algorithm, float_algorithm = algorithm(NumericMode.DECIMAL), algorithm(NumericMode.FLOAT)
+    # 随机数值时只取部分权重，控制用例耗时
+    for weights in weight_sets if seed is None else weight_sets[:4]:
+        decimal_kernel, float_kernel = decimal_algorithm.compile_kernel(weights), float_algorithm.compile_kernel(weights)
+        for decimal_character, float_character in zip(decimal_player.characters, float_player.characters):
+            _assert_same(decimal_algorithm.evaluate_character(decimal_character, decimal_kernel),
+                         float_algorithm.evaluate_character(float_character, float_kernel))
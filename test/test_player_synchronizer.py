@@ -0,0 +1,45 @@
+import pytest
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.util.numeric import NumericMode
+from src.enka.client import EnkaClient
+from src.enka.stage.api_parser import EnkaParser
+from src.enka.stage.player_synchronizer import EnkaPlayerSynchronizer
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_snapshot_round_trip(player, compact):
+    db = DuckDBSession("memory")
+    try:
+        EnkaPlayerSynchronizer.sync([player], db)
+        restored = EnkaPlayerSynchronizer.get([player.uid], db, compact)[int(player.uid)]
+    finally:
+        db.close()
+    assert [c.id for c in restored.characters] == [c.id for c in player.characters]
+    for original, character in zip(player.characters, restored.characters):
+        assert character.fight_prop == original.fight_prop
+        for original_artifact, artifact in zip(original.artifacts, character.artifacts):
+            if original_artifact is None:
+                assert artifact is None
+                continue
+            assert artifact.equipment_type is original_artifact.equipment_type
+            assert artifact.main_stat == original_artifact.main_stat
+            assert artifact.sub_stats == original_artifact.sub_stats
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_load_players_numeric_mode(player_data, asset_map, compact):
+    player = EnkaParser.parse_player(player_data, asset_map, NumericMode.FLOAT)
+    client = EnkaClient("zh-cn", numeric=NumericMode.FLOAT, compact=compact, db=DuckDBSession("memory"))
+    try:
+        EnkaPlayerSynchronizer.sync([player], client.db)
+        restored = client.load_players([player.uid])[int(player.uid)]
+    finally:
+        client.db.close()
+    for original, character in zip(player.characters, restored.characters):
+        assert character.fight_prop == original.fight_prop
+        assert all(type(value) is float for value in character.fight_prop.values())
+        for artifact in filter(None, character.artifacts):
+            assert all(type(stat.stat_value) is float for stat in (artifact.main_stat, *artifact.sub_stats))
+        assert all(type(stat.stat_value) is float for stat in character.weapon.weapon_stats)
+    assert restored == player
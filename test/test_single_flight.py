@@ -0,0 +1,73 @@
+import anyio
+import pytest
+
+from src.core.util.single_flight import CallCancelledError, SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def test_shared_result():
+    calls = []
+
+    async def func(value):
+        calls.append(value)
+        await anyio.sleep(0.01)
+        return value
+
+    results = []
+    async with anyio.create_task_group() as tg:
+        flight = SingleFlight(tg)
+
+        async def waiter():
+            results.append(await flight.do("key", func, 1))
+
+        for _ in range(3):
+            tg.start_soon(waiter)
+    assert calls == [1]
+    assert results == [1, 1, 1]
+
+
+async def test_shared_error():
+    async def func():
+        await anyio.sleep(0.01)
+        raise KeyError("missing")
+
+    errors = []
+    async with anyio.create_task_group() as tg:
+        flight = SingleFlight(tg)
+
+        async def waiter():
+            try:
+                await flight.do("key", func)
+            except KeyError as e:
+                errors.append(e)
+
+        for _ in range(2):
+            tg.start_soon(waiter)
+    assert len(errors) == 2 and errors[0] is errors[1]
+
+
+async def test_cancelled_call_raises_to_waiters():
+    errors = []
+    async with anyio.create_task_group() as waiters:
+        async with anyio.create_task_group() as calls:
+            flight = SingleFlight(calls)
+
+            async def waiter():
+                try:
+                    await flight.do("key", anyio.sleep_forever)
+                except CallCancelledError as e:
+                    errors.append(e)
+
+            for _ in range(2):
+                waiters.start_soon(waiter)
+            await anyio.sleep(0.01)
+            # 执行调用的任务组被取消（如应用关闭），等待方不能拿到 None
+            calls.cancel_scope.cancel()
+    assert len(errors) == 2
+    assert not flight._calls
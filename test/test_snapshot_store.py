@@ -0,0 +1,28 @@
+import os
+import time
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.duckdb.snapshot_store import DuckDBSnapshotStore
+
+
+def test_prune_keeps_temp_files_in_progress(tmp_path):
+    store = DuckDBSnapshotStore(tmp_path, keep=1, temp_grace=60)
+    # 其他发布者正在写入的临时文件与中断的发布留下的临时文件
+    writing = tmp_path / f"{store.PREFIX}2.db.tmp"
+    abandoned = tmp_path / f"{store.PREFIX}1.db.tmp"
+    writing.write_bytes(b"")
+    abandoned.write_bytes(b"")
+    old = time.time() - 120
+    os.utime(abandoned, (old, old))
+
+    db = DuckDBSession("memory")
+    try:
+        db.execute_sql("CREATE TABLE t AS SELECT 1 AS id")
+        first = store.publish(db)
+        second = store.publish(db)
+    finally:
+        db.close()
+    assert writing.exists()
+    assert not abandoned.exists()
+    assert not first.exists() and second.exists()
+    assert store.current() == second
@@ -0,0 +1,61 @@
+import pytest
+
+from src.core.duckdb.duckdb_engine import DuckDBSession
+from src.core.duckdb.snapshot_store import DuckDBSnapshotStore
+from src.core.util.duckdb_util import sync_list_to_duckdb
+from src.evaluator.model.character_stat_weight import CharacterStatWeight
+from src.evaluator.stage.artifact_fact_synchronizer import ArtifactFactSynchronizer
+from src.evaluator.stage.sql_scorer import SqlScorer
+from src.evaluator.stage.synchronizer import StatWeightSynchronizer
+
+
+@pytest.fixture
+def db(tmp_path, player):
+    db = DuckDBSession(path=tmp_path / "main.db")
+    ArtifactFactSynchronizer.sync([player], db)
+    weights = [CharacterStatWeight(c.id, c.name, 0, 100, 0, 100, 100, 0, 0, 0, 0, 0) for c in player.characters[:3]]
+    for name in SqlScorer.VIEW_CHARACTER_SCORE:
+        StatWeightSynchronizer.sync(name, weights, db)
+    yield db
+    db.close()
+
+
+def test_views_require_install(db):
+    with pytest.raises(ValueError):
+        SqlScorer.leaderboard("XZSAlgorithm", db)
+    assert SqlScorer.ensure_installed("XZSAlgorithm", db)
+    assert SqlScorer.leaderboard("XZSAlgorithm", db).fetchall()
+
+
+@pytest.mark.parametrize("name", list(SqlScorer.VIEW_CHARACTER_SCORE))
+def test_snapshot_read_only(db, tmp_path, player, name):
+    SqlScorer.ensure_installed(name, db)
+    expected = SqlScorer.character_scores(name, db).fetchall()
+    store = DuckDBSnapshotStore(tmp_path / "snapshots")
+    store.publish(db)
+    snapshot = store.open()
+    try:
+        # 只读快照上的查询不执行 DDL
+        assert SqlScorer.character_scores(name, snapshot).fetchall() == expected
+        assert len(SqlScorer.leaderboard(name, snapshot, limit=5).fetchall()) == min(5, len(expected))
+        assert SqlScorer.ensure_installed(name, snapshot)
+    finally:
+        snapshot.close()
+
+
+def test_weight_cache_new_memory_database(player):
+    name = "XZSAlgorithm"
+    character = player.characters[0]
+    db = DuckDBSession("memory")
+    StatWeightSynchronizer.sync(name, [CharacterStatWeight(character.id, character.name, 0, 100, 0, 0, 0, 0, 0, 0, 0, 0)],
+                                db)
+    assert StatWeightSynchronizer.get_cached(name, db)[1][character.id].attack_percent == 100
+    db.close()
+    # 内存数据库关闭后被丢弃，新的内存数据库中由其他途径写入的权重不能被旧缓存遮蔽
+    db = DuckDBSession("memory")
+    try:
+        sync_list_to_duckdb([CharacterStatWeight(character.id, character.name, 0, 50, 0, 0, 0, 0, 0, 0, 0, 0)],
+                            StatWeightSynchronizer.table_name(name), db, overwrite=True)
+        assert StatWeightSynchronizer.get_cached(name, db)[1][character.id].attack_percent == 50
+    finally:
+        db.close()